@@ -0,0 +1,82 @@
+"""
+Бенчмарк потокового сжатия: сколько байт экономит deflate и сколько процессорного времени
+стоит один кадр. Повествование берется из текстов историй, ответы /map и /status
+собираются в том же формате, что и на сервере.
+
+Запуск: python benchmarks/compression.py
+"""
+import os
+import sys
+import time
+import zlib
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'server'))
+os.chdir(os.path.join(ROOT, 'server'))
+
+from game.story_packs import STORY_LIBRARY
+from protocol.compression import StreamCompressor
+from protocol.wire import CODECS_BY_NAME, FramedProtocol, available_codecs
+
+NARRATION_CHUNK_CHARS = 160
+
+
+def _story_sentences():
+    for story in STORY_LIBRARY:
+        yield story.initial_description
+        yield from story.elements
+
+
+def narration_frames(protocol: FramedProtocol):
+    text = " ".join(_story_sentences())
+    return [protocol.encode(f"NARRATE {text[i:i + NARRATION_CHUNK_CHARS]}")
+            for i in range(0, len(text), NARRATION_CHUNK_CHARS)]
+
+
+def json_frames(protocol: FramedProtocol, count: int = 200):
+    frames = []
+    for turn in range(count):
+        names = [f"location_{turn}_{i}" for i in range(12)]
+        graph = {
+            "locations": [{"name": n, "parent": names[0], "players": ["Alice"] if i == 3 else []}
+                          for i, n in enumerate(names)],
+            "connections": [sorted([names[i], names[i + 1]]) for i in range(len(names) - 1)],
+            "current_location": names[3],
+        }
+        status = {
+            "player": {"name": "Alice", "status": ["здоров", "напуган"], "inventory": ["фонарик", "ржавый ключ"]},
+            "location": {"name": names[3], "description": STORY_LIBRARY.get('endless_metro').initial_description,
+                         "players": ["Bob"]},
+        }
+        frames.append(protocol.encode_payload("MAP_UPDATE", graph))
+        frames.append(protocol.encode_payload("STATUS_UPDATE", status))
+    return frames
+
+
+def run(label: str, frames, batch: int = 1, level: int = 6):
+    compressor = StreamCompressor(level)
+    raw_total = sum(len(f) for f in frames)
+    started = time.perf_counter()
+    for i in range(0, len(frames), batch):
+        compressor.compress(b"".join(frames[i:i + batch]))
+    elapsed = time.perf_counter() - started
+    saved = 1 - compressor.bytes_out / raw_total
+    print(f"{label:<28} кадров={len(frames):>5}  исходно={raw_total:>9} Б  сжато={compressor.bytes_out:>9} Б  "
+          f"экономия={saved:6.1%}  CPU={elapsed / len(frames) * 1e6:7.1f} мкс/кадр")
+
+
+def main():
+    print(f"zlib {zlib.ZLIB_VERSION}")
+    for codec_name in available_codecs():
+        protocol = FramedProtocol(CODECS_BY_NAME[codec_name])
+        narration = narration_frames(protocol)
+        structured = json_frames(protocol)
+        run(f"NARRATE ({codec_name})", narration)
+        run(f"NARRATE x8 пакетом ({codec_name})", narration, batch=8)
+        run(f"MAP/STATUS ({codec_name})", structured)
+        run(f"MAP/STATUS level=1 ({codec_name})", structured, level=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Бенчмарк памяти игрового мира: сколько байт занимает одна сгенерированная локация
+и один игрок. Локации создаются тем же путем, что и в игре, — через apply_turn_changes
+с именами из разобранного JSON-ответа модели; каждая новая связана с предыдущей
+и с одной из более ранних, как коридоры и переходы.
+Для сравнения те же ответы применяются к прежней модели мира (BaselineWorld): локации и игроки
+на словарях атрибутов, множества и списки создаются сразу, граф — словарь множеств имен.
+
+Запуск: python benchmarks/memory.py [число_локаций]
+"""
+import json
+import logging
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'server'))
+os.chdir(os.path.join(ROOT, 'server'))
+
+import trio
+
+import config
+from game.player import Player
+from game.state import GameState
+from logger import lg
+
+TURN_BATCH = 10
+
+
+class BaselineLocation:
+    """Локация в прежнем виде: без слотов, все контейнеры создаются в конструкторе."""
+
+    def __init__(self, name: str, initial_description: str):
+        self.name = name
+        self.description = initial_description
+        self.players_present: Set[str] = set()
+        self.conversation_history: List[str] = [f"SYSTEM Мир вокруг: {initial_description}"]
+        self.used_story_elements: Set[str] = set()
+        self.turn_counter = 0
+        self.pending_actions: Dict[str, str] = {}
+        self.parent_location: Optional[str] = None
+        self.sub_locations: Set[str] = set()
+
+
+@dataclass
+class BaselineStatusEffect:
+    name: str
+    description: str
+    duration_turns: Optional[int] = None
+    is_positive: bool = False
+
+
+@dataclass
+class BaselinePlayer:
+    username: str
+    location_name: Optional[str] = None
+    inventory: List[str] = field(default_factory=lambda: ["фонарик"])
+    status_effects: List[BaselineStatusEffect] = field(default_factory=lambda: [
+        BaselineStatusEffect(name="здоров", description="В полном порядке.", is_positive=True)])
+    personal_history: List[str] = field(default_factory=list)
+
+
+class BaselineWorld:
+    """Прежнее хранение мира: локации и граф связей в словарях, имена из ответа модели не интернируются."""
+
+    def __init__(self, start_room: str, start_description: str):
+        self.locations: Dict[str, BaselineLocation] = {}
+        self.location_graph: Dict[str, Set[str]] = {}
+        self.players: Dict[str, BaselinePlayer] = {}
+        self.start_room = start_room
+        self._get_or_create(start_room, start_description)
+
+    def _get_or_create(self, name: str, description: str = 'Пустое место.') -> BaselineLocation:
+        if name not in self.locations:
+            self.locations[name] = BaselineLocation(name, description)
+            self.location_graph[name] = set()
+        return self.locations[name]
+
+    def apply_turn_changes(self, state_changes: dict):
+        for update in state_changes.get('location_updates', ()):
+            location = self._get_or_create(update['location_name'])
+            location.description = update['description']
+            parent = self._get_or_create(update['parent_location'])
+            parent.sub_locations.add(location.name)
+            location.parent_location = update['parent_location']
+        for conn_update in state_changes.get('connection_updates', ()):
+            first, second = conn_update['locations']
+            self._get_or_create(first)
+            self._get_or_create(second)
+            self.location_graph[first].add(second)
+            self.location_graph[second].add(first)
+
+    def add_player(self, player: BaselinePlayer):
+        self.players[player.username] = player
+        player.location_name = self.start_room
+        start = self.locations[self.start_room]
+        start.players_present.add(player.username)
+        start.conversation_history.append(f"SYSTEM {player.username} появляется.")
+
+
+def _turn_changes(start: int, count: int) -> dict:
+    """Ответ модели за один ход: несколько новых локаций с описаниями и связями, как после json.loads."""
+    updates, connections = [], []
+    for i in range(start, start + count):
+        name = f"generated_location_{i}"
+        updates.append({"location_name": name, "description": f"Сырой коридор номер {i}, стены в пятнах ржавчины.",
+                        "parent_location": "endless_metro"})
+        if i:
+            connections.append({"action": "CREATE", "locations": [f"generated_location_{i - 1}", name]})
+        if i > 10:
+            connections.append({"action": "CREATE", "locations": [f"generated_location_{i // 3}", name]})
+    return json.loads(json.dumps({"location_updates": updates, "connection_updates": connections}))
+
+
+async def _started_worlds():
+    state = GameState()
+    await state.start_game()
+    return state, BaselineWorld(state.start_room, state.story.initial_description)
+
+
+async def measure_locations(count: int, baseline_model: bool) -> float:
+    state, world = await _started_worlds()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for start in range(0, count, TURN_BATCH):
+        changes = _turn_changes(start, min(TURN_BATCH, count - start))
+        if baseline_model:
+            world.apply_turn_changes(changes)
+        else:
+            await state.apply_turn_changes(changes)
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return used / count
+
+
+async def measure_players(count: int, baseline_model: bool) -> float:
+    state, world = await _started_worlds()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for i in range(count):
+        username = json.loads(json.dumps(f"player{i}"))
+        if baseline_model:
+            world.add_player(BaselinePlayer(username=username))
+        else:
+            await state.add_player(Player(username=username))
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return used / count
+
+
+async def main(location_count: int):
+    lg.setLevel(logging.WARNING)
+    config.MAX_PLAYERS = 10 ** 6
+    print(f"Локаций: {location_count}, игроков: 1000; байт на объект{'прежняя модель':>20}{'текущая':>12}")
+    for title, measure, count in (("локация", measure_locations, location_count),
+                                  ("игрок", measure_players, 1000)):
+        before = await measure(count, baseline_model=True)
+        after = await measure(count, baseline_model=False)
+        print(f"{title:>38}{before:>20,.0f}{after:>12,.0f}")
+
+
+if __name__ == "__main__":
+    trio.run(main, int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
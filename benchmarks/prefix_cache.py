@@ -0,0 +1,90 @@
+"""
+Бенчмарк раскладок промпта повествования для кэша префиксов API: какая доля промпта каждого хода
+совпадает с началом промпта предыдущего хода той же группы. Только эту часть API может взять из кэша,
+поэтому доля общего префикса — верхняя оценка попаданий, которые /cache покажет на живой модели.
+Ход за ходом игроки действуют, модель отвечает повествованием, счетчик ходов растет, как в игре.
+
+Запуск: python benchmarks/prefix_cache.py [число_ходов]
+"""
+import logging
+import os
+import random
+import sys
+from typing import List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'server'))
+os.chdir(os.path.join(ROOT, 'server'))
+
+import trio
+
+from game.player import Player
+from game.state import GameState
+from llm.prompts import PROMPT_LAYOUTS, construct_narration_prompt
+from logger import lg
+from utils import estimate_tokens
+
+PLAYERS = 3
+NARRATION = "Лампы над платформой мигают, из туннеля тянет сыростью, и где-то далеко скрипит металл. " * 3
+
+
+def shared_prefix(a: str, b: str) -> int:
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return length
+
+
+async def play(layout: str, turns: int) -> List[str]:
+    """Промпты повествования одной группы за turns ходов в заданной раскладке."""
+    random.seed(1)
+    state = GameState()
+    for i in range(PLAYERS):
+        await state.add_player(Player(username=f"player{i}"))
+    await state.start_game()
+    location = state.locations[state.start_room]
+    game_cfg = await state.get_full_config()
+
+    prompts = []
+    for turn in range(turns):
+        for i in range(PLAYERS):
+            action = f"осматривает стену, ход {turn}"
+            location.pending_actions[f"player{i}"] = action
+            location.add_player_action_to_history(f"player{i}", action)
+        location.turn_counter += 1
+        prompt, used_mask = await construct_narration_prompt(
+            state.snapshot([location.name]), immersion_turns=game_cfg['immersion_turns'],
+            story_injection_turns=game_cfg['story_injection_turns'],
+            max_history_char_length=game_cfg['max_history_char_length'], layout=layout)
+        location.mark_story_elements_used(used_mask)
+        state.add_group_narration([location], NARRATION)
+        location.clear_turn_data()
+        prompts.append(prompt)
+    return prompts
+
+
+async def main(turns: int):
+    lg.setLevel(logging.WARNING)
+    print(f"Ходов: {turns}, игроков: {PLAYERS}; общий префикс с промптом предыдущего хода, ~токенов (доля):")
+    results = {layout: await play(layout, turns) for layout in PROMPT_LAYOUTS}
+    print("Ход  " + "".join(f"{layout:>24}" for layout in PROMPT_LAYOUTS))
+    totals = {layout: [0, 0] for layout in PROMPT_LAYOUTS}
+    for turn in range(1, turns):
+        row = []
+        for layout in PROMPT_LAYOUTS:
+            prompts = results[layout]
+            shared = estimate_tokens(prompts[turn][:shared_prefix(prompts[turn - 1], prompts[turn])])
+            total = estimate_tokens(prompts[turn])
+            totals[layout][0] += shared
+            totals[layout][1] += total
+            row.append(f"{shared:>8,} / {total:>6,} ({shared / total:>4.0%})")
+        print(f"{turn + 1:>3}  " + "".join(f"{cell:>24}" for cell in row))
+    print("Итого" + "".join(f"{shared:>8,} / {total:>6,} ({shared / total:>4.0%})".rjust(24)
+                            for shared, total in totals.values()))
+
+
+if __name__ == "__main__":
+    trio.run(main, int(sys.argv[1]) if len(sys.argv) > 1 else 20)
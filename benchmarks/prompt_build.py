@@ -0,0 +1,100 @@
+"""
+Бенчмарк сборки промптов хода: сколько микросекунд уходит на промпт повествования и промпт
+изменений состояния для одной группы. Мир собирается тем же путем, что и в игре: игроки входят
+в стартовую комнату, модель создает соседние локации, в истории копятся действия и повествование.
+Отдельно показано, сколько стоил бы рендер статических разделов, если бы он выполнялся на каждом ходу,
+и сколько символов промптов экономит компактный JSON состояния (config.PROMPT_JSON_COMPACT).
+
+Запуск: python benchmarks/prompt_build.py [число_ходов]
+"""
+import json
+import logging
+import os
+import random
+import sys
+import time
+from typing import Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'server'))
+os.chdir(os.path.join(ROOT, 'server'))
+
+import trio
+
+import config
+from game.player import Player, StatusEffect
+from game.state import GameState
+from llm.prompts import PROMPT_BUILDER, construct_narration_prompt, construct_state_update_prompt
+from logger import lg
+
+PLAYERS = 4
+ROOMS = ["platform_a", "ticket_hall", "service_tunnel"]
+NARRATION = ("Лампы над платформой мигают в такт чьему-то дыханию. Из туннеля тянет сыростью, "
+             "и на рельсах блестит свежая вода, хотя дождя здесь быть не может. ") * 4
+
+
+async def build_world() -> GameState:
+    state = GameState()
+    for i in range(PLAYERS):
+        await state.add_player(Player(username=f"player{i}"))
+    await state.start_game()
+    start = state.start_room
+    await state.apply_turn_changes(json.loads(json.dumps({
+        "location_updates": [{"location_name": name, "description": f"Описание {name}.", "parent_location": start}
+                             for name in ROOMS],
+        "connection_updates": [{"action": "CREATE", "locations": [start, name]} for name in ROOMS],
+        "world_flags_update": {"power": False, "alarm": True},
+    })))
+    state.players["player1"].edit_status_effects().add(StatusEffect("Кровотечение", "Рана на руке.", 3))
+    state.players["player2"].edit_inventory().add("патрон", 6)
+    locations = [state.locations[name] for name in (start, *ROOMS)]
+    for turn in range(config.PROMPT_HISTORY_ENTRIES):
+        for i in range(PLAYERS):
+            locations[0].add_player_action_to_history(f"player{i}", f"осматривает стену, ход {turn}")
+        state.add_group_narration(locations, NARRATION)
+    for i in range(PLAYERS):
+        locations[0].pending_actions[f"player{i}"] = "прислушивается к туннелю"
+    return state
+
+
+async def measure_turns(state: GameState, turns: int, compact_json: bool) -> Tuple[float, int]:
+    """Среднее время сборки промптов хода и их суммарная длина в символах."""
+    names = [state.start_room, *ROOMS]
+    game_cfg = await state.get_full_config()
+    chars = 0
+    started = time.perf_counter()
+    for turn in range(turns):
+        snapshot = state.snapshot(names, compact_json=compact_json)
+        narration, _ = await construct_narration_prompt(
+            snapshot, immersion_turns=game_cfg['immersion_turns'],
+            story_injection_turns=game_cfg['story_injection_turns'],
+            max_history_char_length=game_cfg['max_history_char_length'])
+        chars = len(narration) + len(construct_state_update_prompt(snapshot, NARRATION))
+    return (time.perf_counter() - started) / turns, chars
+
+
+def measure_static_render(repeats: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeats):
+        PROMPT_BUILDER.render()
+    return (time.perf_counter() - started) / repeats
+
+
+async def main(turns: int):
+    lg.setLevel(logging.WARNING)
+    random.seed(1)
+    state = await build_world()
+    per_turn, chars = await measure_turns(state, turns, compact_json=False)
+    compact_per_turn, compact_chars = await measure_turns(state, turns, compact_json=True)
+    render = measure_static_render(turns)
+    print(f"Ходов: {turns}, игроков: {PLAYERS}, локаций в группе: {len(ROOMS) + 1}")
+    print(f"Сборка промптов хода: {per_turn * 1e6:,.1f} мкс, {chars:,} симв.")
+    print(f"С компактным JSON состояния: {compact_per_turn * 1e6:,.1f} мкс, {compact_chars:,} симв. "
+          f"(-{chars - compact_chars:,})")
+    print(f"Рендер статических разделов ({PROMPT_BUILDER.static_chars:,} симв.), "
+          f"если бы он шел на каждом ходу: {render * 1e6:,.1f} мкс")
+
+
+if __name__ == "__main__":
+    trio.run(main, int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -35,6 +35,7 @@ class ClientEngine:
         self.keyboard_handler: 'KeyboardHandler' = KeyboardHandler(self)
         self.layout_manager = LayoutManager(self.model)
         self.state_handler: Optional['states.BaseState'] = None
+        self.is_resuming = False
 
         lg.info(f"Движок клиента инициализирован для подключения к {host}:{port}")
 
@@ -59,17 +60,31 @@ class ClientEngine:
         """Делегирует отправку сообщения сетевому обработчику."""
         await self.network_handler.send_message(message)
 
-    async def run(self):
+    @property
+    def can_resume(self) -> bool:
+        return self.network_handler.can_resume
+
+    async def run(self, resume: bool = False) -> bool:
+        """
+        Подключается и обслуживает сессию до ее завершения.
+        С resume=True возобновляет прежнюю сессию, сохраняя состояние и журналы.
+        Возвращает True, если соединение было установлено.
+        """
+        self.stop_event = trio.Event()
+        self.nursery = None
+        self.is_resuming = resume
+        previous_state = self.model.current_state_class
         try:
-            if not await self.network_handler.connect():
-                return
+            if not await self.network_handler.connect(resume=resume):
+                return False
 
             self.console.clear()
 
             with Live(console=self.console, screen=True, auto_refresh=False,
                       refresh_per_second=30, transient=True, vertical_overflow="visible") as live:
                 self.live = live
-                self.change_state(states.LobbyState)
+                self.change_state(previous_state if resume else states.LobbyState)
+                self.is_resuming = False
 
                 async with trio.open_nursery() as nursery:
                     self.nursery = nursery
@@ -77,10 +92,12 @@ class ClientEngine:
                     nursery.start_soon(self.keyboard_handler.run_input_loop)
                     await self.stop_event.wait()
                     nursery.cancel_scope.cancel()
+            return True
 
         except Exception as e:
             if not isinstance(e, trio.Cancelled):
                 self.console.print(f"[bold red]Произошла непредвиденная ошибка: {e}[/bold red]")
                 lg.error("Критическая ошибка в ClientEngine.run", exc_info=True)
+            return False
         finally:
             await self.network_handler.close()
@@ -4,6 +4,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import trio
 
+import utils
 from engine import ClientEngine
 from logger import lg
 from utils import confirm, get_valid_ip, get_valid_port, console
@@ -14,6 +15,16 @@ async def run_session():
     server_port = await get_valid_port()
     engine = ClientEngine(host=server_ip, port=server_port)
     await engine.run()
+
+    attempt = 0
+    while engine.can_resume and attempt < utils.RECONNECT_ATTEMPTS:
+        delay = min(utils.RECONNECT_BASE_DELAY * 2 ** attempt, utils.RECONNECT_MAX_DELAY)
+        attempt += 1
+        console.print(f"[bold yellow]Переподключение через {delay} с "
+                      f"(попытка {attempt} из {utils.RECONNECT_ATTEMPTS})...[/bold yellow]")
+        await trio.sleep(delay)
+        if await engine.run(resume=True):
+            attempt = 0
     console.print("\n[bold yellow]Сессия завершена.[/bold yellow]")
 
 
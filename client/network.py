@@ -6,6 +6,10 @@ from rich.text import Text
 import states, utils
 from engine import ClientEngine
 from logger import lg
+from protocol.compression import InflateStream, StreamCompressor, available_compressions
+from protocol.reader import StreamReader
+from protocol.wire import (HELLO_PREFIX, Frame, FrameType, Message, ProtocolError, TextProtocol, available_codecs,
+                           build_hello, control_nonce, protocol_from_reply)
 
 
 class NetworkHandler:
@@ -15,10 +19,24 @@ class NetworkHandler:
         self.engine = engine
         self.stream: Optional[trio.SocketStream] = None
         self._is_closing = False
-        self._receive_buffer = ""
-
-    async def connect(self) -> bool:
-        """Устанавливает TCP-соединение и выполняет последовательность входа."""
+        self._reader: Optional[StreamReader] = None
+        self.protocol = TextProtocol()
+        self._compressor: Optional[StreamCompressor] = None
+        self._send_lock = trio.Lock()
+        self.resume_token: Optional[str] = None
+        self.last_seq = 0
+        self.connection_lost = False
+
+    @property
+    def can_resume(self) -> bool:
+        """Соединение оборвалось не по воле пользователя, и сервер выдал токен возобновления."""
+        return self.connection_lost and self.resume_token is not None
+
+    async def connect(self, resume: bool = False) -> bool:
+        """Устанавливает TCP-соединение и выполняет вход или возобновление прежней сессии."""
+        self._is_closing = False
+        self.protocol = TextProtocol()
+        self._compressor = None
         try:
             self.engine.console.print(f"Подключение к {self.engine.host}:{self.engine.port}...")
             with trio.move_on_after(60):
@@ -26,54 +44,123 @@ class NetworkHandler:
             if not self.stream:
                 self.engine.console.print("[bold red]Не удалось подключиться: Таймаут[/bold red]")
                 return False
+            self._reader = StreamReader(self.stream, max_frame_size=utils.MAX_FRAME_SIZE)
             self.engine.model.is_connected = True
         except OSError as e:
             lg.warning(f"Ошибка подключения к серверу: {e}", exc_info=True)
             self.engine.console.print(f"[bold red]Не удалось подключиться к серверу: {e.strerror}[/bold red]")
             return False
 
-        self.engine.change_state(states.LoginState)
-        return await self._login_sequence()
+        if resume:
+            success = await self._resume_sequence()
+        else:
+            self.engine.change_state(states.LoginState)
+            success = await self._login_sequence()
+        if success:
+            self.connection_lost = False
+        return success
 
     async def _login_sequence(self) -> bool:
         from ui.widgets.logo import LogoWidget
 
         prompt_message = await self._read_message()
-        if prompt_message is None or not prompt_message.startswith("PROMPT"):
+        if prompt_message is None or prompt_message.prefix != "PROMPT":
             self.engine.console.print("[bold red]Не удалось получить приглашение от сервера.[/bold red]")
             return False
 
-        _, content = prompt_message.split(' ', 1)
+        content = prompt_message.content
         self.engine.console.print(LogoWidget(self.engine.model).render())
         username_to_send = ""
         while not username_to_send:
             username_to_send = await utils.get_rich_input(Text(content, style="bold blue").__str__())
 
+        # Номер стола уходит вместе с HELLO, чтобы многопроцессный сервер сразу выбрал нужный воркер.
+        parts = username_to_send.split()
+        route = parts[1] if len(parts) > 1 else None
+        if utils.PREFER_FRAMED_PROTOCOL and not await self._negotiate_protocol(route):
+            return False
         await self.send_message(username_to_send)
         response = await self._read_message()
         if response is None: return False
 
-        if response.startswith("WELCOME"):
-            self.engine.model.username = response.split(' ', 1)[1].strip()
+        if response.prefix == "WELCOME":
+            self.engine.model.username = response.content.strip()
             self.engine.model.lobby_messages.append(Text(f"Добро пожаловать, {self.engine.model.username}!", style="bold green"))
             return True
         else:
-            self.engine.console.print(f"[bold red]Ошибка входа: {response}[/bold red]")
+            self.engine.console.print(f"[bold red]Ошибка входа: {response.text}[/bold red]")
             return False
 
+    async def _resume_sequence(self) -> bool:
+        """Вместо имени предъявляет токен и номер последнего полученного кадра; сервер дошлет пропущенное."""
+        prompt_message = await self._read_message()
+        if prompt_message is None or prompt_message.prefix != "PROMPT":
+            return False
+        if not await self._negotiate_protocol(self.resume_token):
+            return False
+        if not self.protocol.framed:
+            self.resume_token = None
+            return False
+
+        await self.send_message(f"RESUME {self.resume_token} {self.last_seq}")
+        response = await self._read_message()
+        if response is None: return False
+        if response.prefix == "WELCOME":
+            lg.info(f"Сессия возобновлена после кадра #{self.last_seq}.")
+            return True
+        self.resume_token = None
+        self.engine.console.print(f"[bold red]Не удалось восстановить сессию: {response.text}[/bold red]")
+        return False
+
+    async def _negotiate_protocol(self, route: Optional[str] = None) -> bool:
+        """
+        Предлагает серверу кадровый протокол и переключается на него, если сервер согласен.
+        route — подсказка маршрутизации (стол или токен возобновления) для многопроцессного сервера.
+        """
+        compressions = available_compressions() if utils.PREFER_COMPRESSION else []
+        await self.send_message(build_hello(available_codecs(), compressions, route))
+        reply = await self._read_message()
+        if reply is None:
+            return False
+        if reply.prefix != HELLO_PREFIX:
+            self.engine.console.print(f"[bold red]Сервер не поддерживает согласование протокола: {reply.text}[/bold red]")
+            return False
+        try:
+            protocol = protocol_from_reply(reply.text)
+        except ProtocolError as e:
+            lg.warning(f"Некорректный ответ на HELLO: {e}")
+            protocol = None
+        if protocol:
+            self.protocol = protocol
+            if protocol.compression:
+                self._reader.stream = InflateStream(self._reader.stream)
+                self._compressor = StreamCompressor()
+            lg.info(f"Согласован протокол '{protocol.name}'.")
+        else:
+            lg.info("Сервер оставил текстовый протокол.")
+        return True
+
     async def run_message_loop(self):
         """Основной цикл для получения и обработки сообщений от сервера."""
         try:
             while not self.engine.stop_event.is_set():
-                message_str = await self._read_message()
-                if message_str is None: break
+                message = None
+                with trio.move_on_after(utils.SERVER_SILENCE_TIMEOUT if self.protocol.framed else float('inf')) as silence:
+                    message = await self._read_message()
+                if silence.cancelled_caught:
+                    lg.warning(f"Сервер молчит дольше {utils.SERVER_SILENCE_TIMEOUT} с, соединение считается потерянным.")
+                if message is None:
+                    self.connection_lost = True
+                    break
 
                 try:
-                    parts = message_str.split(' ', 1)
-                    prefix, content = parts[0].strip("[]"), parts[1] if len(parts) > 1 else ""
+                    prefix, content = message.prefix.strip("[]"), message.content
+                    if prefix == "SESSION":
+                        self.resume_token = content
+                        continue
 
                     if prefix != "NARRATE":
-                        lg.debug(f"Получено сообщение: {message_str}")
+                        lg.debug(f"Получено сообщение: {message.text}")
 
                     if self.engine.state_handler:
                         await self.engine.state_handler.handle_message(prefix, content)
@@ -82,13 +169,14 @@ class NetworkHandler:
                     self.engine.update_display()
 
                 except Exception as e:
-                    lg.error(f"Ошибка при обработке сообщения '{message_str}': {e}", exc_info=True)
+                    lg.error(f"Ошибка при обработке сообщения '{message.text}': {e}", exc_info=True)
                     log_target = self.engine.model.game_log if isinstance(self.engine.state_handler, states.GameState) else self.engine.model.lobby_messages
                     log_target.append(Text("[ОШИБКА КЛИЕНТА] Не удалось обработать сообщение.", style="bold red"))
                     self.engine.update_display()
 
         except trio.BrokenResourceError:
             lg.warning("Соединение с сервером разорвано.")
+            self.connection_lost = True
         finally:
             if not self._is_closing:
                 self.engine.console.print("\n[bold red]Соединение с сервером потеряно.[/bold red]")
@@ -96,22 +184,33 @@ class NetworkHandler:
             self.engine.stop_event.set()
 
     async def send_message(self, message: str):
+        lg.debug(f"Отправка сообщения: {message}")
+        await self._send_encoded(self.protocol.encode(message))
+
+    async def _send_encoded(self, data: bytes):
         if self.stream and not self._is_closing:
-            lg.debug(f"Отправка сообщения: {message}")
-            await self.stream.send_all(f"{message}\n".encode('utf-8'))
-
-    async def _read_message(self) -> Optional[str]:
-        if not self.stream: return None
-        while '\n' not in self._receive_buffer:
-            try:
-                data = await self.stream.receive_some(4096)
-                if not data:
-                    lg.warning("Соединение закрыто сервером (получены пустые данные).")
-                    return None
-                self._receive_buffer += data.decode('utf-8', errors='ignore')
-            except (trio.BrokenResourceError, trio.ClosedResourceError):
-                return None
-        message, _, self._receive_buffer = self._receive_buffer.partition('\n')
+            async with self._send_lock:
+                if self._compressor:
+                    data = self._compressor.compress(data)
+                await self.stream.send_all(data)
+
+    async def _on_control(self, frame: Frame):
+        if frame.type == FrameType.PING:
+            await self._send_encoded(self.protocol.encode_control(FrameType.PONG, control_nonce(frame)))
+
+    async def _read_message(self) -> Optional[Message]:
+        if not self._reader: return None
+        try:
+            message = await self.protocol.read_message(self._reader, on_control=self._on_control)
+        except (trio.BrokenResourceError, trio.ClosedResourceError):
+            return None
+        except ProtocolError as e:
+            lg.error(f"Нарушение протокола со стороны сервера: {e}")
+            return None
+        if message is None:
+            lg.warning("Соединение закрыто сервером (получены пустые данные).")
+        elif message.seq is not None:
+            self.last_seq = message.seq
         return message
 
     async def close(self):
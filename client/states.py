@@ -1,6 +1,6 @@
 import json
 from abc import ABC, abstractmethod
-from typing import Optional, Set, TYPE_CHECKING
+from typing import Any, Optional, Set, TYPE_CHECKING
 
 import trio
 from rich.box import ROUNDED
@@ -17,6 +17,11 @@ if TYPE_CHECKING:
 LOBBY_IGNORED_COMMANDS: Set[str] = {"NARRATION_END", "THINK_START", "STATE_THINK_START"}
 
 
+def _load_payload(content: Any) -> Any:
+    """В текстовом протоколе данные приходят строкой JSON, в кадровом — уже декодированными."""
+    return json.loads(content) if isinstance(content, str) else content
+
+
 class BaseState(ABC):
     def __init__(self, engine: 'ClientEngine'):
         self.engine = engine
@@ -61,6 +66,11 @@ class LobbyState(BaseState):
             self.engine.console.clear()
             live.start(refresh=True)
 
+        if self.engine.is_resuming:
+            self.model.lobby_messages.append(Text("Соединение восстановлено.", style="bold green"))
+            super().enter(live)
+            return
+
         self.model.lobby_messages.clear()
 
         if self.model.username:
@@ -118,6 +128,11 @@ class GameState(BaseState):
             self.engine.console.clear()
             live.start(refresh=True)
 
+        if self.engine.is_resuming:
+            self.model.game_log.append(Text("Соединение восстановлено.", style="bold green"))
+            super().enter(live)
+            return
+
         self.model.game_log.clear()
         self.model.game_log.append(Text.from_markup("[bold green]Игра началась![/bold green]"))
         self.model.game_log.append(
@@ -150,21 +165,20 @@ class GameState(BaseState):
 
         try:
             if prefix == "STATUS_UPDATE":
-                self.model.command_output = render_status(json.loads(content))
+                self.model.command_output = render_status(_load_payload(content))
                 return
             if prefix == "HELP_UPDATE":
                 self.model.command_output = render_help()
                 return
             if prefix == "MAP_UPDATE":
-                self.model.command_output = render_map(json.loads(content))
+                self.model.command_output = render_map(_load_payload(content))
                 return
         except (json.JSONDecodeError, TypeError):
             self.model.command_output = Text("Ошибка отображения данных: неверный формат от сервера.", style="bold red")
             return
 
         if prefix == "CMD_RESULT":
-            clean_content = content.replace('<<BR>>', '\n')
-            self.model.command_output = Text.from_markup(f"[dim yellow]{clean_content}[/dim yellow]")
+            self.model.command_output = Text.from_markup(f"[dim yellow]{content}[/dim yellow]")
             return
 
         if prefix == "LOBBY_UPDATE":
@@ -186,15 +200,14 @@ class GameState(BaseState):
             else:
                 self.model.game_log.append(Text.from_markup(f"[dim yellow]{content}[/dim yellow]"))
         elif prefix == "NARRATE":
-            clean_content = content.replace('<<BR>>', '\n')
             last_message = self.model.game_log[-1] if self.model.game_log else None
             if (isinstance(last_message, Panel) and
                     last_message.title == "[bold purple]:scroll: Рассказчик[/]" and
                     isinstance(last_message.renderable, Text)):
-                last_message.renderable.append(clean_content)
+                last_message.renderable.append(content)
             else:
                 narrator_panel = Panel(
-                    Text(clean_content, style="italic cyan"),
+                    Text(content, style="italic cyan"),
                     title="[bold purple]:scroll: Рассказчик[/]", border_style="purple", box=ROUNDED, expand=False
                 )
                 self.model.game_log.append(narrator_panel)
@@ -9,6 +9,14 @@ from logger import lg
 
 console = Console()
 DEFAULT_PORT = 65432
+PREFER_FRAMED_PROTOCOL = True
+PREFER_COMPRESSION = True
+MAX_FRAME_SIZE = 1024 * 1024
+RECONNECT_ATTEMPTS = 5
+RECONNECT_BASE_DELAY = 1
+RECONNECT_MAX_DELAY = 15
+# Сервер шлет PING каждые 15 с; если за это время не пришло ничего, соединение считается мертвым.
+SERVER_SILENCE_TIMEOUT = 45
 
 PHRASES = [
     "Время замедлило ход...", "Здесь что-то не так...", "Напряжение нарастает...", "Повеяло холодом...",
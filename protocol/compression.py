@@ -0,0 +1,67 @@
+import zlib
+from typing import List, Optional
+
+import trio
+
+from protocol.errors import ProtocolError
+
+COMPRESSION_DEFLATE = 'deflate'
+
+
+def available_compressions() -> List[str]:
+    return [COMPRESSION_DEFLATE]
+
+
+class StreamCompressor:
+    """
+    Потоковое сжатие deflate с одним контекстом на соединение.
+    Словарь сохраняется между сообщениями, а Z_SYNC_FLUSH после каждой порции
+    позволяет получателю распаковать ее сразу, не дожидаясь конца потока.
+    """
+
+    def __init__(self, level: int = 6):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def compress(self, data: bytes) -> bytes:
+        compressed = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        self.bytes_in += len(data)
+        self.bytes_out += len(compressed)
+        return compressed
+
+
+class InflateStream(trio.abc.ReceiveStream):
+    """
+    Обертка над входящим потоком, распаковывающая данные, сжатые StreamCompressor.
+    Объем распакованных данных за один вызов ограничен max_bytes, так что небольшой
+    сжатый блок не может разом раздуть буфер читателя.
+    """
+
+    def __init__(self, stream: trio.abc.ReceiveStream, chunk_size: int = 4096):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    async def receive_some(self, max_bytes: Optional[int] = None) -> bytes:
+        limit = max_bytes or self.chunk_size
+        while True:
+            if self._decompressor.unconsumed_tail:
+                raw = self._decompressor.unconsumed_tail
+            else:
+                raw = await self.stream.receive_some(self.chunk_size)
+                if not raw:
+                    return b""
+                self.bytes_in += len(raw)
+            try:
+                data = self._decompressor.decompress(raw, limit)
+            except zlib.error as e:
+                raise ProtocolError(f"Поврежденный сжатый поток: {e}") from e
+            if data:
+                self.bytes_out += len(data)
+                return data
+
+    async def aclose(self):
+        await self.stream.aclose()
@@ -0,0 +1,6 @@
+class ProtocolError(Exception):
+    """Удаленная сторона нарушила формат протокола."""
+
+
+class FrameTooLargeError(ProtocolError):
+    """Сообщение или кадр превышает допустимый размер."""
@@ -0,0 +1,79 @@
+from typing import Optional
+
+import trio
+
+from protocol.errors import FrameTooLargeError
+
+DEFAULT_MAX_FRAME_SIZE = 1024 * 1024
+
+
+class StreamReader:
+    """
+    Буферизованное чтение строк и кадров фиксированной длины из потока trio.
+
+    Принятые данные складываются в растущий bytearray без перекодирования; прочитанная часть
+    отсекается смещением и удаляется из буфера пакетно, а готовые сообщения вырезаются через
+    memoryview. Декодирование выполняется только над целым сообщением, поэтому многобайтовый
+    символ UTF-8, разрезанный границей receive_some, не теряется.
+    """
+
+    def __init__(self, stream: trio.abc.ReceiveStream, max_frame_size: int = DEFAULT_MAX_FRAME_SIZE,
+                 chunk_size: int = 4096):
+        self.stream = stream
+        self.max_frame_size = max_frame_size
+        self.chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._start = 0
+        self._scanned = 0
+        self.bytes_received = 0
+
+    def feed(self, data: bytes):
+        """Добавляет в буфер байты, уже прочитанные из потока кем-то другим (например, маршрутизатором)."""
+        self._buffer += data
+        self.bytes_received += len(data)
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer) - self._start
+
+    async def _fill(self) -> bool:
+        data = await self.stream.receive_some(self.chunk_size)
+        if not data:
+            return False
+        self.bytes_received += len(data)
+        if self._start and self._start * 2 >= len(self._buffer):
+            del self._buffer[:self._start]
+            self._scanned -= self._start
+            self._start = 0
+        self._buffer += data
+        return True
+
+    def _consume(self, end: int, skip: int = 0) -> bytes:
+        data = bytes(memoryview(self._buffer)[self._start:end])
+        self._start = end + skip
+        if self._start == len(self._buffer):
+            self._buffer.clear()
+            self._start = 0
+        self._scanned = self._start
+        return data
+
+    async def read_line(self) -> Optional[bytes]:
+        """Возвращает байты до перевода строки (без него) или None, если поток закрыт."""
+        while (pos := self._buffer.find(b'\n', self._scanned)) == -1:
+            self._scanned = len(self._buffer)
+            if self.buffered > self.max_frame_size:
+                raise FrameTooLargeError(f"Строка длиннее {self.max_frame_size} байт.")
+            if not await self._fill():
+                return None
+        if pos - self._start > self.max_frame_size:
+            raise FrameTooLargeError(f"Строка длиннее {self.max_frame_size} байт.")
+        return self._consume(pos, skip=1)
+
+    async def read_exactly(self, size: int) -> Optional[bytes]:
+        """Возвращает ровно size байт или None, если поток закрылся раньше."""
+        if size > self.max_frame_size:
+            raise FrameTooLargeError(f"Кадр размером {size} байт превышает лимит {self.max_frame_size} байт.")
+        while self.buffered < size:
+            if not await self._fill():
+                return None
+        return self._consume(self._start + size)
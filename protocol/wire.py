@@ -0,0 +1,277 @@
+"""
+Сетевой протокол AI Quest, общий для сервера и клиента.
+
+Поддерживаются два режима передачи:
+  * текстовый — одно сообщение на строку, переносы строк внутри сообщения экранируются как <<BR>>;
+  * кадровый — каждое сообщение передается кадром с типизированным заголовком фиксированной длины
+    и полезной нагрузкой заранее известной длины, поэтому экранирование не требуется.
+
+Кадровый режим согласуется во время входа: получив PROMPT, клиент отправляет строку
+`HELLO <версия> <кодеки> [<сжатие>]`, сервер отвечает `HELLO <версия> <кодек> [<сжатие>]`, и с этого
+момента обе стороны обмениваются кадрами, при необходимости поверх потока deflate.
+Ответ с версией 0 означает, что соединение остается текстовым. Необязательное последнее поле
+`@<стол или токен>` подсказывает многопроцессному серверу, какому воркеру передать соединение.
+Клиенты, не отправившие HELLO, работают по текстовому протоколу без изменений.
+
+После входа в кадровом режиме сервер выдает токен сообщением `SESSION <токен>` и нумерует
+все последующие кадры (флаг FLAG_SEQUENCED). После обрыва клиент вместо имени отправляет
+`RESUME <токен> <номер последнего полученного кадра>` и получает только пропущенные кадры.
+Служебные кадры PING/PONG не нумеруются и не попадают в поток сообщений.
+"""
+import json
+import struct
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from protocol.compression import available_compressions
+from protocol.errors import ProtocolError
+from protocol.reader import StreamReader
+
+PROTOCOL_VERSION = 1
+HELLO_PREFIX = "HELLO"
+ROUTE_HINT_PREFIX = "@"
+LINE_BREAK_ESCAPE = "<<BR>>"
+
+# Заголовок кадра: версия, тип кадра, кодек нагрузки, флаги, длина нагрузки.
+FRAME_HEADER = struct.Struct('!BBBBI')
+# Если выставлен FLAG_SEQUENCED, за заголовком следует порядковый номер кадра в сессии игрока.
+SEQUENCE = struct.Struct('!I')
+FLAG_SEQUENCED = 0x01
+_SEQUENCED_HEADER = struct.Struct(FRAME_HEADER.format + SEQUENCE.format.lstrip('!'))
+# Нагрузка PING/PONG: номер запроса, который отвечающая сторона возвращает без изменений.
+PING_PAYLOAD = struct.Struct('!Q')
+
+
+class FrameType(IntEnum):
+    MESSAGE = 1
+    PING = 2
+    PONG = 3
+
+
+CONTROL_FRAMES = {FrameType.PING, FrameType.PONG}
+
+
+class Codec(IntEnum):
+    UTF8 = 0
+    JSON = 1
+    MSGPACK = 2
+
+
+CODEC_NAMES = {Codec.JSON: 'json', Codec.MSGPACK: 'msgpack'}
+CODECS_BY_NAME = {name: codec for codec, name in CODEC_NAMES.items()}
+
+
+class Message(NamedTuple):
+    """Разобранное сообщение: префикс команды, содержимое (строка или структурированные данные) и номер кадра."""
+    prefix: str
+    content: Any = ""
+    seq: Optional[int] = None
+
+    @classmethod
+    def from_text(cls, text: str, seq: Optional[int] = None) -> 'Message':
+        prefix, _, content = text.partition(' ')
+        return cls(prefix, content, seq)
+
+    @property
+    def text(self) -> str:
+        if self.content == "":
+            return self.prefix
+        content = self.content if isinstance(self.content, str) else json.dumps(self.content, ensure_ascii=False)
+        return f"{self.prefix} {content}"
+
+
+class Frame(NamedTuple):
+    type: int
+    codec: int
+    flags: int
+    payload: bytes
+    seq: Optional[int] = None
+
+
+ControlHandler = Callable[[Frame], Awaitable[None]]
+
+
+def available_codecs() -> List[str]:
+    """Возвращает имена поддерживаемых кодеков структурированной нагрузки в порядке предпочтения."""
+    return ['msgpack', 'json'] if msgpack is not None else ['json']
+
+
+def _dump(codec: Codec, data: Any) -> bytes:
+    if codec == Codec.MSGPACK:
+        return msgpack.packb(data, use_bin_type=True)
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+def _load(codec: int, payload: bytes) -> Any:
+    if codec == Codec.MSGPACK:
+        if msgpack is None:
+            raise ProtocolError("Получен кадр msgpack, но модуль msgpack не установлен.")
+        return msgpack.unpackb(payload, raw=False)
+    if codec == Codec.JSON:
+        return json.loads(payload)
+    raise ProtocolError(f"Неизвестный кодек нагрузки: {codec}")
+
+
+class TextProtocol:
+    """Исходный построчный протокол. Используется до согласования и как запасной вариант."""
+    name = 'text'
+    framed = False
+
+    def encode(self, message: str) -> bytes:
+        return (message.replace('\n', LINE_BREAK_ESCAPE) + '\n').encode('utf-8')
+
+    def encode_payload(self, prefix: str, data: Any) -> bytes:
+        return self.encode(f"{prefix} {json.dumps(data, ensure_ascii=False)}")
+
+    async def read_message(self, reader: StreamReader, on_control: Optional[ControlHandler] = None) -> Optional[Message]:
+        line = await reader.read_line()
+        if line is None:
+            return None
+        text = line.decode('utf-8', errors='ignore').replace(LINE_BREAK_ESCAPE, '\n')
+        return Message.from_text(text.rstrip('\r'))
+
+
+class FramedProtocol:
+    """Кадровый протокол с префиксом длины. Структурированные данные кодируются выбранным кодеком."""
+    framed = True
+
+    def __init__(self, codec: Codec = Codec.JSON, compression: Optional[str] = None):
+        self.codec = codec
+        self.compression = compression
+        self.name = f"framed/{CODEC_NAMES[codec]}" + (f"+{compression}" if compression else "")
+
+    def _pack(self, frame_type: FrameType, codec: Codec, payload: bytes, flags: int = 0) -> bytes:
+        return FRAME_HEADER.pack(PROTOCOL_VERSION, frame_type, codec, flags, len(payload)) + payload
+
+    def encode(self, message: str) -> bytes:
+        return self._pack(FrameType.MESSAGE, Codec.UTF8, message.encode('utf-8'))
+
+    def encode_payload(self, prefix: str, data: Any) -> bytes:
+        return self._pack(FrameType.MESSAGE, self.codec, _dump(self.codec, [prefix, data]))
+
+    def encode_control(self, frame_type: FrameType, nonce: int) -> bytes:
+        return self._pack(frame_type, Codec.UTF8, PING_PAYLOAD.pack(nonce))
+
+    async def read_frame(self, reader: StreamReader) -> Optional[Frame]:
+        header = await reader.read_exactly(FRAME_HEADER.size)
+        if header is None:
+            return None
+        version, frame_type, codec, flags, length = FRAME_HEADER.unpack(header)
+        if version != PROTOCOL_VERSION:
+            raise ProtocolError(f"Неподдерживаемая версия кадра: {version}")
+        seq = None
+        if flags & FLAG_SEQUENCED:
+            raw_seq = await reader.read_exactly(SEQUENCE.size)
+            if raw_seq is None:
+                return None
+            seq = SEQUENCE.unpack(raw_seq)[0]
+        payload = await reader.read_exactly(length)
+        if payload is None:
+            return None
+        return Frame(frame_type, codec, flags, payload, seq)
+
+    async def read_message(self, reader: StreamReader, on_control: Optional[ControlHandler] = None) -> Optional[Message]:
+        """Читает следующее сообщение. Служебные кадры PING/PONG по пути передаются в on_control."""
+        while True:
+            frame = await self.read_frame(reader)
+            if frame is None:
+                return None
+            if frame.type == FrameType.MESSAGE:
+                break
+            if frame.type in CONTROL_FRAMES and on_control is not None:
+                await on_control(frame)
+                continue
+            raise ProtocolError(f"Неизвестный тип кадра: {frame.type}")
+        if frame.codec == Codec.UTF8:
+            return Message.from_text(frame.payload.decode('utf-8', errors='ignore'), frame.seq)
+        decoded = _load(frame.codec, frame.payload)
+        if not (isinstance(decoded, list) and len(decoded) == 2 and isinstance(decoded[0], str)):
+            raise ProtocolError("Структурированный кадр должен содержать пару [префикс, данные].")
+        return Message(decoded[0], decoded[1], frame.seq)
+
+
+def control_nonce(frame: Frame) -> int:
+    """Извлекает номер запроса из кадра PING/PONG."""
+    if len(frame.payload) != PING_PAYLOAD.size:
+        raise ProtocolError(f"Некорректная длина служебного кадра: {len(frame.payload)}")
+    return PING_PAYLOAD.unpack(frame.payload)[0]
+
+
+class SequencedFrame(NamedTuple):
+    """
+    Пронумерованный кадр: собственный заголовок получателя с номером и нагрузка, общая для всех
+    получателей закодированного один раз кадра. На провод части уходят подряд.
+    """
+    header: bytes
+    payload: memoryview
+
+    @property
+    def size(self) -> int:
+        return len(self.header) + len(self.payload)
+
+
+def sequence_frame(frame: bytes, seq: int) -> SequencedFrame:
+    """Нумерует готовый кадр номером seq. Заново собирается только заголовок, нагрузка не копируется."""
+    version, frame_type, codec, flags, length = FRAME_HEADER.unpack_from(frame)
+    header = _SEQUENCED_HEADER.pack(version, frame_type, codec, flags | FLAG_SEQUENCED, length, seq)
+    return SequencedFrame(header, memoryview(frame)[FRAME_HEADER.size:])
+
+
+def build_hello(codecs: Sequence[str], compressions: Sequence[str] = (), route: Optional[str] = None) -> str:
+    """
+    Строка предложения клиента: версия протокола, кодеки и варианты сжатия в порядке предпочтения.
+    route — подсказка маршрутизации (номер стола или токен возобновления) для многопроцессного сервера.
+    """
+    line = f"{HELLO_PREFIX} {PROTOCOL_VERSION} {','.join(codecs)}"
+    if compressions:
+        line = f"{line} {','.join(compressions)}"
+    return f"{line} {ROUTE_HINT_PREFIX}{route}" if route else line
+
+
+def hello_route(line: str) -> Optional[str]:
+    """Возвращает подсказку маршрутизации из строки HELLO, если клиент ее передал."""
+    return next((part[len(ROUTE_HINT_PREFIX):] for part in line.split()[2:] if part.startswith(ROUTE_HINT_PREFIX)), None)
+
+
+def parse_hello(line: str) -> Tuple[int, List[str], List[str]]:
+    parts = [part for part in line.split() if not part.startswith(ROUTE_HINT_PREFIX)]
+    if len(parts) < 2 or parts[0] != HELLO_PREFIX or not parts[1].isdigit():
+        raise ProtocolError(f"Некорректное приветствие: '{line}'")
+    codecs = parts[2].split(',') if len(parts) > 2 else []
+    compressions = parts[3].split(',') if len(parts) > 3 else []
+    return int(parts[1]), codecs, compressions
+
+
+def negotiate(offer: str, allow_compression: bool = True) -> Tuple[Optional[FramedProtocol], str]:
+    """
+    Выбирает протокол по предложению клиента.
+    Возвращает (протокол или None для текстового режима, строка ответа клиенту).
+    """
+    try:
+        version, offered_codecs, offered_compressions = parse_hello(offer)
+    except ProtocolError:
+        return None, f"{HELLO_PREFIX} 0 text"
+    supported = set(available_codecs())
+    codec_name = next((name for name in offered_codecs if name in supported), None)
+    if version != PROTOCOL_VERSION or codec_name is None:
+        return None, f"{HELLO_PREFIX} 0 text"
+
+    compression = None
+    if allow_compression:
+        compression = next((name for name in offered_compressions if name in available_compressions()), None)
+    protocol = FramedProtocol(CODECS_BY_NAME[codec_name], compression)
+    return protocol, build_hello([codec_name], [compression] if compression else [])
+
+
+def protocol_from_reply(reply: str) -> Optional[FramedProtocol]:
+    """Разбирает ответ сервера на HELLO. Возвращает None, если сервер оставил текстовый режим."""
+    version, codecs, compressions = parse_hello(reply)
+    if version != PROTOCOL_VERSION or not codecs or codecs[0] not in CODECS_BY_NAME:
+        return None
+    compression = compressions[0] if compressions and compressions[0] in available_compressions() else None
+    return FramedProtocol(CODECS_BY_NAME[codecs[0]], compression)
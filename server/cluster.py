@@ -0,0 +1,361 @@
+"""
+Многопроцессный режим сервера.
+
+Лаунчер один раз привязывает слушающий сокет и порождает N воркеров через fork. Каждый воркер —
+полноценный Server со своим event loop и своим набором игровых столов. Соединения принимает
+легкий фронт: он отправляет приглашение, читает первую строку клиента и по ней выбирает воркер,
+после чего передает сам сокет (SCM_RIGHTS) вместе с уже прочитанными байтами. Дальше фронт
+в обмене не участвует.
+
+Маршрутизация:
+  * токен возобновления начинается с номера воркера (`<k>.`);
+  * автоматические номера столов имеют вид `w<k>t<n>`;
+  * произвольный номер стола, выбранный игроком, закрепляется за воркером по хешу;
+  * игроки без подсказки распределяются партиями по MAX_PLAYERS, чтобы подряд пришедшие
+    оказывались на одном воркере и могли сесть за один стол.
+
+SO_REUSEPORT здесь не подходит: ядро распределяет соединения по хешу адресов и портов клиента
+и ничего не знает о столах, так что игроки одного стола попадали бы в разные процессы.
+"""
+import array
+import json
+import os
+import re
+import socket
+import zlib
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+
+import trio
+
+import config
+from game.story_packs import STORY_LIBRARY
+from handlers.admin import AdminConsole, console
+from handlers.player import LOGIN_PROMPT
+from logger import lg
+from protocol.wire import HELLO_PREFIX, TextProtocol, hello_route
+
+if TYPE_CHECKING:
+    from main import Server
+
+CHANNEL_CONNECTION = b"C"
+CHANNEL_ADMIN = b"A"
+# Запрос фронта к воркерам и ответ воркера: JSON с полем id, по которому фронт сопоставляет ответы.
+CHANNEL_QUERY = b"Q"
+CHANNEL_REPLY = b"R"
+QUERY_TIMEOUT = 5.0
+ROUTE_READ_SIZE = 4096
+# Фронт дочитывает первую строку, пока буфер не больше MAX_FRAME_SIZE, порциями по ROUTE_READ_SIZE,
+# и добавляет байт вида сообщения.
+CHANNEL_BUFFER_SIZE = config.MAX_FRAME_SIZE + ROUTE_READ_SIZE + len(CHANNEL_CONNECTION)
+FD_ANCILLARY_SIZE = socket.CMSG_SPACE(array.array('i').itemsize)
+_AUTO_SESSION_ID = re.compile(r'w(\d+)t\d+')
+
+
+def worker_session_prefix(worker_index: Optional[int]) -> str:
+    return "" if worker_index is None else f"w{worker_index}t"
+
+
+def worker_token_prefix(worker_index: Optional[int]) -> str:
+    return "" if worker_index is None else f"{worker_index}."
+
+
+def route_hint(first_line: str) -> Optional[str]:
+    """Извлекает подсказку маршрутизации из первой строки клиента: HELLO с @-полем или `имя стол`."""
+    if first_line.startswith(f"{HELLO_PREFIX} "):
+        return hello_route(first_line)
+    parts = first_line.split()
+    return parts[1] if len(parts) > 1 else None
+
+
+def worker_for_hint(hint: str, worker_count: int) -> int:
+    worker, dot, _ = hint.partition('.')
+    if dot and worker.isdigit():
+        return int(worker) % worker_count
+    if match := _AUTO_SESSION_ID.fullmatch(hint):
+        return int(match.group(1)) % worker_count
+    return zlib.crc32(hint.encode('utf-8')) % worker_count
+
+
+class ClusterAdminConsole(AdminConsole):
+    """Админ-консоль фронта: команды выполняют воркеры, владеющие столами."""
+
+    def __init__(self, front: 'Front'):
+        self.server = front
+        self.front = front
+        lg.info("Админ-консоль кластера инициализирована.")
+
+    async def _handle_command(self, command_str: str):
+        parts = command_str.strip().split()
+        if not parts:
+            return
+        cmd, args = parts[0].lower(), parts[1:]
+        if cmd == '/help':
+            await self._cmd_help(args)
+        elif cmd in ('/start', '/clear') and args and args[0] not in STORY_LIBRARY:
+            await self.front.send_admin(command_str, worker_for_hint(args[0], len(self.front.channels)))
+        elif cmd == '/kick':
+            await self._cmd_kick(args)
+        elif cmd in ('/start', '/clear') and len(self.front.channels) > 1:
+            # Без номера стола каждый воркер с единственным столом принял бы команду на свой счет.
+            console.print(f"Использование: {cmd} [стол]{' [история]' if cmd == '/start' else ''} — "
+                          f"в кластере стол указывается явно, см. /sessions.", style="bold red")
+        else:
+            for index in range(len(self.front.channels)):
+                await self.front.send_admin(command_str, index)
+
+    async def _cmd_kick(self, args: list):
+        """
+        Имена игроков уникальны только в пределах воркера, поэтому фронт сначала спрашивает, у кого игрок
+        с таким именем, и исключает ровно одного: если совпадений несколько, нужно указать стол.
+        """
+        if not args:
+            console.print("Использование: /kick имя [стол]", style="bold red")
+            return
+        username, session_id = args[0], args[1] if len(args) > 1 else None
+        replies = await self.front.query({"find_player": username})
+        found = [(worker, reply["session"]) for worker, reply in enumerate(replies) if reply and reply.get("session")]
+        if session_id:
+            found = [(worker, session) for worker, session in found if session == session_id]
+        if not found:
+            where = f" за столом '{session_id}'" if session_id else ""
+            lg.warning(f"Попытка исключить несуществующего игрока '{username}'{where}.")
+            console.print(f"Игрок '{username}'{where} не найден.", style="bold red")
+        elif len(found) > 1:
+            console.print(f"Игрок '{username}' есть за несколькими столами: "
+                          f"{', '.join(session for _, session in found)}. Укажите стол: /kick {username} стол",
+                          style="bold red")
+        else:
+            await self.front.send_admin(f"/kick {username}", found[0][0])
+
+    async def _cmd_help(self, _args: list):
+        console.print(
+            f"[bold]Воркеров: {len(self.front.channels)}. Команды выполняются на воркерах:[/bold]\n"
+            "  /start стол [история] - Начать игру за столом (по умолчанию — прежняя история стола).\n"
+            "  /clear стол         - Сбросить игру за столом в состояние лобби.\n"
+            "  /sessions           - Показать столы каждого воркера.\n"
+            "  /stories            - Показать доступные истории.\n"
+            "  /prompts            - Перечитать шаблоны промптов.\n"
+            "  /cache [раскладка|reset] - Попадания в кэш префиксов API; сменить раскладку промпта.\n"
+            "  /say [сообщение]    - Отправить системное сообщение всем.\n"
+            "  /kick имя [стол]    - Исключить игрока (стол — если имя занято за несколькими столами).\n"
+            "  /net                - Показать RTT, трафик и отказы по лимитам.\n"
+            "  /help               - Показать это сообщение.\n",
+            style="bold cyan")
+
+
+class _PendingQuery:
+    """Ответы воркеров на один запрос фронта."""
+
+    def __init__(self, worker_count: int):
+        self.replies: List[Optional[Dict[str, Any]]] = [None] * worker_count
+        self.waiting = set(range(worker_count))
+        self.done = trio.Event()
+
+    def settle(self, worker: int, reply: Optional[Dict[str, Any]] = None):
+        """Записывает ответ воркера (None, если запрос ему не ушел) и перестает его ждать."""
+        if worker in self.waiting:
+            self.waiting.discard(worker)
+            self.replies[worker] = reply
+            if not self.waiting:
+                self.done.set()
+
+
+class Front:
+    """Принимает соединения и передает их воркерам, не разбирая протокол дальше первой строки."""
+
+    def __init__(self, host: str, port: int, listen_sock: socket.socket, channels: List[socket.socket]):
+        self.host = host
+        self.port = port
+        self.listen_sock = listen_sock
+        self.channels = [trio.socket.from_stdlib_socket(channel) for channel in channels]
+        self.nursery: Optional[trio.Nursery] = None
+        self.admin_console = ClusterAdminConsole(self)
+        self._auto_routed = 0
+        self._query_ids = count(1)
+        self._queries: Dict[int, _PendingQuery] = {}
+
+    async def run(self):
+        listener = trio.SocketListener(trio.socket.from_stdlib_socket(self.listen_sock))
+        async with trio.open_nursery() as nursery:
+            self.nursery = nursery
+            nursery.start_soon(self.admin_console.run)
+            for worker in range(len(self.channels)):
+                nursery.start_soon(self._read_replies, worker)
+            console.print(f"[bold green]Сервер слушает на {self.host}:{self.port} "
+                          f"({len(self.channels)} воркеров)[/bold green]")
+            await trio.serve_listeners(self._route, [listener])
+
+    def _pick_worker(self, first_line: str) -> int:
+        hint = route_hint(first_line)
+        if hint:
+            return worker_for_hint(hint, len(self.channels))
+        worker = (self._auto_routed // config.MAX_PLAYERS) % len(self.channels)
+        self._auto_routed += 1
+        return worker
+
+    async def _route(self, stream: trio.SocketStream):
+        peer = stream.socket.getpeername()
+        data = bytearray()
+        try:
+            await stream.send_all(TextProtocol().encode(f"PROMPT {LOGIN_PROMPT}"))
+            with trio.fail_after(30):
+                while b"\n" not in data and len(data) <= config.MAX_FRAME_SIZE:
+                    chunk = await stream.receive_some(ROUTE_READ_SIZE)
+                    if not chunk:
+                        break
+                    data += chunk
+        except (trio.TooSlowError, trio.BrokenResourceError, trio.ClosedResourceError):
+            data.clear()
+        if b"\n" not in data:
+            lg.info(f"Соединение от {peer} закрыто до входа.")
+            await stream.aclose()
+            return
+
+        first_line = data[:data.index(b"\n")].decode('utf-8', errors='ignore').strip()
+        worker = self._pick_worker(first_line)
+        fd = stream.socket.detach()
+        try:
+            await self.channels[worker].sendmsg([CHANNEL_CONNECTION + bytes(data)],
+                                                [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array('i', [fd]))])
+            lg.debug(f"Соединение от {peer} передано воркеру {worker}.")
+        except OSError as e:
+            lg.error(f"Не удалось передать соединение от {peer} воркеру {worker}: {e}")
+        finally:
+            os.close(fd)
+
+    async def send_admin(self, command_str: str, worker: int):
+        try:
+            await self.channels[worker].send(CHANNEL_ADMIN + command_str.encode('utf-8'))
+        except OSError as e:
+            console.print(f"[bold red]Воркер {worker} недоступен: {e}[/bold red]")
+
+    async def query(self, request: Dict[str, Any]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Рассылает запрос всем воркерам и ждет их ответов. На месте воркера, который недоступен
+        или не ответил за QUERY_TIMEOUT секунд, в списке стоит None.
+        """
+        query_id = next(self._query_ids)
+        query = self._queries[query_id] = _PendingQuery(len(self.channels))
+        message = CHANNEL_QUERY + json.dumps({**request, "id": query_id}, ensure_ascii=False).encode('utf-8')
+        try:
+            for worker, channel in enumerate(self.channels):
+                try:
+                    await channel.send(message)
+                except OSError as e:
+                    console.print(f"[bold red]Воркер {worker} недоступен: {e}[/bold red]")
+                    query.settle(worker)
+            with trio.move_on_after(QUERY_TIMEOUT):
+                await query.done.wait()
+        finally:
+            del self._queries[query_id]
+        for worker in sorted(query.waiting):
+            console.print(f"[bold yellow]Воркер {worker} не ответил за {QUERY_TIMEOUT:.0f} с.[/bold yellow]")
+        return query.replies
+
+    async def _read_replies(self, worker: int):
+        """Принимает ответы воркера на запросы фронта, пока воркер не закроет канал."""
+        channel = self.channels[worker]
+        while True:
+            try:
+                data = await channel.recv(CHANNEL_BUFFER_SIZE)
+            except OSError as e:
+                lg.error(f"Канал воркера {worker} недоступен: {e}")
+                return
+            if not data:
+                lg.warning(f"Воркер {worker} закрыл канал.")
+                return
+            if data[:1] != CHANNEL_REPLY:
+                continue
+            try:
+                reply = json.loads(data[1:])
+            except ValueError:
+                lg.error(f"Некорректный ответ воркера {worker}: {data[:100]!r}")
+                continue
+            if query := self._queries.get(reply.get("id")):
+                query.settle(worker, reply)
+
+
+async def serve_worker_channel(server: 'Server', channel: socket.socket):
+    """Принимает от фронта переданные соединения и админ-команды, пока фронт не закроет канал."""
+    channel = trio.socket.from_stdlib_socket(channel)
+    async with trio.open_nursery() as nursery:
+        while True:
+            data, ancdata, flags, _address = await channel.recvmsg(CHANNEL_BUFFER_SIZE, FD_ANCILLARY_SIZE)
+            if not data:
+                lg.info(f"Фронт закрыл канал воркера {server.worker_index}, воркер завершает работу.")
+                break
+            kind, payload = data[:1], data[1:]
+            fds = array.array('i')
+            for level, msg_type, cmsg_data in ancdata:
+                if level == socket.SOL_SOCKET and msg_type == socket.SCM_RIGHTS:
+                    fds.frombytes(cmsg_data[:len(cmsg_data) - len(cmsg_data) % fds.itemsize])
+            if flags & (socket.MSG_TRUNC | socket.MSG_CTRUNC):
+                lg.error(f"Воркер {server.worker_index}: сообщение фронта обрезано ({len(data)} байт), отброшено.")
+                for fd in fds:
+                    os.close(fd)
+                continue
+            if kind == CHANNEL_CONNECTION:
+                for fd in fds:
+                    sock = trio.socket.from_stdlib_socket(socket.socket(fileno=fd))
+                    nursery.start_soon(server._connection_handler, trio.SocketStream(sock), payload, True)
+            elif kind == CHANNEL_ADMIN:
+                nursery.start_soon(server.admin_console.handle_forwarded, payload.decode('utf-8'))
+            elif kind == CHANNEL_QUERY:
+                nursery.start_soon(_answer_query, server, channel, payload)
+        nursery.cancel_scope.cancel()
+
+
+async def _answer_query(server: 'Server', channel: trio.socket.SocketType, payload: bytes):
+    """Отвечает на запрос фронта. find_player — за каким столом этого воркера сидит игрок с таким именем."""
+    try:
+        request = json.loads(payload)
+    except ValueError:
+        lg.error(f"Воркер {server.worker_index}: некорректный запрос фронта {payload[:100]!r}")
+        return
+    reply: Dict[str, Any] = {"id": request.get("id")}
+    if "find_player" in request:
+        player_conn = server.player_connections.get(request["find_player"])
+        reply["session"] = player_conn.session.id if player_conn and player_conn.session else None
+    try:
+        await channel.send(CHANNEL_REPLY + json.dumps(reply, ensure_ascii=False).encode('utf-8'))
+    except OSError as e:
+        lg.error(f"Воркер {server.worker_index} не смог ответить фронту: {e}")
+
+
+def run_cluster(host: str, port: int, listen_sock: socket.socket, worker_count: int,
+                worker_main: Callable[[int, socket.socket], None]):
+    """Порождает воркеров и запускает фронт в текущем процессе. Вызывается до trio.run."""
+    channels: List[socket.socket] = []
+    pids: List[int] = []
+    for index in range(worker_count):
+        front_end, worker_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        pid = os.fork()
+        if pid == 0:
+            listen_sock.close()
+            front_end.close()
+            for channel in channels:
+                channel.close()
+            exit_code = 0
+            try:
+                worker_main(index, worker_end)
+            except KeyboardInterrupt:
+                pass
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else 1
+            except BaseException:
+                lg.error(f"Воркер {index} завершился с ошибкой.", exc_info=True)
+                exit_code = 1
+            os._exit(exit_code)
+        worker_end.close()
+        channels.append(front_end)
+        pids.append(pid)
+        lg.info(f"Запущен воркер {index} (pid {pid}).")
+
+    try:
+        trio.run(Front(host, port, listen_sock, channels).run)
+    finally:
+        for channel in channels:
+            channel.close()
+        for pid in pids:
+            os.waitpid(pid, 0)
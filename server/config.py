@@ -6,15 +6,63 @@ load_dotenv()
 
 DEFAULT_HOST = '0.0.0.0'
 DEFAULT_PORT = 65432
-MAX_PLAYERS = 4
+MAX_PLAYERS = 4  # на один стол
+MAX_SESSIONS = 500  # на один процесс
+WORKERS = 1  # >1 — фронт с маршрутизацией по столам и N процессов-воркеров
 MAX_PORT_ATTEMPTS = 10
+MAX_FRAME_SIZE = 64 * 1024
+
+OUTBOUND_QUEUE_MAX_FRAMES = 4096
+OUTBOUND_BATCH_BYTES = 64 * 1024
+OUTBOUND_SOFT_LIMIT_BYTES = 256 * 1024
+OUTBOUND_HARD_LIMIT_BYTES = 2 * 1024 * 1024
+OUTBOUND_CLOSE_TIMEOUT = 5
+
+ENABLE_COMPRESSION = True
+COMPRESSION_LEVEL = 6
+
+RESUME_GRACE_PERIOD = 60
+RESUME_REPLAY_FRAMES = 512
+
+HEARTBEAT_INTERVAL = 15
+HEARTBEAT_TIMEOUT = 45
+# TCP keepalive для текстовых клиентов: первая проба после TCP_KEEPALIVE_IDLE с тишины, затем
+# TCP_KEEPALIVE_COUNT проб через TCP_KEEPALIVE_INTERVAL — полуоткрытое соединение рвется примерно за 90 с.
+TCP_KEEPALIVE_IDLE = 60
+TCP_KEEPALIVE_INTERVAL = 10
+TCP_KEEPALIVE_COUNT = 3
+
+ACTION_RATE_PER_MINUTE = 6
+ACTION_BURST = 2
+CHAT_RATE_PER_MINUTE = 20
+CHAT_BURST = 5
+MAX_ACTION_CHARS = 500
+MAX_ACTION_TOKENS = 150
+MAX_CHAT_CHARS = 300
+ESTIMATED_CHARS_PER_TOKEN = 3
 
 LOG_FORMAT = '[%(asctime)s] [%(levelname)s] [%(name)s] [%(funcName)s] %(message)s'
 LOG_DATEFMT = '%Y-%m-%d %H:%M:%S'
 
+STORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stories')  # исходники историй (JSON)
+STORY_PACK_DIR = os.path.join(STORY_DIR, 'packs')  # собранные пакеты; создаются при первом обращении
+DEFAULT_STORY = 'endless_metro'
+
 IMMERSION_TURNS = 2
 STORY_INJECTION_TURNS = 4
 MAX_HISTORY_CHAR_LENGTH = 8192
+PROMPT_HISTORY_ENTRIES = 15  # последних записей истории каждой локации в промпте
+# Порядок разделов промпта повествования: "classic" — состояние и действия идут сразу после инструкции;
+# "prefix_cache" — от стабильных разделов к изменчивым (инструкция, принципы, атмосфера истории, история,
+# состояние, действия), чтобы промпты соседних ходов делили длинный общий префикс в кэше API.
+PROMPT_LAYOUT = "classic"
+PROMPT_JSON_COMPACT = False  # JSON состояния в промптах без отступов: меньше токенов, хуже читается в отладочных файлах
+HISTORY_MAX_ENTRIES = 200  # записей истории, хранимых в памяти на локацию
+HISTORY_MAX_CHARS = 65536  # символов истории, хранимых в памяти на локацию
+HISTORY_ARCHIVE_DIR = None  # каталог для вытесненных записей истории (по файлу на стол); None — не сохранять
+
+NARRATION_FLUSH_INTERVAL = 0.1
+NARRATION_FLUSH_MAX_BYTES = 512
 
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
 DEEPSEEK_API_BASE_URL = "https://api.deepseek.com/v1"
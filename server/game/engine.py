@@ -1,16 +1,17 @@
 import os
-from typing import List, Set, Dict, Optional, TYPE_CHECKING
+from typing import FrozenSet, List, Set, Dict, Optional, Tuple, TYPE_CHECKING
 
 import trio
 
+import config
 from game.state import Location
-from game.player import StatusEffect
 from logger import lg
-from llm.prompts import construct_narration_prompt, construct_state_update_prompt
+from llm.prompts import PROMPT_BUILDER, construct_narration_prompt, construct_state_update_prompt
+from llm.streaming import coalesce_narration
 
 if TYPE_CHECKING:
+    from game.session import GameSession
     from handlers.player import PlayerConnection
-    from main import Server
 
 
 async def _write_debug_file(f_type: str, turn: int, group_name: str, content_type: str, content: str):
@@ -28,13 +29,34 @@ async def _write_debug_file(f_type: str, turn: int, group_name: str, content_typ
         lg.error(f"Не удалось записать отладочный файл {filename}: {e}")
 
 
+class TurnGroup:
+    """Игроки одной компоненты связности и число уже поданных ими действий в текущем ходе."""
+
+    def __init__(self, group_id: int, location_names: FrozenSet[str]):
+        self.id = group_id
+        self.location_names = location_names
+        self.players: List[str] = []
+        self.actions_submitted = 0
+
+    @property
+    def is_ready(self) -> bool:
+        return self.actions_submitted >= len(self.players)
+
+
 class GameEngine:
-    def __init__(self, server: 'Server'):
-        self.server = server
-        self.game_state = server.game_state
-        self.model_manager = server.model_manager
-        self.turn_processing_locks: Set[frozenset[str]] = set()
-        self._lock = trio.Lock()
+    """
+    Управляет ходами стола. Группы игроков по компонентам связности пересобираются только
+    при изменении состава (вход, выход, перемещение, новые связи), а поданное действие лишь
+    увеличивает счетчик своей группы и проверяет ее одну.
+    """
+
+    def __init__(self, session: 'GameSession'):
+        self.session = session
+        self.game_state = session.game_state
+        self.model_manager = session.model_manager
+        self.turn_processing_locks: Set[int] = set()  # id компонент связности, чей ход обрабатывается
+        self._groups: Dict[int, TurnGroup] = {}
+        self._groups_version: Optional[Tuple[int, int]] = None
         lg.info("Игровой движок инициализирован.")
 
     async def handle_player_action(self, player_conn: 'PlayerConnection', action: str):
@@ -52,14 +74,21 @@ class GameEngine:
         location.add_player_action_to_history(player.username, action)
 
         component_loc_names = await self.game_state.get_connected_component(location.name)
-        await self.server.broadcast_to_locations(component_loc_names, f"ACTION {player.username}: {action}")
-
-        await self._check_and_process_all_groups()
-
-    async def start_game(self):
-        if await self.game_state.start_game():
-            await self.server.broadcast_system("STATE_UPDATE ACTIVE")
-            await self._narrate_initial_room_for_all()
+        await self.session.broadcast_to_locations(component_loc_names, f"ACTION {player.username}: {action}")
+
+        if self._refresh_groups():
+            # Состав групп изменился: счетчики пересчитаны с учетом этого действия.
+            self._dispatch_ready_groups()
+        elif group := self._groups.get(self.game_state.connectivity.component_id(location.name)):
+            group.actions_submitted += 1
+            self._dispatch_if_ready(group)
+
+    async def start_game(self, story_id: Optional[str] = None) -> bool:
+        if not await self.game_state.start_game(story_id):
+            return False
+        await self.session.broadcast_system("STATE_UPDATE ACTIVE")
+        await self._narrate_initial_room_for_all()
+        return True
 
     async def _narrate_initial_room_for_all(self):
         start_loc_name = self.game_state.start_room
@@ -78,58 +107,57 @@ class GameEngine:
             await self._check_and_process_all_groups()
 
     async def _check_and_process_all_groups(self):
-        async with self._lock:
-            all_players = await self.game_state.get_all_players()
-            if not all_players:
-                return
-
-            player_groups: Dict[frozenset[str], List[str]] = {}
-            visited_players: Set[str] = set()
-
-            for player in all_players:
-                if player.username in visited_players or not player.location_name:
-                    continue
-
-                component = await self.game_state.get_connected_component(player.location_name)
-                component_key = frozenset(component)
-
-                if component_key not in player_groups:
-                    player_groups[component_key] = []
-
-                players_in_component = await self.game_state.get_players_in_locations(component)
-                for p_in_comp in players_in_component:
-                    if p_in_comp.username not in visited_players:
-                        player_groups[component_key].append(p_in_comp.username)
-                        visited_players.add(p_in_comp.username)
-
-            for group_key, player_usernames_in_group in player_groups.items():
-                if group_key in self.turn_processing_locks or not player_usernames_in_group:
-                    continue
-
-                locations_in_group = [await self.game_state.get_or_create_location(name) for name in group_key]
-                turn_counters = {loc.turn_counter for loc in locations_in_group}
-                is_merge_turn = len(turn_counters) > 1
+        self._refresh_groups()
+        self._dispatch_ready_groups()
+
+    def _refresh_groups(self) -> bool:
+        """Пересобирает группы, если с прошлой сборки изменился состав игроков или граф. Возвращает True при пересборке."""
+        connectivity = self.game_state.connectivity
+        version = (self.game_state.roster_version, connectivity.version)
+        if version == self._groups_version:
+            return False
+
+        groups: Dict[int, TurnGroup] = {}
+        for player in self.game_state.players.values():
+            group_id = connectivity.component_id(player.location_name) if player.location_name else None
+            if group_id is None:
+                continue
+            if group_id not in groups:
+                groups[group_id] = TurnGroup(group_id, connectivity.component(player.location_name))
+            groups[group_id].players.append(player.username)
+        for group in groups.values():
+            group.actions_submitted = sum(len(self.game_state.locations[name].pending_actions)
+                                          for name in group.location_names if name in self.game_state.locations)
+        self._groups = groups
+        self._groups_version = version
+        return True
+
+    def _dispatch_ready_groups(self):
+        for group in self._groups.values():
+            self._dispatch_if_ready(group)
+
+    def _dispatch_if_ready(self, group: TurnGroup):
+        if group.id in self.turn_processing_locks or not group.is_ready:
+            return
 
-                if is_merge_turn:
-                    lg.warning(
-                        f"!!! ОБНАРУЖЕНО СЛИЯНИЕ МИРОВ !!! Рассинхронизация ходов в группе {set(group_key)}: {turn_counters}.")
+        locations_in_group = [self.game_state.locations[name] for name in group.location_names
+                              if name in self.game_state.locations]
+        turn_counters = {loc.turn_counter for loc in locations_in_group}
+        is_merge_turn = len(turn_counters) > 1
 
-                actions_in_group = {}
-                for loc in locations_in_group:
-                    actions_in_group.update(loc.pending_actions)
+        if is_merge_turn:
+            lg.warning(
+                f"!!! ОБНАРУЖЕНО СЛИЯНИЕ МИРОВ !!! Рассинхронизация ходов в группе {set(group.location_names)}: {turn_counters}.")
 
-                if len(actions_in_group) >= len(player_usernames_in_group):
-                    lg.info(f"Группа {set(group_key)} готова к обработке. Запуск...")
-                    self.turn_processing_locks.add(group_key)
-                    self.server.nursery.start_soon(self._process_turn, locations_in_group, is_merge_turn)
-                else:
-                    await self.server.broadcast_to_locations(group_key, "SYSTEM NARRATION_END",
-                                                             exclude=list(actions_in_group.keys()))
+        lg.info(f"Группа {set(group.location_names)} готова к обработке. Запуск...")
+        self.turn_processing_locks.add(group.id)
+        self.session.nursery.start_soon(self._process_turn, group.id, locations_in_group, is_merge_turn)
 
-    async def _process_turn(self, group_locations: List[Location], is_merge_turn: bool = False):
+    async def _process_turn(self, group_id: int, group_locations: List[Location], is_merge_turn: bool = False):
         group_key = frozenset(loc.name for loc in group_locations)
-        group_name = "_".join(sorted(group_key))
+        group_name = f"{self.session.id}_" + "_".join(sorted(group_key))
         log_turn_counter = max(loc.turn_counter for loc in group_locations) + 1
+        channel = self.session.broadcast_group(group_key)
 
         try:
             lg.info(f"Обработка хода (лог #{log_turn_counter}) для группы '{group_name}'. Is Merge: {is_merge_turn}")
@@ -140,17 +168,8 @@ class GameEngine:
 
             expired_effects_messages = []
             for player in players_in_group:
-                active_effects = []
-                for effect in player.status_effects:
-                    if effect.duration_turns is not None:
-                        effect.duration_turns -= 1
-                        if effect.duration_turns <= 0:
-                            expired_effects_messages.append(f"Эффект '{effect.name}' на игроке {player.username} прошел.")
-                            continue
-                    active_effects.append(effect)
-                player.status_effects = active_effects
-                if not player.status_effects:
-                    player.status_effects.append(StatusEffect(name="здоров", description="В полном порядке.", is_positive=True))
+                for effect in player.advance_effects():
+                    expired_effects_messages.append(f"Эффект '{effect.name}' на игроке {player.username} прошел.")
 
             if expired_effects_messages:
                 main_location = group_locations[0]
@@ -160,42 +179,54 @@ class GameEngine:
             if not is_merge_turn:
                 for loc in group_locations: loc.turn_counter += 1
 
+            idle_players = []
             for loc in group_locations:
                 for p_name in loc.players_present:
                     if p_name not in loc.pending_actions:
                         loc.pending_actions[p_name] = "бездействует"
                         loc.add_player_action_to_history(p_name, "бездействует")
-                        await self.server.broadcast_to_locations(group_key, f"ACTION {p_name}: бездействует")
+                        idle_players.append(p_name)
+            for p_name in idle_players:
+                await channel.send(f"ACTION {p_name}: бездействует")
 
+            # Дальше ход работает только со срезом: входы, выходы и ходы других групп во время
+            # запросов к модели не меняют ни промпты, ни то, с чем сверяется фиксация изменений.
+            snapshot = self.game_state.snapshot([loc.name for loc in group_locations])
             game_cfg = await self.game_state.get_full_config()
+            layout = PROMPT_BUILDER.layout
 
-            narration_prompt = await construct_narration_prompt(
-                self.game_state,
-                group_locations,
-                players_in_group,
+            narration_prompt, used_story_mask = await construct_narration_prompt(
+                snapshot,
                 immersion_turns=game_cfg['immersion_turns'],
                 story_injection_turns=game_cfg['story_injection_turns'],
-                max_history_char_length=game_cfg['max_history_char_length']
+                max_history_char_length=game_cfg['max_history_char_length'],
+                layout=layout
             )
+            group_locations[0].mark_story_elements_used(used_story_mask)
             await _write_debug_file('narration', log_turn_counter, group_name, 'prompt', narration_prompt)
-            await self.server.broadcast_to_locations(group_key, "SYSTEM THINK_START")
+            await channel.send("SYSTEM THINK_START")
 
-            full_narration_text = ""
-            async for content in self.model_manager.stream_narration(narration_prompt):
-                if not self.server.nursery: break
-                full_narration_text += content
-                await self.server.broadcast_to_locations(group_key, f"NARRATE {content.replace(chr(10), '<<BR>>')}")
+            async def send_narration(text: str):
+                await channel.send(f"NARRATE {text}")
+
+            async with coalesce_narration(send_narration, window=config.NARRATION_FLUSH_INTERVAL,
+                                          max_bytes=config.NARRATION_FLUSH_MAX_BYTES) as narration:
+                async for content in self.model_manager.stream_narration(narration_prompt,
+                                                                         label=f"повествование, {layout}"):
+                    if not self.session.nursery: break
+                    await narration.feed(content)
+            full_narration_text = narration.text
+            lg.debug(f"Повествование группы '{group_name}': {narration.chunks_received} фрагментов модели "
+                     f"отправлено {narration.frames_sent} кадрами.")
 
             await _write_debug_file('narration', log_turn_counter, group_name, 'response', full_narration_text)
             if not full_narration_text.strip():
                 lg.warning("Модель вернула пустое повествование. Ход завершается.")
             else:
-                for loc in group_locations:
-                    loc.add_narration_to_history(full_narration_text)
-                await self.server.broadcast_to_locations(group_key, "SYSTEM STATE_THINK_START")
+                self.game_state.add_group_narration(group_locations, full_narration_text)
+                await channel.send("SYSTEM STATE_THINK_START")
 
-                state_update_prompt = construct_state_update_prompt(self.game_state, group_locations, players_in_group,
-                                                                    full_narration_text)
+                state_update_prompt = construct_state_update_prompt(snapshot, full_narration_text)
                 await _write_debug_file('state', log_turn_counter, group_name, 'prompt', state_update_prompt)
 
                 state_changes, raw_response = await self.model_manager.get_state_changes_from_narration(
@@ -203,7 +234,7 @@ class GameEngine:
                 await _write_debug_file('state', log_turn_counter, group_name, 'response', raw_response)
 
                 if state_changes:
-                    moved_players, new_conn = await self.game_state.apply_turn_changes(state_changes)
+                    moved_players, new_conn = await self.game_state.apply_turn_changes(state_changes, base=snapshot)
                     if moved_players or new_conn:
                         lg.info("Перемещение игроков или создание связи вызвало повторную проверку групп.")
                         await self._check_and_process_all_groups()
@@ -211,16 +242,22 @@ class GameEngine:
                     lg.warning(f"Не удалось получить изменения состояния от модели для группы {group_name}.")
         except Exception as e:
             lg.error(f"Ошибка во время обработки хода для '{group_name}': {e}", exc_info=True)
-            await self.server.broadcast_to_locations(group_key, "SYSTEM Произошла ошибка с Рассказчиком. Ход прерван.")
+            await channel.send("SYSTEM Произошла ошибка с Рассказчиком. Ход прерван.")
         finally:
             if is_merge_turn:
                 final_turn = max(loc.turn_counter for loc in group_locations) + 1
                 for loc in group_locations: loc.turn_counter = final_turn
                 lg.info(f"Счетчики ходов для группы {group_key} СИНХРОНИЗИРОВАНЫ на {final_turn}.")
 
-            await self.server.broadcast_to_locations(group_key, "SYSTEM NARRATION_END")
+            await channel.send("SYSTEM NARRATION_END")
             for loc in group_locations:
                 loc.clear_turn_data()
 
-            async with self._lock:
-                self.turn_processing_locks.discard(group_key)
+            self.turn_processing_locks.discard(group_id)
+            if group := self._groups.get(group_id):
+                group.actions_submitted = 0
+            else:
+                # Группа распалась или слилась во время хода: счетчики новых групп учли уже очищенные действия.
+                self._groups_version = None
+            if archive := self.game_state.history_archive:
+                await archive.flush()
@@ -0,0 +1,59 @@
+import json
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+
+def encode_fragment(value: Any, compact: bool, depth: int) -> str:
+    """
+    Кодирует значение в JSON так, как его вывел бы json.dumps(..., indent=2) на глубине depth
+    объемлющего документа, или без отступов и пробелов в компактном режиме.
+    Переводы строк внутри строк JSON экранируются, поэтому сдвиг по '\\n' не задевает содержимое.
+    """
+    if compact:
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+    text = json.dumps(value, ensure_ascii=False, indent=2)
+    return text.replace('\n', '\n' + '  ' * depth) if depth else text
+
+
+def join_array(items: Iterable[str], compact: bool, depth: int) -> str:
+    """Массив из уже закодированных на глубине depth + 1 фрагментов."""
+    items = list(items)
+    if not items:
+        return "[]"
+    if compact:
+        return f"[{','.join(items)}]"
+    inner, outer = '\n' + '  ' * (depth + 1), '\n' + '  ' * depth
+    return f"[{inner}{(',' + inner).join(items)}{outer}]"
+
+
+def join_object(members: Iterable[Tuple[str, str]], compact: bool) -> str:
+    """Объект верхнего уровня из пар (ключ, значение, закодированное на глубине 1)."""
+    if compact:
+        return "{" + ",".join(f"{json.dumps(key, ensure_ascii=False)}:{value}" for key, value in members) + "}"
+    body = ",\n".join(f"  {json.dumps(key, ensure_ascii=False)}: {value}" for key, value in members)
+    return f"{{\n{body}\n}}" if body else "{}"
+
+
+class FragmentCache:
+    """
+    Закодированные JSON-фрагменты одного объекта для промптов. key — версия содержимого объекта:
+    пока она та же, фрагмент берется готовым; при смене версии все варианты кодируются заново.
+    """
+
+    __slots__ = ('_key', '_texts')
+
+    def __init__(self):
+        self._key: Optional[Hashable] = None
+        self._texts: Dict[Hashable, str] = {}
+
+    def get(self, key: Hashable, variant: Hashable, build: Callable[[], str]) -> str:
+        if key != self._key:
+            self._key = key
+            self._texts.clear()
+        text = self._texts.get(variant)
+        if text is None:
+            text = self._texts[variant] = build()
+        return text
+
+    def invalidate(self):
+        self._key = None
+        self._texts.clear()
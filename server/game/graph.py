@@ -0,0 +1,151 @@
+import sys
+from array import array
+from collections import deque
+from itertools import count
+from typing import Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
+
+from logger import lg
+
+
+class _Component:
+    """Компонента связности: номера локаций и идентификатор текущего состава."""
+
+    __slots__ = ('id', 'members', '_frozen')
+
+    def __init__(self, component_id: int, members: Set[int]):
+        self.id = component_id
+        self.members = members
+        self._frozen: Optional[FrozenSet[str]] = None
+
+    def frozen(self, names: List[str]) -> FrozenSet[str]:
+        if self._frozen is None:
+            self._frozen = frozenset(names[index] for index in self.members)
+        return self._frozen
+
+    def renew(self, component_id: int):
+        self.id = component_id
+        self._frozen = None
+
+
+class ConnectivityIndex:
+    """
+    Граф связей между локациями с поддерживаемым разбиением на компоненты связности.
+
+    Имена локаций интернируются и получают плотные целочисленные номера; списки смежности хранятся
+    массивами array('I') по номерам (4 байта на связь вместо элемента множества строк). Степень
+    вершин в игровом мире мала, поэтому линейный поиск в массиве дешевле хеширования.
+
+    Создание связи объединяет компоненты, перенося меньшую в большую; разрыв связи запускает
+    обход только внутри затронутой компоненты и останавливается, как только второй конец найден.
+    Запрос компоненты локации — словарный поиск.
+
+    Идентификатор компоненты меняется при любом изменении ее состава, поэтому его можно использовать
+    как ключ группы ходов: тот же идентификатор означает тот же набор локаций.
+    version растет при любом изменении разбиения, чтобы производные кэши знали, когда пересчитываться.
+    """
+
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._adjacency: List[array] = []
+        self._component_of: List[_Component] = []
+        self._ids = count(1)
+        self.version = 0
+
+    def __contains__(self, location_name: str) -> bool:
+        return location_name in self._index
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add_location(self, location_name: str) -> str:
+        """Регистрирует локацию и возвращает интернированное имя, которое стоит хранить вместо исходного."""
+        index = self._index.get(location_name)
+        if index is not None:
+            return self._names[index]
+        location_name = sys.intern(location_name)
+        index = len(self._names)
+        self._index[location_name] = index
+        self._names.append(location_name)
+        self._adjacency.append(array('I'))
+        self._component_of.append(_Component(next(self._ids), {index}))
+        self.version += 1
+        return location_name
+
+    def connect(self, loc1_name: str, loc2_name: str) -> bool:
+        """Создает связь. Возвращает True, если при этом объединились две компоненты."""
+        self.add_location(loc1_name)
+        self.add_location(loc2_name)
+        first_index, second_index = self._index[loc1_name], self._index[loc2_name]
+        if first_index == second_index or second_index in self._adjacency[first_index]:
+            return False
+        self._adjacency[first_index].append(second_index)
+        self._adjacency[second_index].append(first_index)
+
+        first, second = self._component_of[first_index], self._component_of[second_index]
+        if first is second:
+            return False
+        if len(first.members) < len(second.members):
+            first, second = second, first
+        for index in second.members:
+            self._component_of[index] = first
+        first.members |= second.members
+        first.renew(next(self._ids))
+        self.version += 1
+        lg.debug(f"Компоненты объединены: {len(first.members)} локаций, id {first.id}.")
+        return True
+
+    def disconnect(self, loc1_name: str, loc2_name: str) -> bool:
+        """Разрывает связь. Возвращает True, если компонента распалась на две."""
+        first_index, second_index = self._index.get(loc1_name), self._index.get(loc2_name)
+        if first_index is None or second_index is None or second_index not in self._adjacency[first_index]:
+            return False
+        self._adjacency[first_index].remove(second_index)
+        self._adjacency[second_index].remove(first_index)
+
+        visited = {first_index}
+        queue = deque(visited)
+        while queue:
+            for neighbor in self._adjacency[queue.popleft()]:
+                if neighbor == second_index:
+                    return False
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    queue.append(neighbor)
+
+        component = self._component_of[first_index]
+        component.members -= visited
+        component.renew(next(self._ids))
+        split_off = _Component(next(self._ids), visited)
+        for index in visited:
+            self._component_of[index] = split_off
+        self.version += 1
+        lg.debug(f"Компонента распалась: {len(visited)} и {len(component.members)} локаций.")
+        return True
+
+    def neighbors(self, location_name: str) -> List[str]:
+        index = self._index.get(location_name)
+        return [self._names[neighbor] for neighbor in self._adjacency[index]] if index is not None else []
+
+    def edges(self) -> Iterator[Tuple[str, str]]:
+        """Все связи мира, каждая один раз, концы в порядке сортировки имен."""
+        for index, neighbors in enumerate(self._adjacency):
+            for neighbor in neighbors:
+                if index < neighbor:
+                    first, second = self._names[index], self._names[neighbor]
+                    yield (first, second) if first < second else (second, first)
+
+    def component_id(self, location_name: str) -> Optional[int]:
+        index = self._index.get(location_name)
+        return self._component_of[index].id if index is not None else None
+
+    def component(self, location_name: str) -> FrozenSet[str]:
+        index = self._index.get(location_name)
+        return self._component_of[index].frozen(self._names) if index is not None else frozenset((location_name,))
+
+    def clear(self):
+        self._index.clear()
+        self._names.clear()
+        self._adjacency.clear()
+        self._component_of.clear()
+        self.version += 1
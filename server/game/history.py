@@ -0,0 +1,153 @@
+import heapq
+import json
+import os
+from dataclasses import dataclass
+from itertools import count
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import trio
+
+from logger import lg
+from utils import estimate_tokens
+
+# На сколько записей история может превысить max_entries, прежде чем лишние будут срезаны разом.
+_TRIM_SLACK = 16
+
+
+@dataclass(frozen=True, slots=True)
+class HistoryEntry:
+    """Запись истории мира. seq задает общий порядок записей всех локаций."""
+    seq: int
+    text: str
+
+
+class EventLog:
+    """
+    Общий журнал событий мира. Запись, относящаяся к нескольким локациям (повествование хода группы),
+    создается один раз, и истории всех этих локаций ссылаются на один и тот же объект. Журнал не держит
+    записи сам: запись живет, пока на нее ссылается хотя бы одна история локации или срез хода.
+    """
+
+    def __init__(self):
+        self._seq = count(1)
+
+    def entry(self, text: str) -> HistoryEntry:
+        return HistoryEntry(next(self._seq), text)
+
+
+class HistoryArchive:
+    """
+    Файл, куда уходят записи, вытесненные из истории локаций: по строке JSON на запись.
+    write() только копит строки в памяти (вытеснение происходит в синхронном коде), на диск их
+    асинхронно дописывает flush() — движок вызывает его в конце каждого хода. Файл открывается при первой записи.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None  # асинхронный файл trio, открывается при первом flush()
+        self._pending: List[str] = []
+        self._lock = trio.Lock()
+
+    def write(self, location_name: str, entry: HistoryEntry):
+        self._pending.append(json.dumps({"seq": entry.seq, "location": location_name, "text": entry.text},
+                                        ensure_ascii=False) + '\n')
+
+    async def flush(self):
+        async with self._lock:
+            if not self._pending:
+                return
+            lines, self._pending = self._pending, []
+            try:
+                if self._file is None:
+                    await trio.to_thread.run_sync(
+                        lambda: os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True))
+                    self._file = await trio.open_file(self.path, 'a', encoding='utf-8')
+                    lg.info(f"Архив истории открыт: {self.path}")
+                await self._file.write(''.join(lines))
+                await self._file.flush()
+            except OSError as e:
+                # Записи не теряются: они будут дописаны при следующем сбросе.
+                self._pending[:0] = lines
+                lg.error(f"Не удалось дописать архив истории {self.path}: {e}")
+
+    async def aclose(self):
+        await self.flush()
+        async with self._lock:
+            if self._file is not None:
+                await self._file.aclose()
+                self._file = None
+
+
+class LocationHistory:
+    """
+    Ограниченная история локации. Хранит не больше max_entries (+ _TRIM_SLACK) записей и не больше max_chars
+    символов (последняя запись остается в любом случае); самые старые записи вытесняются
+    в архив, если он задан, иначе отбрасываются.
+    Записи лежат в обычном списке: он намного легче deque, которая с первой записи держит блок
+    на 64 ссылки. Чтобы не сдвигать список на каждом добавлении, вытеснение идет пачками:
+    число записей может превысить max_entries на _TRIM_SLACK, после чего лишние срезаются разом.
+    Суммарные длина в символах и оценка в токенах ведутся при добавлении и вытеснении,
+    так что узнать размер истории можно без ее обхода.
+    """
+
+    __slots__ = ('location_name', 'max_entries', 'max_chars', 'archive', 'chars', 'tokens', '_entries')
+
+    def __init__(self, location_name: str, max_entries: int, max_chars: int, archive: Optional[HistoryArchive] = None):
+        self.location_name = location_name
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.archive = archive
+        self.chars = 0
+        self.tokens = 0
+        self._entries: List[HistoryEntry] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[HistoryEntry]:
+        return iter(self._entries)
+
+    def append(self, entry: HistoryEntry):
+        entries = self._entries
+        entries.append(entry)
+        self.chars += len(entry.text)
+        self.tokens += estimate_tokens(entry.text)
+        evicted = len(entries) - self.max_entries if len(entries) > self.max_entries + _TRIM_SLACK else 0
+        chars = self.chars - sum(len(old.text) for old in entries[:evicted])
+        while chars > self.max_chars and evicted < len(entries) - 1:
+            chars -= len(entries[evicted].text)
+            evicted += 1
+        if evicted:
+            self._evict(evicted)
+
+    def _evict(self, number: int):
+        """Вытесняет number самых старых записей одним срезом списка."""
+        evicted = self._entries[:number]
+        del self._entries[:number]
+        for entry in evicted:
+            self.chars -= len(entry.text)
+            self.tokens -= estimate_tokens(entry.text)
+            if self.archive is not None:
+                self.archive.write(self.location_name, entry)
+
+    def tail(self, limit: int) -> Tuple[HistoryEntry, ...]:
+        """Последние limit записей, от старых к новым."""
+        return tuple(self._entries[-limit:]) if limit > 0 else ()
+
+
+def _keyed(name: str, entries: Sequence[HistoryEntry]) -> Iterable[Tuple[int, str, HistoryEntry]]:
+    return ((entry.seq, name, entry) for entry in entries)
+
+
+def merge_histories(histories: Sequence[Tuple[str, Sequence[HistoryEntry]]]) -> List[Tuple[HistoryEntry, List[str]]]:
+    """
+    Сливает истории нескольких локаций в одну хронологию. Общая запись попадает в результат один раз
+    вместе со списком локаций, в чьих историях она есть.
+    """
+    merged: List[Tuple[HistoryEntry, List[str]]] = []
+    for seq, name, entry in heapq.merge(*(_keyed(name, entries) for name, entries in histories)):
+        if merged and merged[-1][0].seq == seq:
+            merged[-1][1].append(name)
+        else:
+            merged.append((entry, [name]))
+    return merged
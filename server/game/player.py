@@ -1,8 +1,12 @@
-from dataclasses import dataclass, field
-from typing import List, Optional
+import heapq
+from dataclasses import asdict, dataclass, field, replace
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+from game.fragments import FragmentCache, encode_fragment
 
-@dataclass
+
+@dataclass(slots=True)
 class StatusEffect:
     """Представляет статусный эффект с возможной длительностью."""
     name: str
@@ -11,22 +15,214 @@ class StatusEffect:
     is_positive: bool = False
 
 
-@dataclass
+def _healthy() -> StatusEffect:
+    return StatusEffect(name="здоров", description="В полном порядке.", is_positive=True)
+
+
+class StatusEffects:
+    """
+    Статусные эффекты игрока по имени. Эффекты с длительностью дополнительно лежат в куче по ходу
+    истечения, поэтому смена хода снимает только те эффекты, чей срок наступил, а не перебирает все.
+    Ход считается по собственному счетчику игрока: он растет, когда обрабатывается ход группы игрока.
+    duration_turns хранимых эффектов не меняется; оставшуюся длительность показывает snapshot().
+    Удаленный эффект остается в куче до своего срока и пропускается при извлечении.
+    """
+
+    __slots__ = ('turn', 'version', '_effects', '_expires_at', '_expiry', '_seq')
+
+    def __init__(self, effects: Iterable[StatusEffect] = ()):
+        self.turn = 0
+        self.version = 0  # растет при любом изменении того, что показывает snapshot()
+        self._effects: Dict[str, StatusEffect] = {}
+        # У большинства игроков эффектов с длительностью нет: словарь и куча создаются при первом таком эффекте.
+        self._expires_at: Optional[Dict[str, int]] = None
+        self._expiry: Optional[List[Tuple[int, int, StatusEffect]]] = None
+        self._seq = 0
+        for effect in effects:
+            self.add(effect)
+
+    @classmethod
+    def healthy(cls) -> 'StatusEffects':
+        return cls((_healthy(),))
+
+    def __iter__(self) -> Iterator[StatusEffect]:
+        return iter(self._effects.values())
+
+    def __len__(self) -> int:
+        return len(self._effects)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._effects
+
+    def add(self, effect: StatusEffect) -> bool:
+        """Добавляет эффект, если эффекта с таким именем еще нет. Возвращает True при добавлении."""
+        if effect.name in self._effects:
+            return False
+        self._effects[effect.name] = effect
+        self.version += 1
+        if effect.duration_turns is not None:
+            if self._expiry is None:
+                self._expires_at, self._expiry = {}, []
+            expires_at = self.turn + effect.duration_turns
+            self._expires_at[effect.name] = expires_at
+            self._seq += 1
+            heapq.heappush(self._expiry, (expires_at, self._seq, effect))
+        return True
+
+    def remove(self, name: str) -> Optional[StatusEffect]:
+        effect = self._effects.pop(name, None)
+        if effect is not None:
+            self.version += 1
+            if self._expires_at:
+                self._expires_at.pop(name, None)
+        return effect
+
+    def advance_turn(self) -> List[StatusEffect]:
+        """
+        Переводит эффекты на следующий ход и возвращает истекшие.
+        Если эффектов не осталось, игрок снова получает эффект «здоров».
+        """
+        self.turn += 1
+        if self._expires_at:
+            self.version += 1  # оставшаяся длительность эффектов уменьшилась
+        expired = []
+        while self._expiry and self._expiry[0][0] <= self.turn:
+            _, seq, effect = heapq.heappop(self._expiry)
+            if self._effects.get(effect.name) is effect:
+                self.remove(effect.name)
+                expired.append((seq, effect))
+        if not self._effects:
+            self.add(_healthy())
+        # Эффект с нулевой длительностью истекает вместе с добавленными раньше: порядок — по добавлению, как в списке.
+        expired.sort(key=lambda entry: entry[0])
+        return [effect for _, effect in expired]
+
+    def snapshot(self) -> Tuple[StatusEffect, ...]:
+        """Копии эффектов с оставшейся на текущий ход длительностью."""
+        expires_at = self._expires_at or {}
+        return tuple(replace(effect, duration_turns=expires_at[name] - self.turn)
+                     if name in expires_at else replace(effect)
+                     for name, effect in self._effects.items())
+
+
+class Inventory:
+    """
+    Инвентарь игрока: предмет -> количество, в порядке получения. Добавление, удаление
+    и проверка наличия — словарные операции; одинаковые предметы хранятся счетчиком.
+    """
+
+    __slots__ = ('version', '_counts')
+
+    def __init__(self, items: Iterable[str] = ()):
+        self.version = 0
+        self._counts: Dict[str, int] = {}
+        for item in items:
+            self.add(item)
+
+    @classmethod
+    def starter(cls) -> 'Inventory':
+        return cls(("фонарик",))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._counts)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._counts
+
+    def count(self, item: str) -> int:
+        return self._counts.get(item, 0)
+
+    def add(self, item: str, quantity: int = 1):
+        self._counts[item] = self._counts.get(item, 0) + quantity
+        self.version += 1
+
+    def remove(self, item: str, quantity: int = 1) -> bool:
+        """Убирает quantity экземпляров предмета. Возвращает False, если предмета не было."""
+        held = self._counts.get(item)
+        if held is None:
+            return False
+        if held > quantity:
+            self._counts[item] = held - quantity
+        else:
+            del self._counts[item]
+        self.version += 1
+        return True
+
+    def items(self) -> Tuple[Tuple[str, int], ...]:
+        return tuple(self._counts.items())
+
+    def display(self) -> List[str]:
+        """Список для показа игроку: количество указывается, только если предметов больше одного."""
+        return [item if quantity == 1 else f"{item} ×{quantity}" for item, quantity in self._counts.items()]
+
+
+# Инвентарь и эффекты игрока, который их еще не менял. Они общие для всех таких игроков, поэтому
+# словари обернуты в MappingProxyType: случайная запись в общее значение падает, а не меняет его всем.
+_STARTER_INVENTORY = Inventory.starter()
+_STARTER_INVENTORY._counts = MappingProxyType(_STARTER_INVENTORY._counts)
+_HEALTHY_EFFECTS = StatusEffects.healthy()
+_HEALTHY_EFFECTS._effects = MappingProxyType(_HEALTHY_EFFECTS._effects)
+
+
+@dataclass(slots=True)
 class Player:
     """
     Чистая модель данных, представляющая игровое состояние игрока.
     Не содержит никакой логики, связанной с сетью или обработкой.
+    Собственные инвентарь и эффекты создаются при первом изменении, до этого игрок видит общие стартовые.
     """
     username: str
     location_name: Optional[str] = None
-    inventory: List[str] = field(default_factory=lambda: ["фонарик"])
-    status_effects: List[StatusEffect] = field(
-        default_factory=lambda: [StatusEffect(name="здоров", description="В полном порядке.", is_positive=True)])
     personal_history: List[str] = field(default_factory=list)
+    version: int = field(default=0, compare=False)  # растет при каждом изменении, зафиксированном ходом
+    _inventory: Optional[Inventory] = field(default=None, init=False, repr=False, compare=False)
+    _status_effects: Optional[StatusEffects] = field(default=None, init=False, repr=False, compare=False)
+    _fragments: Optional[FragmentCache] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def inventory(self) -> Inventory:
+        """Инвентарь для чтения; изменять через edit_inventory()."""
+        return _STARTER_INVENTORY if self._inventory is None else self._inventory
+
+    @property
+    def status_effects(self) -> StatusEffects:
+        """Статусные эффекты для чтения; изменять через edit_status_effects()."""
+        return _HEALTHY_EFFECTS if self._status_effects is None else self._status_effects
+
+    def edit_inventory(self) -> Inventory:
+        if self._inventory is None:
+            self._inventory = Inventory.starter()
+        return self._inventory
+
+    def edit_status_effects(self) -> StatusEffects:
+        if self._status_effects is None:
+            self._status_effects = StatusEffects.healthy()
+        return self._status_effects
+
+    def advance_effects(self) -> List[StatusEffect]:
+        """Переводит эффекты игрока на следующий ход; стартовый «здоров» не истекает, и ход ему не нужен."""
+        if self._status_effects is None:
+            return []
+        return self._status_effects.advance_turn()
+
+    def prompt_fragment(self, compact: bool) -> str:
+        """JSON-состояние игрока для промптов; кодируется заново, только если изменились инвентарь или эффекты."""
+        if self._fragments is None:
+            self._fragments = FragmentCache()
+        inventory, effects = self.inventory, self.status_effects
+        return self._fragments.get(
+            (inventory.version, effects.version), compact,
+            lambda: encode_fragment({"username": self.username, "inventory": dict(inventory.items()),
+                                     "status_effects": [asdict(e) for e in effects.snapshot()]}, compact, 2))
 
     def reset(self):
         """Сбрасывает состояние игрока к значениям по умолчанию для лобби."""
         self.location_name = None
-        self.inventory = ["фонарик"]
-        self.status_effects = [StatusEffect(name="здоров", description="В полном порядке.", is_positive=True)]
+        self._inventory = None
+        self._status_effects = None
         self.personal_history.clear()
+        self._fragments = None
+        self.version += 1
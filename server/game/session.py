@@ -0,0 +1,203 @@
+from typing import Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+import os
+
+import trio
+
+import config
+from game.engine import GameEngine
+from game.history import HistoryArchive
+from game.state import GameState
+from handlers.broadcast import BroadcastGroup, deliver
+from logger import lg
+
+if TYPE_CHECKING:
+    from handlers.player import PlayerConnection
+    from llm.manager import ModelManager
+    from main import Server
+
+
+class GameSession:
+    """
+    Один игровой стол: собственный мир (GameState), движок и список подключенных игроков.
+    Языковая модель, сетевой слушатель и фоновые задачи общие для всех столов сервера,
+    поэтому простаивающая сессия — это лишь несколько пустых словарей без своих задач.
+    """
+
+    def __init__(self, server: 'Server', session_id: str):
+        self.id = session_id
+        self.server = server
+        self.model_manager: 'ModelManager' = server.model_manager
+        archive = HistoryArchive(os.path.join(config.HISTORY_ARCHIVE_DIR, f"{session_id}.jsonl")) \
+            if config.HISTORY_ARCHIVE_DIR else None
+        self.game_state = GameState(history_archive=archive)
+        self.game_engine = GameEngine(self)
+        self.player_connections: Dict[str, 'PlayerConnection'] = {}
+        self._connections_version = 0
+        lg.info(f"Создан игровой стол '{session_id}'.")
+
+    @property
+    def nursery(self) -> Optional[trio.Nursery]:
+        return self.server.nursery
+
+    @property
+    def player_count(self) -> int:
+        return len(self.game_state.players)
+
+    @property
+    def is_full(self) -> bool:
+        return self.player_count >= config.MAX_PLAYERS
+
+    @property
+    def roster_version(self) -> Tuple[int, int]:
+        """Меняется при любом входе, выходе или перемещении игрока; по нему группы рассылки сбрасывают кэш."""
+        return self.game_state.roster_version, self._connections_version
+
+    def attach(self, player_conn: 'PlayerConnection'):
+        self.player_connections[player_conn.username] = player_conn
+        self._connections_version += 1
+
+    def detach(self, player_conn: 'PlayerConnection'):
+        if self.player_connections.get(player_conn.username) is player_conn:
+            del self.player_connections[player_conn.username]
+            self._connections_version += 1
+
+    def broadcast_group(self, location_names: Iterable[str]) -> BroadcastGroup:
+        return BroadcastGroup(self, location_names)
+
+    async def broadcast_to_locations(self, location_names: Iterable[str], message: str,
+                                     exclude: Optional[List[str]] = None):
+        await self.broadcast_group(location_names).send(message, exclude=exclude)
+
+    async def broadcast_system(self, message: str, exclude: Optional[List[str]] = None, is_direct: bool = False):
+        exclude_set = set(exclude or [])
+        final_message = message if is_direct else f"SYSTEM {message}"
+
+        deliver((conn for uname, conn in self.player_connections.items() if uname not in exclude_set), final_message)
+
+    async def player_joined(self, player_conn: 'PlayerConnection'):
+        if not player_conn.username: return
+        self.attach(player_conn)
+        await player_conn.send_direct(f"SYSTEM Вы за столом '{self.id}'.")
+
+        is_active = await self.game_state.is_game_active()
+        if is_active:
+            player_model = await self.game_state.get_player(player_conn.username)
+            if player_model and player_model.location_name:
+                await self.broadcast_to_locations({player_model.location_name},
+                                                  f"SYSTEM {player_model.username} присоединился.",
+                                                  exclude=[player_model.username])
+        await self.send_world_state(player_conn)
+        if not is_active:
+            all_players = await self.game_state.get_all_player_usernames()
+            await self.broadcast_system("LOBBY_UPDATE " + ",".join(all_players), exclude=[player_conn.username],
+                                        is_direct=True)
+
+    async def send_world_state(self, player_conn: 'PlayerConnection'):
+        """Полностью синхронизирует клиента: режим игры и описание текущей локации."""
+        is_active = await self.game_state.is_game_active()
+        await player_conn.send_direct(f"SYSTEM STATE_UPDATE {'ACTIVE' if is_active else 'LOBBY'}")
+        if is_active:
+            player_model = await self.game_state.get_player(player_conn.username)
+            if player_model and player_model.location_name:
+                location = await self.game_state.get_or_create_location(player_model.location_name)
+                await player_conn.send_direct(f"NARRATE {location.description}")
+                await player_conn.send_direct("SYSTEM NARRATION_END")
+        else:
+            all_players = await self.game_state.get_all_player_usernames()
+            await player_conn.send_direct("LOBBY_UPDATE " + ",".join(all_players))
+
+    async def broadcast_to_component(self, username: str, message: str):
+        """Сообщает всем, кто связан с локацией игрока, кроме него самого."""
+        player_model = await self.game_state.get_player(username)
+        if player_model and player_model.location_name:
+            component = await self.game_state.get_connected_component(player_model.location_name)
+            await self.broadcast_to_locations(component, message, exclude=[username])
+
+    async def remove_player(self, player_conn: 'PlayerConnection'):
+        username = player_conn.username
+        if not username: return
+
+        self.detach(player_conn)
+        last_loc_name = await self.game_state.remove_player(username)
+
+        if last_loc_name:
+            component = await self.game_state.get_connected_component(last_loc_name)
+            await self.broadcast_to_locations(component, f"SYSTEM {username} покинул игру.", exclude=[username])
+            await self.game_engine.on_player_removed(last_loc_name)
+        else:
+            all_players = await self.game_state.get_all_player_usernames()
+            if all_players:
+                await self.broadcast_system("LOBBY_UPDATE " + ",".join(all_players), is_direct=True)
+
+    async def handle_player_say(self, player_conn: 'PlayerConnection', message: str):
+        if not player_conn.username or not message: return
+
+        is_active = await self.game_state.is_game_active()
+        if is_active:
+            player_model = await self.game_state.get_player(player_conn.username)
+            if player_model and player_model.location_name:
+                component = await self.game_state.get_connected_component(player_model.location_name)
+                await self.broadcast_to_locations(component, f"CHAT {player_conn.username}: {message}")
+        else:
+            await self.broadcast_system(f"CHAT {player_conn.username}: {message}", is_direct=True)
+
+
+class SessionRegistry:
+    """
+    Реестр игровых столов сервера. Пустые столы удаляются, новые создаются по требованию.
+    id_prefix добавляется к автоматическим номерам столов, чтобы по номеру было видно, какой воркер им владеет.
+    """
+
+    def __init__(self, server: 'Server', id_prefix: str = ""):
+        self.server = server
+        self.id_prefix = id_prefix
+        self.sessions: Dict[str, GameSession] = {}
+        self._next_id = 1
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def __iter__(self):
+        return iter(self.sessions.values())
+
+    def get(self, session_id: str) -> Optional[GameSession]:
+        return self.sessions.get(session_id)
+
+    def _create(self, session_id: Optional[str] = None) -> Optional[GameSession]:
+        if len(self.sessions) >= config.MAX_SESSIONS:
+            lg.warning(f"Достигнут лимит столов ({config.MAX_SESSIONS}), новый стол не создан.")
+            return None
+        if session_id is None:
+            while f"{self.id_prefix}{self._next_id}" in self.sessions:
+                self._next_id += 1
+            session_id = f"{self.id_prefix}{self._next_id}"
+            self._next_id += 1
+        session = self.sessions[session_id] = GameSession(self.server, session_id)
+        return session
+
+    def assign(self, requested_id: Optional[str] = None) -> Tuple[Optional[GameSession], str]:
+        """
+        Подбирает стол для входящего игрока: запрошенный (создавая его при необходимости)
+        или первый неполный, предпочитая столы в лобби.
+        Возвращает (стол или None, причина отказа).
+        """
+        if requested_id:
+            session = self.sessions.get(requested_id) or self._create(requested_id)
+            if session is None:
+                return None, "limit"
+            return (None, "full") if session.is_full else (session, "success")
+
+        open_sessions = [s for s in self.sessions.values() if not s.is_full]
+        open_sessions.sort(key=lambda s: s.game_state.state != 'lobby')
+        if open_sessions:
+            return open_sessions[0], "success"
+        session = self._create()
+        return (session, "success") if session else (None, "limit")
+
+    async def discard_if_empty(self, session: GameSession):
+        if session.player_count == 0 and not session.player_connections and self.sessions.get(session.id) is session:
+            del self.sessions[session.id]
+            if session.game_state.history_archive:
+                await session.game_state.history_archive.aclose()
+            lg.info(f"Игровой стол '{session.id}' опустел и удален.")
@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from game.history import HistoryEntry
+from game.player import StatusEffect
+from game.story_index import CompiledStory
+
+
+@dataclass(frozen=True, slots=True)
+class LocationSnapshot:
+    """Неизменяемый вид локации на момент начала хода."""
+    name: str
+    description: str
+    players_present: FrozenSet[str]
+    turn_counter: int
+    parent_location: Optional[str]
+    sub_locations: FrozenSet[str]
+    conversation_history: Tuple[HistoryEntry, ...]
+    pending_actions: Dict[str, str]
+    used_story_mask: int
+    version: int
+    narration_json: str  # готовые JSON-фрагменты локации для промптов
+    state_update_json: str
+
+
+@dataclass(frozen=True, slots=True)
+class PlayerSnapshot:
+    """Неизменяемый вид игрока на момент начала хода."""
+    username: str
+    location_name: Optional[str]
+    inventory: Tuple[Tuple[str, int], ...]  # (предмет, количество) в порядке получения
+    status_effects: Tuple[StatusEffect, ...]
+    version: int
+    state_json: str  # готовый JSON-фрагмент игрока для промптов
+
+
+@dataclass(frozen=True, slots=True)
+class WorldSnapshot:
+    """
+    Срез группы локаций и ее игроков, по которому строятся промпты хода.
+    Строки и данные историй общие с живым миром (они не изменяются), копируются только контейнеры,
+    поэтому срез стоит O(размер группы); словари внутри среза — собственные копии, менять их не следует.
+    Версии сущностей позволяют при фиксации хода обнаружить изменения, внесенные в мир другими
+    группами, пока шли запросы к модели.
+    """
+    locations: Tuple[LocationSnapshot, ...]
+    players: Tuple[PlayerSnapshot, ...]
+    connections: Tuple[Tuple[str, str], ...]
+    world_flags: Dict[str, Any]
+    fear_weights: Dict[str, int]
+    story: Optional[CompiledStory]  # история главной локации группы
+    world_flags_json: str
+    compact_json: bool  # фрагменты закодированы без отступов
+
+    @property
+    def main_location(self) -> LocationSnapshot:
+        return self.locations[0]
+
+    def location_version(self, location_name: str) -> Optional[int]:
+        """Версия локации в срезе; None, если локации в срезе нет."""
+        return next((loc.version for loc in self.locations if loc.name == location_name), None)
+
+    def player_version(self, username: str) -> Optional[int]:
+        """Версия игрока в срезе; None, если игрока в срезе нет."""
+        return next((p.version for p in self.players if p.username == username), None)
+
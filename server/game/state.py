@@ -1,52 +1,108 @@
-from typing import Any, Dict, List, Optional, Set, Tuple, Iterable
-
-import trio
+import sys
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Iterable
 
 import config
 from logger import lg
+from game.fragments import FragmentCache, encode_fragment
+from game.graph import ConnectivityIndex
+from game.history import EventLog, HistoryArchive, HistoryEntry, LocationHistory
 from game.player import Player, StatusEffect
-from game.stories import STORIES
+from game.snapshot import LocationSnapshot, PlayerSnapshot, WorldSnapshot
+from game.story_index import CompiledStory
+from game.story_packs import STORY_LIBRARY
+
+
+_NO_NAMES: FrozenSet[str] = frozenset()
 
 
 class Location:
-    """Представляет общее, разделяемое пространство в игре."""
+    """
+    Представляет общее, разделяемое пространство в игре.
+    Большинство сгенерированных локаций пустуют, поэтому множества игроков и подлокаций создаются
+    при первой записи, а до того ссылаются на общий пустой frozenset.
+    Изменять их следует через методы локации.
+    Записи истории выдает общий журнал мира, так что запись, общая для группы локаций, хранится один раз.
+    История ограничена по числу записей и символам; вытесненные записи уходят в архив стола, если он включен.
+    JSON-фрагменты локации для промптов кэшируются по (version, turn_counter) и сбрасываются методами,
+    меняющими состав игроков и подлокаций.
+    """
+
+    __slots__ = ('name', 'description', 'players_present', 'conversation_history', 'used_story_mask',
+                 'turn_counter', 'pending_actions', 'parent_location', 'sub_locations', 'version', 'event_log',
+                 '_fragments')
 
-    def __init__(self, name: str, initial_description: str):
+    def __init__(self, name: str, initial_description: str, event_log: EventLog,
+                 archive: Optional[HistoryArchive] = None):
         self.name = name
         self.description: str = initial_description
-        self.players_present: Set[str] = set()
-        self.conversation_history: List[str] = [f"SYSTEM Мир вокруг: {initial_description}"]
-        self.used_story_elements: Set[str] = set()
+        self.event_log = event_log
+        self.players_present: Set[str] = _NO_NAMES
+        self.conversation_history = LocationHistory(name, config.HISTORY_MAX_ENTRIES, config.HISTORY_MAX_CHARS, archive)
+        self.conversation_history.append(event_log.entry(f"SYSTEM Мир вокруг: {initial_description}"))
+        self.used_story_mask: int = 0  # биты номеров элементов скомпилированной истории, уже показанных здесь
         self.turn_counter: int = 0
         self.pending_actions: Dict[str, str] = {}
         self.parent_location: Optional[str] = None
-        self.sub_locations: Set[str] = set()
+        self.sub_locations: Set[str] = _NO_NAMES
+        self.version: int = 0  # растет при изменении описания, иерархии или связей локации
+        self._fragments: Optional[FragmentCache] = None
         lg.info(f"Объект Location '{name}' создан.")
 
     def add_player(self, username: str):
+        if self.players_present is _NO_NAMES:
+            self.players_present = set()
         self.players_present.add(username)
+        self._invalidate_fragments()
         self.add_system_message_to_history(f"{username} появляется.")
 
+    def add_sub_location(self, location_name: str):
+        if self.sub_locations is _NO_NAMES:
+            self.sub_locations = set()
+        self.sub_locations.add(location_name)
+        self._invalidate_fragments()
+
+    def discard_sub_location(self, location_name: str):
+        if self.sub_locations:
+            self.sub_locations.discard(location_name)
+            self._invalidate_fragments()
+
+    def mark_story_elements_used(self, mask: int):
+        self.used_story_mask |= mask
+
     def remove_player(self, username: str):
-        self.players_present.discard(username)
+        if self.players_present:
+            self.players_present.discard(username)
+            self._invalidate_fragments()
         self.pending_actions.pop(username, None)
         self.add_system_message_to_history(f"{username} исчезает.")
 
-    def add_player_action_to_history(self, username: str, action: str):
-        entry = f"ACTION {username}: {action}"
+    def _invalidate_fragments(self):
+        if self._fragments is not None:
+            self._fragments.invalidate()
+
+    def prompt_fragments(self, compact: bool) -> Tuple[str, str]:
+        """JSON-фрагменты локации: для промпта повествования и для промпта изменений состояния."""
+        if self._fragments is None:
+            self._fragments = FragmentCache()
+        key = (self.version, self.turn_counter)
+        narration = self._fragments.get(key, ('narration', compact), lambda: encode_fragment(
+            {"name": self.name, "description": self.description, "players_present": sorted(self.players_present),
+             "turn_count": self.turn_counter, "parent_location": self.parent_location,
+             "sub_locations": sorted(self.sub_locations)}, compact, 2))
+        state_update = self._fragments.get(key, ('state_update', compact), lambda: encode_fragment(
+            {"name": self.name, "description": self.description, "parent_location": self.parent_location,
+             "sub_locations": sorted(self.sub_locations)}, compact, 2))
+        return narration, state_update
+
+    def append_history_entry(self, entry: HistoryEntry):
         self.conversation_history.append(entry)
-        lg.debug(f"В историю локации '{self.name}' добавлено действие от '{username}': '{action[:50]}...'")
 
-    def add_narration_to_history(self, narration: str):
-        narration_clean = narration.strip()
-        if not narration_clean: return
-        entry = f"NARRATE {narration_clean}"
-        self.conversation_history.append(entry)
-        lg.debug(f"В историю локации '{self.name}' добавлено повествование: '{narration_clean[:50]}...'")
+    def add_player_action_to_history(self, username: str, action: str):
+        self.append_history_entry(self.event_log.entry(f"ACTION {username}: {action}"))
+        lg.debug(f"В историю локации '{self.name}' добавлено действие от '{username}': '{action[:50]}...'")
 
     def add_system_message_to_history(self, message: str):
-        entry = f"SYSTEM {message}"
-        self.conversation_history.append(entry)
+        self.append_history_entry(self.event_log.entry(f"SYSTEM {message}"))
         lg.debug(f"В историю локации '{self.name}' добавлено системное сообщение: '{message}'")
 
     def clear_turn_data(self):
@@ -58,37 +114,62 @@ class GameState:
     """
     Центральное хранилище состояния игрового мира.
     Оперирует чистыми моделями данных (Player, Location) и не зависит от сетевого слоя.
+
+    Общей блокировки нет: ни один метод не содержит точек переключения trio, поэтому каждый
+    выполняется атомарно относительно остальных задач. Чтение не ждет записи, а применение хода
+    одной группы не задерживает чат и действия в остальном мире. Изменяя состояние, нельзя
+    делать await посередине изменения.
     """
 
-    def __init__(self):
-        self._lock = trio.Lock()
+    def __init__(self, history_archive: Optional[HistoryArchive] = None):
         self.state: str = 'lobby'
         self.players: Dict[str, Player] = {}
         self.locations: Dict[str, Location] = {}
-        self.location_graph: Dict[str, Set[str]] = {}
-        self.story_data: Dict[str, Any] = STORIES
-        self.start_room: str = 'endless_metro'
+        # Граф связей между локациями; менять его можно только через методы индекса.
+        self.connectivity = ConnectivityIndex()
+        self.event_log = EventLog()
+        self.history_archive = history_archive
+        self.story_id: str = config.DEFAULT_STORY
+        self.story: Optional[CompiledStory] = None  # загружается при старте игры
+        self.start_room: str = config.DEFAULT_STORY
         self.fear_weights: Dict[str, int] = config.DEFAULT_FEAR_WEIGHTS.copy()
         self.story_injection_turns: int = config.STORY_INJECTION_TURNS
         self.immersion_turns: int = config.IMMERSION_TURNS
         self.max_history_char_length: int = config.MAX_HISTORY_CHAR_LENGTH
         self.world_flags: Dict[str, Any] = {}
+        self.world_flags_version: int = 0
+        self._world_flags_fragments = FragmentCache()
+        self.roster_version: int = 0
         lg.info("Объект GameState инициализирован с новой архитектурой на основе графа связности.")
 
-    def _get_or_create_location_unsafe(self, location_name: str) -> Location:
-        """Внутренний метод: создает локацию, предполагает, что блокировка уже захвачена."""
+    def _get_or_create_location(self, location_name: str) -> Location:
         if location_name not in self.locations:
-            lg.info(f"Локация '{location_name}' не найдена, создается новая (unsafe).")
-            initial_desc = self.story_data.get(location_name, {}).get('initial_description', 'Пустое место.')
-            self.locations[location_name] = Location(name=location_name, initial_description=initial_desc)
-            self.location_graph[location_name] = set()
+            lg.info(f"Локация '{location_name}' не найдена, создается новая.")
+            story = self._story_for(location_name)
+            initial_desc = story.initial_description if story else 'Пустое место.'
+            location_name = self.connectivity.add_location(location_name)
+            self.locations[location_name] = Location(name=location_name, initial_description=initial_desc,
+                                                     event_log=self.event_log, archive=self.history_archive)
             lg.info(f"Создана новая локация: {location_name} и узел в графе мира.")
         return self.locations[location_name]
 
+    def _story_for(self, location_name: str) -> Optional[CompiledStory]:
+        """История действует в своей стартовой комнате; сгенерированные локации своей истории не имеют."""
+        story = self.story
+        return story if story and story.start_room == location_name else None
+
     async def get_or_create_location(self, location_name: str) -> Location:
-        """Публичный, потокобезопасный метод для получения или создания локации."""
-        async with self._lock:
-            return self._get_or_create_location_unsafe(location_name)
+        """Публичный метод для получения или создания локации."""
+        return self._get_or_create_location(location_name)
+
+    def add_group_narration(self, locations: Iterable[Location], narration: str):
+        """Добавляет повествование хода в истории всех локаций группы одной общей записью."""
+        narration_clean = narration.strip()
+        if not narration_clean: return
+        entry = self.event_log.entry(f"NARRATE {narration_clean}")
+        for location in locations:
+            location.append_history_entry(entry)
+        lg.debug(f"В историю группы добавлено повествование: '{narration_clean[:50]}...'")
 
     async def add_player(self, player: Player) -> Tuple[bool, str]:
         """
@@ -96,248 +177,360 @@ class GameState:
         Возвращает (True, "success") при успехе.
         Возвращает (False, "reason") при неудаче.
         """
-        async with self._lock:
-            username = player.username
-            if len(self.players) >= config.MAX_PLAYERS:
-                lg.warning(
-                    f"Отклонено подключение для '{username}': сервер полон ({len(self.players)}/{config.MAX_PLAYERS}).")
-                return False, "full"
-
-            if username in self.players:
-                lg.warning(f"Попытка добавить игрока с уже существующим именем '{username}' отклонена.")
-                return False, "taken"
-
-            self.players[username] = player
-
-            if self.state == 'active':
-                location_name = self.start_room
-                player.location_name = location_name
-                location = self._get_or_create_location_unsafe(location_name)
-                location.add_player(username)
-                lg.info(f"Игрок '{username}' добавлен в игру. Текущая локация: '{location_name}'.")
-            else:
-                player.location_name = None
-                lg.info(f"Игрок '{username}' добавлен в лобби.")
-
-            return True, "success"
+        # Имя повторяется в локациях, действиях и историях: храним один экземпляр строки.
+        username = player.username = sys.intern(player.username)
+        if len(self.players) >= config.MAX_PLAYERS:
+            lg.warning(
+                f"Отклонено подключение для '{username}': сервер полон ({len(self.players)}/{config.MAX_PLAYERS}).")
+            return False, "full"
+
+        if username in self.players:
+            lg.warning(f"Попытка добавить игрока с уже существующим именем '{username}' отклонена.")
+            return False, "taken"
+
+        self.players[username] = player
+        self.roster_version += 1
+
+        if self.state == 'active':
+            location_name = self.start_room
+            player.location_name = location_name
+            location = self._get_or_create_location(location_name)
+            location.add_player(username)
+            lg.info(f"Игрок '{username}' добавлен в игру. Текущая локация: '{location_name}'.")
+        else:
+            player.location_name = None
+            lg.info(f"Игрок '{username}' добавлен в лобби.")
+
+        return True, "success"
 
     async def remove_player(self, username: str) -> Optional[str]:
         """Удаляет игрока из игры и возвращает имя его последней известной локации."""
-        async with self._lock:
-            player_model = self.players.pop(username, None)
-            if player_model is None:
-                lg.warning(f"Попытка удалить несуществующего игрока '{username}'.")
-                return None
-            else:
-                location_name = player_model.location_name
-                lg.info(f"Игрок '{username}' удаляется из игры из локации '{location_name}'.")
-                if location_name and location_name in self.locations:
-                    self.locations[location_name].remove_player(username)
-                return location_name
-
-    async def apply_turn_changes(self, state_changes: Dict[str, Any]) -> Tuple[
+        player_model = self.players.pop(username, None)
+        if player_model is None:
+            lg.warning(f"Попытка удалить несуществующего игрока '{username}'.")
+            return None
+        else:
+            self.roster_version += 1
+            location_name = player_model.location_name
+            lg.info(f"Игрок '{username}' удаляется из игры из локации '{location_name}'.")
+            if location_name and location_name in self.locations:
+                self.locations[location_name].remove_player(username)
+            return location_name
+
+    def _location_snapshot(self, loc: Location, history_entries: int, compact: bool) -> LocationSnapshot:
+        narration_json, state_update_json = loc.prompt_fragments(compact)
+        return LocationSnapshot(
+            name=loc.name, description=loc.description, players_present=frozenset(loc.players_present),
+            turn_counter=loc.turn_counter, parent_location=loc.parent_location,
+            sub_locations=frozenset(loc.sub_locations),
+            conversation_history=loc.conversation_history.tail(history_entries),
+            pending_actions=dict(loc.pending_actions), used_story_mask=loc.used_story_mask,
+            version=loc.version, narration_json=narration_json, state_update_json=state_update_json)
+
+    def _world_flags_fragment(self, compact: bool) -> str:
+        return self._world_flags_fragments.get(self.world_flags_version, compact,
+                                               lambda: encode_fragment(self.world_flags, compact, 1))
+
+    def snapshot(self, location_names: Iterable[str], history_entries: int = config.PROMPT_HISTORY_ENTRIES,
+                 compact_json: bool = config.PROMPT_JSON_COMPACT) -> WorldSnapshot:
+        """
+        Снимает неизменяемый срез группы локаций и ее игроков для построения промптов хода.
+        JSON-фрагменты сущностей берутся из их кэшей: заново кодируются только изменившиеся.
+        """
+        names = [name for name in location_names if name in self.locations]
+        name_set = set(names)
+        locations = tuple(self._location_snapshot(self.locations[name], history_entries, compact_json) for name in names)
+        players = tuple(
+            PlayerSnapshot(username=p.username, location_name=p.location_name, inventory=p.inventory.items(),
+                           status_effects=p.status_effects.snapshot(), version=p.version,
+                           state_json=p.prompt_fragment(compact_json))
+            for p in self.players.values() if p.location_name in name_set)
+        connections = tuple(sorted({tuple(sorted((name, neighbor)))
+                                    for name in names for neighbor in self.connectivity.neighbors(name)
+                                    if neighbor in name_set}))
+        return WorldSnapshot(locations=locations, players=players, connections=connections,
+                             world_flags=dict(self.world_flags), fear_weights=dict(self.fear_weights),
+                             story=self._story_for(names[0]) if names else None,
+                             world_flags_json=self._world_flags_fragment(compact_json), compact_json=compact_json)
+
+    async def apply_turn_changes(self, state_changes: Dict[str, Any], base: Optional[WorldSnapshot] = None) -> Tuple[
         List[Tuple[Player, Optional[str]]], bool]:
         """
         Атомарно применяет все изменения состояния после хода.
+        base — срез, по которому модель строила ответ. Изменения локаций и игроков, которые с тех пор
+        изменил ход другой группы (версия не совпадает), а также игроков вне среза, отбрасываются.
+        Версии сверяются до применения первого изменения, поэтому записи одного ответа не конфликтуют
+        друг с другом. Локации вне среза сверять не с чем: их изменения применяются.
         Возвращает кортеж: (список перемещенных игроков (моделей), флаг создания новой связи).
         """
         moved_players_info: List[Tuple[Player, Optional[str]]] = []
         new_connection_created = False
 
-        async with self._lock:
-            lg.info(f"Применение изменений хода к миру: {state_changes}")
-
-            if location_updates := state_changes.get('location_updates'):
-                for update in location_updates:
-                    loc_name = update.get('location_name')
-                    if not loc_name: continue
-                    location = self._get_or_create_location_unsafe(loc_name)
-                    if 'description' in update:
-                        location.description = update['description']
-                        lg.info(f"Описание локации '{loc_name}' обновлено/создано.")
-
-                    if parent_loc_name := update.get("parent_location"):
-                        if location.parent_location and location.parent_location in self.locations:
-                            self.locations[location.parent_location].sub_locations.discard(loc_name)
-
-                        parent_location = self._get_or_create_location_unsafe(parent_loc_name)
-                        parent_location.sub_locations.add(loc_name)
-                        location.parent_location = parent_loc_name
-                        lg.info(f"Локация '{loc_name}' теперь является дочерней для '{parent_loc_name}'.")
-
-            if connection_updates := state_changes.get('connection_updates'):
-                for conn_update in connection_updates:
-                    action = conn_update.get('action')
-                    locs = conn_update.get('locations')
-                    if not all([action, isinstance(locs, list), len(locs) == 2]):
-                        lg.warning(f"Пропущен неполный connection_update: {conn_update}")
-                        continue
-                    loc1_name, loc2_name = locs[0], locs[1]
-
-                    self._get_or_create_location_unsafe(loc1_name)
-                    self._get_or_create_location_unsafe(loc2_name)
-
-                    if action == 'CREATE':
-                        self.location_graph[loc1_name].add(loc2_name)
-                        self.location_graph[loc2_name].add(loc1_name)
-                        new_connection_created = True
-                        lg.info(f"Создана связь между '{loc1_name}' и '{loc2_name}'.")
-                    elif action == 'DESTROY':
-                        self.location_graph[loc1_name].discard(loc2_name)
-                        self.location_graph[loc2_name].discard(loc1_name)
-                        lg.info(f"Разорвана связь между '{loc1_name}' и '{loc2_name}'.")
-
-            if flags_update := state_changes.get('world_flags_update'):
-                self.world_flags.update(flags_update)
-                lg.info(f"Глобальные флаги обновлены: {flags_update}")
-
-            if player_updates := state_changes.get('player_updates'):
-                for p_update in player_updates:
-                    username = p_update.get('username')
-                    player = self.players.get(username)
-                    if not player:
-                        lg.warning(f"Не удалось применить изменения: игрок '{username}' не найден.")
-                        continue
-
-                    if 'inventory_add' in p_update:
-                        player.inventory.extend(
-                            item for item in p_update['inventory_add'] if item not in player.inventory)
-                    if 'inventory_remove' in p_update:
-                        player.inventory = [item for item in player.inventory if
-                                            item not in p_update['inventory_remove']]
-
-                    if effects_update := p_update.get('status_effects_update'):
-                        if effects_to_add := effects_update.get('add'):
-                            for effect_data in effects_to_add:
-                                if not any(e.name == effect_data['name'] for e in player.status_effects):
-                                    player.status_effects.append(StatusEffect(**effect_data))
-                        if effects_to_remove := effects_update.get('remove'):
-                            player.status_effects = [e for e in player.status_effects if
-                                                     e.name not in effects_to_remove]
-
-                    if new_location_name := p_update.get("move_to_location"):
-                        await self._move_player_to_location_unsafe(player, new_location_name, moved_players_info)
+        lg.info(f"Применение изменений хода к миру: {state_changes}")
+        player_updates = self._checked_player_updates(state_changes.get('player_updates'))
+        stale_locations, stale_players = (self._stale_entities(state_changes, player_updates, base)
+                                          if base else (set(), set()))
+
+        if location_updates := state_changes.get('location_updates'):
+            for update in location_updates:
+                loc_name = update.get('location_name')
+                if not loc_name: continue
+                if loc_name in stale_locations:
+                    lg.warning(f"Изменение локации '{loc_name}' отброшено: ее изменили после начала хода.")
+                    continue
+                location = self._get_or_create_location(loc_name)
+                location.version += 1
+                if 'description' in update:
+                    location.description = update['description']
+                    lg.info(f"Описание локации '{loc_name}' обновлено/создано.")
+
+                if parent_loc_name := update.get("parent_location"):
+                    if location.parent_location and location.parent_location in self.locations:
+                        self.locations[location.parent_location].discard_sub_location(loc_name)
+
+                    parent_location = self._get_or_create_location(parent_loc_name)
+                    parent_location.add_sub_location(location.name)
+                    parent_location.version += 1
+                    location.parent_location = parent_location.name
+                    lg.info(f"Локация '{loc_name}' теперь является дочерней для '{parent_loc_name}'.")
+
+        if connection_updates := state_changes.get('connection_updates'):
+            for conn_update in connection_updates:
+                action = conn_update.get('action')
+                locs = conn_update.get('locations')
+                if not all([action, isinstance(locs, list), len(locs) == 2]):
+                    lg.warning(f"Пропущен неполный connection_update: {conn_update}")
+                    continue
+                loc1_name, loc2_name = locs[0], locs[1]
+
+                self._get_or_create_location(loc1_name).version += 1
+                self._get_or_create_location(loc2_name).version += 1
+
+                if action == 'CREATE':
+                    self.connectivity.connect(loc1_name, loc2_name)
+                    new_connection_created = True
+                    lg.info(f"Создана связь между '{loc1_name}' и '{loc2_name}'.")
+                elif action == 'DESTROY':
+                    self.connectivity.disconnect(loc1_name, loc2_name)
+                    lg.info(f"Разорвана связь между '{loc1_name}' и '{loc2_name}'.")
+
+        if flags_update := state_changes.get('world_flags_update'):
+            self.world_flags.update(flags_update)
+            self.world_flags_version += 1
+            lg.info(f"Глобальные флаги обновлены: {flags_update}")
+
+        if player_updates:
+            for p_update in player_updates:
+                username = p_update['username']
+                player = self.players.get(username)
+                if not player:
+                    lg.warning(f"Не удалось применить изменения: игрок '{username}' не найден.")
+                    continue
+                if username in stale_players:
+                    lg.warning(f"Изменения игрока '{username}' отброшены: он вне группы хода или изменился после его начала.")
+                    continue
+                player.version += 1
+
+                for item in p_update['inventory_add']:
+                    player.edit_inventory().add(item)
+                for item in p_update['inventory_remove']:
+                    player.edit_inventory().remove(item)
+
+                for effect in p_update['effects_add']:
+                    player.edit_status_effects().add(effect)
+                for effect_name in p_update['effects_remove']:
+                    player.edit_status_effects().remove(effect_name)
+
+                if new_location_name := p_update['move_to_location']:
+                    self._move_player_to_location(player, new_location_name, moved_players_info)
 
         return moved_players_info, new_connection_created
 
-    async def _move_player_to_location_unsafe(self, player: Player, new_location_name: str,
-                                              moved_players_info: List[Tuple[Player, Optional[str]]]):
+    @staticmethod
+    def _checked_player_updates(player_updates: Any) -> List[Dict[str, Any]]:
+        """
+        Проверяет player_updates из ответа модели до применения хода: неверный элемент посреди применения
+        оставил бы ход примененным наполовину. Неверные записи и элементы пропускаются с предупреждением.
+        Возвращает записи с ключами username, inventory_add, inventory_remove, effects_add (StatusEffect),
+        effects_remove и move_to_location.
         """
-        Внутренний небезопасный метод для перемещения игрока. Предполагает, что блокировка уже захвачена.
+        if not player_updates:
+            return []
+        if not isinstance(player_updates, list):
+            lg.warning(f"Пропущен player_updates не в виде списка: {player_updates}")
+            return []
+
+        def listed(values: Any, what: str, username: str) -> List[Any]:
+            if not isinstance(values, list):
+                lg.warning(f"Пропущен {what} игрока '{username}' не в виде списка: {values}")
+                return []
+            return values
+
+        def strings(values: Any, what: str, username: str) -> List[str]:
+            values = listed(values, what, username)
+            valid = [value for value in values if isinstance(value, str)]
+            if len(valid) != len(values):
+                lg.warning(f"Пропущены нестроковые элементы {what} игрока '{username}': {values}")
+            return valid
+
+        checked = []
+        for p_update in player_updates:
+            username = p_update.get('username') if isinstance(p_update, dict) else None
+            if not isinstance(username, str):
+                lg.warning(f"Пропущен player_update без имени игрока: {p_update}")
+                continue
+            effects_update = p_update.get('status_effects_update') or {}
+            if not isinstance(effects_update, dict):
+                lg.warning(f"Пропущен status_effects_update игрока '{username}' не в виде объекта: {effects_update}")
+                effects_update = {}
+            effects_add = []
+            for effect_data in listed(effects_update.get('add') or [], 'status_effects_update.add', username):
+                try:
+                    effect = StatusEffect(**effect_data)
+                except TypeError:
+                    effect = None
+                if (effect is None or not isinstance(effect.name, str)
+                        or not isinstance(effect.duration_turns, (int, type(None)))):
+                    lg.warning(f"Пропущен неверный статусный эффект игрока '{username}': {effect_data}")
+                    continue
+                effects_add.append(effect)
+            move_to_location = p_update.get('move_to_location')
+            if move_to_location is not None and not isinstance(move_to_location, str):
+                lg.warning(f"Пропущено перемещение игрока '{username}' не по имени локации: {move_to_location}")
+                move_to_location = None
+            checked.append({
+                'username': username,
+                'inventory_add': strings(p_update.get('inventory_add') or [], 'inventory_add', username),
+                'inventory_remove': strings(p_update.get('inventory_remove') or [], 'inventory_remove', username),
+                'effects_add': effects_add,
+                'effects_remove': strings(effects_update.get('remove') or [], 'status_effects_update.remove', username),
+                'move_to_location': move_to_location,
+            })
+        return checked
+
+    def _stale_entities(self, state_changes: Dict[str, Any], player_updates: List[Dict[str, Any]],
+                        base: WorldSnapshot) -> Tuple[Set[str], Set[str]]:
         """
+        Локации и игроки из ответа модели, которые после снятия base изменил другой ход
+        (а также игроки вне среза). Считается по версиям до применения изменений этого хода.
+        """
+        stale_locations = set()
+        for update in state_changes.get('location_updates') or ():
+            loc_name = update.get('location_name')
+            location = self.locations.get(loc_name)
+            base_version = base.location_version(loc_name) if location else None
+            if base_version is not None and location.version != base_version:
+                stale_locations.add(loc_name)
+
+        stale_players = set()
+        for p_update in player_updates:
+            username = p_update['username']
+            player = self.players.get(username)
+            if player and player.version != base.player_version(username):
+                stale_players.add(username)
+        return stale_locations, stale_players
+
+    def _move_player_to_location(self, player: Player, new_location_name: str,
+                                 moved_players_info: List[Tuple[Player, Optional[str]]]):
         old_location_name = player.location_name
-        lg.info(f"Перемещение игрока '{player.username}' из '{old_location_name}' в '{new_location_name}' (unsafe).")
+        lg.info(f"Перемещение игрока '{player.username}' из '{old_location_name}' в '{new_location_name}'.")
 
         if old_location_name and old_location_name in self.locations:
             self.locations[old_location_name].remove_player(player.username)
 
-        player.location_name = new_location_name
-        new_location = self._get_or_create_location_unsafe(new_location_name)
+        new_location = self._get_or_create_location(new_location_name)
+        player.location_name = new_location.name
+        player.version += 1
         new_location.add_player(player.username)
+        self.roster_version += 1
 
         moved_players_info.append((player, old_location_name))
 
-    async def get_connected_component(self, start_location_name: str) -> Set[str]:
-        """Находит все связанные локации, начиная с заданной, используя поиск в ширину (BFS)."""
-        async with self._lock:
-            if start_location_name not in self.location_graph:
-                return {start_location_name}
-
-            visited: Set[str] = set()
-            queue: List[str] = [start_location_name]
-            while queue:
-                current_loc = queue.pop(0)
-                if current_loc not in visited:
-                    visited.add(current_loc)
-                    for neighbor in self.location_graph.get(current_loc, set()):
-                        if neighbor not in visited:
-                            queue.append(neighbor)
-            return visited
+    async def get_connected_component(self, start_location_name: str) -> FrozenSet[str]:
+        """Возвращает все локации, связанные с заданной, из поддерживаемого индекса связности."""
+        return self.connectivity.component(start_location_name)
 
     async def get_player(self, username: str) -> Optional[Player]:
-        async with self._lock:
-            return self.players.get(username)
+        return self.players.get(username)
 
     async def get_players_in_locations(self, location_names: Iterable[str]) -> List[Player]:
         """Возвращает список моделей Player в указанных локациях."""
-        async with self._lock:
-            players_found: List[Player] = []
-            for name in location_names:
-                location = self.locations.get(name)
-                if location:
-                    players_found.extend(
-                        self.players[uname] for uname in location.players_present if uname in self.players)
-            return players_found
+        players_found: List[Player] = []
+        for name in location_names:
+            location = self.locations.get(name)
+            if location:
+                players_found.extend(
+                    self.players[uname] for uname in location.players_present if uname in self.players)
+        return players_found
 
     async def get_all_players(self) -> List[Player]:
-        async with self._lock:
-            return list(self.players.values())
+        return list(self.players.values())
 
     async def get_all_player_usernames(self) -> List[str]:
         """Возвращает список имен всех игроков в игре."""
-        async with self._lock:
-            return list(self.players.keys())
+        return list(self.players.keys())
 
     async def reset_to_lobby(self):
         """Сбрасывает состояние игры в лобби."""
-        async with self._lock:
-            lg.info("Сброс состояния игры в 'лобби'.")
-            self.state = 'lobby'
-            self.locations.clear()
-            self.location_graph.clear()
-            self.world_flags.clear()
-            lg.debug("Все локации, связи и глобальные флаги очищены.")
-            for player in self.players.values():
-                player.reset()
-            lg.info(f"Все {len(self.players)} игроков перемещены в 'лобби', их состояние сброшено.")
-
-    async def start_game(self) -> bool:
-        """Начинает игру, перемещая игроков из лобби."""
-        async with self._lock:
-            if self.state != 'lobby':
-                lg.warning(f"Попытка начать игру, когда состояние не 'лобби' (текущее: '{self.state}').")
-                return False
-            self.state = 'active'
-            lg.info(
-                f"Состояние игры изменено на 'active'. Перемещение игроков в стартовую комнату '{self.start_room}'.")
-            start_location = self._get_or_create_location_unsafe(self.start_room)
-            for player in self.players.values():
-                player.location_name = self.start_room
-                start_location.add_player(player.username)
-            return True
+        lg.info("Сброс состояния игры в 'лобби'.")
+        self.state = 'lobby'
+        self.roster_version += 1
+        self.locations.clear()
+        self.connectivity.clear()
+        self.world_flags.clear()
+        self.world_flags_version += 1
+        lg.debug("Все локации, связи и глобальные флаги очищены.")
+        for player in self.players.values():
+            player.reset()
+        lg.info(f"Все {len(self.players)} игроков перемещены в 'лобби', их состояние сброшено.")
+
+    async def start_game(self, story_id: Optional[str] = None) -> bool:
+        """Начинает игру по истории story_id (по умолчанию — по прошлой или стандартной), перемещая игроков из лобби."""
+        if self.state != 'lobby':
+            lg.warning(f"Попытка начать игру, когда состояние не 'лобби' (текущее: '{self.state}').")
+            return False
+        story_id = story_id or self.story_id
+        story = STORY_LIBRARY.get(story_id)
+        if story is None:
+            lg.error(f"Игра не начата: история '{story_id}' не найдена или содержит ошибки.")
+            return False
+        self.story_id, self.story, self.start_room = story_id, story, story.start_room
+        self.state = 'active'
+        self.roster_version += 1
+        lg.info(
+            f"Состояние игры изменено на 'active'. Перемещение игроков в стартовую комнату '{self.start_room}'.")
+        start_location = self._get_or_create_location(self.start_room)
+        for player in self.players.values():
+            player.location_name = self.start_room
+            start_location.add_player(player.username)
+        return True
 
     async def get_world_graph_data(self) -> Dict[str, Any]:
         """Собирает и возвращает полную структуру мира для визуализации."""
-        async with self._lock:
-            locations_data = []
-            for name, loc in self.locations.items():
-                locations_data.append({
-                    "name": name,
-                    "parent": loc.parent_location,
-                    "players": list(loc.players_present)
-                })
-
-            connections_data = []
-            for loc_name, neighbors in self.location_graph.items():
-                for neighbor in neighbors:
-                    if loc_name < neighbor:
-                        connections_data.append(sorted([loc_name, neighbor]))
-
-            return {
-                "locations": locations_data,
-                "connections": connections_data
-            }
+        locations_data = []
+        for name, loc in self.locations.items():
+            locations_data.append({
+                "name": name,
+                "parent": loc.parent_location,
+                "players": list(loc.players_present)
+            })
+
+        connections_data = [list(edge) for edge in self.connectivity.edges()]
+
+        return {
+            "locations": locations_data,
+            "connections": connections_data
+        }
 
     async def is_game_active(self) -> bool:
-        async with self._lock:
-            return self.state == 'active'
+        return self.state == 'active'
 
     async def get_full_config(self) -> Dict[str, Any]:
         """Возвращает словарь с текущими настраиваемыми параметрами."""
-        async with self._lock:
-            return {
-                "fear_weights": self.fear_weights.copy(),
-                "story_injection_turns": self.story_injection_turns,
-                "immersion_turns": self.immersion_turns,
-                "max_history_char_length": self.max_history_char_length,
-            }
+        return {
+            "fear_weights": self.fear_weights.copy(),
+            "story_injection_turns": self.story_injection_turns,
+            "immersion_turns": self.immersion_turns,
+            "max_history_char_length": self.max_history_char_length,
+            "story": self.story_id,
+        }
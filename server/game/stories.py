@@ -1,638 +0,0 @@
-STORIES = {
-    'endless_metro': {
-        'use_world_flags': True,
-        'initial_description':
-            'Бетонный лабиринт станции метро пуст и гулок. Это не тишина, а слышимое давление, вакуум, в котором когда-то кипела жизнь. Холодный свет люминесцентных ламп выбеливает цвета, превращая все в стерильный, безжизненный пейзаж. Воздух неподвижен, тяжелый от запаха озона, пыли и чего-то неопределенно-металлического, словно от поезда, который никогда не прибудет. Это не просто место — это чистилище из бетона и стали, негативное пространство, определенное отсутствием всего, что вы знаете.',
-
-        'atmosphere_overall_concept':
-            'Пространство ощущается неправильным, его геометрия враждебна. Длинные коридоры кажутся длиннее, когда вы идете по ним, а углы скрывают больше, чем должны. Ощущение потерянности смешивается с клаустрофобией и агорафобией одновременно. Это не просто пустое место, а хищная, разумная система, работающая по своим, чуждым законам, и вы в ней — сбой, инородный элемент, который система пытается переварить, ассимилировать или отторгнуть самым жестоким образом.',
-
-        'details': {
-            'primitive': {
-                'sounds': [
-                    'Тихий скрежет, будто кто-то водит ногтем по кафельной плитке за углом.',
-                    'Эхо ваших собственных шагов, которое кажется искаженным, словно за вами идет кто-то еще, идеально попадая в такт.',
-                    'Плач ребенка, который, кажется, доносится прямо из-за вашей спины, но там никого нет.',
-                    'Скрежет тормозов поезда, который заканчивается звуком, пугающе похожим на человеческий крик.',
-                    'Голос в динамике шепотом произносит ваше имя, а затем просит о помощи.',
-                    'Тихий, но настойчивый стук из-за двери с надписью "ВЫХОДА НЕТ".',
-                    'Нарастающий по громкости скрип резиновых подошв по полу, который резко обрывается прямо за вашей спиной.',
-                    'Металлический скрежет из туннеля, словно что-то тяжелое и острое медленно тащат по рельсам.',
-                    'Влажный, прерывистый вздох прямо у вашего уха, который исчезает, как только вы поворачиваетесь.',
-                    'Сухой, отрывистый кашель из запертой подсобки, который повторяется каждые несколько минут.',
-                    'Звук падающих гильз на бетонный пол, доносящийся из вагона поезда, двери которого плотно закрыты.',
-                    'Звук мокрого шлепка, будто с потолка упал большой кусок сырого мяса, но на полу ничего нет.',
-                    'Чавкающий звук из-под края платформы, как будто крупное животное что-то ест.',
-                    'Резкий, пронзительный визг, похожий на звук работающей дрели, который внезапно раздается из туннеля и так же внезапно обрывается.',
-                    'Глухой удар, будто кто-то с силой ударился о металлическую дверь с другой стороны, а затем — сползающий вниз скрежет.',
-                    'Отчетливый хруст, словно кто-то медленно ломает сухую ветку, доносящийся из-за вашей спины. Звук пугающе похож на ломающуюся кость.',
-                    'Влажный, булькающий звук, будто кто-то пытается дышать через жидкость, исходящий из дренажной решетки в полу.',
-                    'Низкое, утробное рычание, которое, кажется, вибрирует в самом бетоне под вашими ногами.',
-                    'Звук быстрого, сухого щелканья, как будто множество насекомых с хитиновым панцирем бежит по трубам внутри стен.',
-                    'Сдавленный стон, который доносится из переполненной мусорной урны.',
-                    'Звук рвущейся ткани, который раздается прямо за вами, но ваша одежда цела.',
-                    'Высокочастотный писк, как от медицинского оборудования, который на мгновение оглушает вас, а затем пропадает.',
-                    'Звук, похожий на то, как кто-то медленно затачивает нож о бетонную стену в соседнем коридоре.',
-                    'Низкий, протяжный вой, который доносится из туннеля и заставляет вибрировать рельсы.',
-                    'Звук падения чего-то тяжелого и мягкого в воду, хотя никакой воды поблизости нет.',
-                    'Скрежет зубов, который раздается из темного угла платформы.',
-                    'Тихое шипение, как от большой змеи, доносящееся из-за рекламного щита.',
-                    'Звук, будто кто-то пытается завести старую бензопилу, доносящийся из кассы.',
-                    'Громкий треск, словно под огромным давлением лопается толстое стекло, но все стекла вокруг целы.',
-                    'Едва слышный звук капающей крови на металл, ритмичный и настойчивый.',
-                    'Звук, как будто кто-то быстро царапает стену, пытаясь выбраться, который внезапно прекращается.',
-                    'Тихий, всасывающий звук, как будто из стены вытащили пробку, и оттуда потянуло сквозняком с запахом гнили.',
-                    'Звук работающего сердца, но он слишком громкий и слишком близко, и он не ваш.',
-                    'Шелест, будто кто-то волочит по полу тяжелый мешок, наполненный чем-то влажным и комковатым.',
-                    'Резкий крик птицы, похожий на крик чайки, но он раздается прямо у вас над головой и обрывается на полуслове.',
-                ],
-                'sights': [
-                    'Мерцающие лампы, которые на долю секунды выхватывают из темноты туннеля неподвижный силуэт.',
-                    'На путях, между рельсами, что-то темное и влажное медленно и ритмично пульсирует, словно огромное, похороненное под станцией сердце.',
-                    'Тень, которую вы отбрасываете, живет своей жизнью: она длиннее, чем должна быть, и иногда движется, когда вы стоите на месте.',
-                    'Кафельная плитка на полу на мгновение становится прозрачной, и под ней вы видите рой извивающихся, неразличимых форм.',
-                    'Темная жидкость, похожая на кровь, медленно сочится между плитками на стене, образуя уродливый узор.',
-                    'Сквозь вентиляционную решетку в стене вы мельком видите пару глаз, которые тут же исчезают во тьме.',
-                    'Двери вагона остановившегося поезда приоткрыты, и в щели видна чья-то бледная рука, судорожно сжимающая поручень.',
-                    'В отражении лужи на полу вы видите потолок, но на нем все лампы разбиты, а в центре висит темная фигура.',
-                    'На стене виден свежий, кровавый отпечаток ладони, который медленно стекает вниз, оставляя длинный потек.',
-                    'Из-под скамейки выползает и тут же прячется обратно что-то длинное, бледное и сегментированное, похожее на огромную многоножку.',
-                    'В дальнем конце платформы на рельсы капает темная, вязкая жидкость. Когда вы подходите ближе, капли прекращаются, а на рельсах не остается и следа.',
-                    'Одна из плиток на стене слегка выпирает. Когда вы на нее смотрите, она медленно втягивается обратно, словно стена дышит.',
-                    'На полу лежит клок длинных черных волос, будто его вырвали с корнем.',
-                    'Дверь в служебное помещение слегка приоткрыта. В щели виден только один неподвижный, широко раскрытый глаз, смотрящий в никуда.',
-                    'На белой колонне виден четкий, грязный след, как будто кто-то очень высокий прошел и испачкал ее плечом.',
-                    'Из дренажной решетки в полу медленно вытекает и застывает густая, похожая на воск субстанция.',
-                    'На потолке, прямо над вами, расползается сеть тонких, темных трещин, похожих на вены.',
-                    'Стена в конце коридора кажется влажной и покрытой слизью, которая слабо мерцает в свете ламп.',
-                    'На сиденье скамейки вы видите глубокие царапины, как от когтей очень крупного зверя.',
-                    'На рельсах лежит одинокий, вырванный позвонок, слишком большой, чтобы быть человеческим.',
-                    'В окне вагона вы на долю секунды видите отражение кричащего лица, прежде чем оно растворяется в темноте.',
-                    'Из-за угла медленно выползает и тут же втягивается обратно длинный, тонкий палец с обломанным ногтем.',
-                    'В мусорной урне, поверх мусора, лежит аккуратно сложенная человеческая кожа, как сброшенная одежда.',
-                    'На стене, нацарапанная чем-то острым, всего одна фраза: "ОНО ГОЛОДНО".',
-                    'На стекле билетной кассы вы видите жирный отпечаток ладони, который не высыхает, а медленно, на ваших глазах, сползает вниз, оставляя мутный след.',
-                ],
-                'sensations': [
-                    'Чувство пристального взгляда из темноты туннеля, от которого по коже бегут мурашки.',
-                    'Ощущение, будто кто-то невидимый провел ледяным пальцем по вашему позвоночнику.',
-                    'Кожа внезапно начинает зудеть, как будто под ней ползают тысячи крошечных насекомых.',
-                    'Вы чувствуете, как по вашей спине медленно стекает струйка чего-то теплого, но когда вы проводите рукой, кожа абсолютно сухая.',
-                    'Вы чувствуете, как кто-то тянет за край вашей куртки, но рядом никого нет.',
-                    'Прикоснувшись к стене, вы чувствуете, как она мелко дрожит и теплеет под вашей ладонью, словно кожа крупного животного.',
-                    'Резкий, удушливый запах гниющего мяса, который появляется на несколько секунд и бесследно исчезает.',
-                    'Ощущение, что воздух вокруг вас уплотнился и давит на грудную клетку, мешая дышать.',
-                    'Прикосновение к перилам эскалатора оставляет на руке липкий, маслянистый след, пахнущий ржавчиной и чем-то сладковатым.',
-                    'Волосы на затылке встают дыбом, как будто кто-то дышит вам в шею, но вы не слышите ни звука.',
-                    'Внезапное ощущение тупой боли в одном из зубов, как будто он треснул, но при проверке все на месте.',
-                    'Чувство, что ваши ботинки наполняются чем-то теплым и вязким.',
-                    'Резкий запах озона и горелой плоти, как после удара молнии.',
-                    'Ощущение, что что-то коснулось вашей лодыжки, когда вы проходили мимо края платформы.',
-                    'Внезапный, сильный спазм в мышцах, как от удара током.',
-                    'Чувство, будто что-то маленькое и колючее попало вам в глаз, но когда вы пытаетесь его достать, ничего нет.',
-                    'Ощущение, что ваша одежда стала мокрой и холодной, хотя она сухая на ощупь.',
-                    'Резкий привкус меди и земли во рту.',
-                    'Внезапная, острая боль под ногтем, как от занозы.',
-                    'Чувство, что ваши суставы стали тугими и скрипят при движении.',
-                    'Ощущение, что по вашим волосам кто-то медленно проводит рукой.',
-                    'Кожа на лице внезапно немеет, как после анестезии.',
-                    'Резкий запах аммиака, который заставляет вас закашляться.',
-                    'Чувство, что пол под вами прогибается под чьим-то огромным весом.',
-                    'Ощущение, что воздух, которым вы дышите, холодный и мертвый, в нем нет жизни.',
-                ],
-                'psychological_effects': [
-                    'Непреодолимое желание сойти с платформы на рельсы, словно туннель зовет вас.',
-                    'Паранойя, что станция — это живой организм, который наблюдает за вами, тестирует вас и выносит некий вердикт.',
-                    'Внезапное и ясное осознание, что вы мертвы, которое так же внезапно сменяется уверенностью, что это не так.',
-                    'Вы смотрите на свои руки и на мгновение они кажутся вам чужими, старыми и покрытыми шрамами.',
-                    'Вы открываете рот, чтобы крикнуть, но из горла вырывается лишь тихий, довольный шепот.',
-                    'В голове возникает четкий приказ на незнакомом языке, но вы инстинктивно понимаете его значение: "Не двигайся".',
-                    'Инстинктивное желание забиться в угол и сжаться в комок, как животное, которое чует хищника.',
-                    'Внезапная вспышка животной ярости, желание разбить что-нибудь, ударить в стену.',
-                    'Навязчивая мысль, что если вы закроете глаза, то когда откроете, перед вами будет стоять нечто ужасное.',
-                    'Вспышка чужого воспоминания: вы видите станцию глазами жертвы, которую что-то тащит в туннель.',
-                    'Вы чувствуете иррациональную ненависть к своему отражению.',
-                    'Непреодолимое желание попробовать на вкус ржавчину с перил или пыль с пола.',
-                    'Кратковременная уверенность, что ваше тело — это лишь оболочка, и внутри вас сидит кто-то другой.',
-                    'Вы смотрите на свои руки и не можете вспомнить, как ими двигать.',
-                    'Паническая атака, вызванная осознанием того, что все выходы могут вести в одно и то же место.',
-                ]
-            },
-            'atmospheric': {
-                'sounds': [
-                    'Высокочастотный гул электричества в стенах, который то нарастает, то затихает.',
-                    'Далекий грохот поезда в туннеле, который никогда не становится ближе.',
-                    'Капли, падающие с потолка в идеальном ритме, но на полу нет луж.',
-                    'Ритмичный гул вентиляции, который складывается в подобие медленного, глубокого вдоха и выдоха.',
-                    'Глубокий гул, идущий из-под платформы, словно там работает гигантский, неизвестный механизм.',
-                    'Непрерывный тихий треск, похожий на счетчик Гейгера, исходящий от одной из стен.',
-                    'Тихое, едва различимое жужжание, как от большого роя пчел, доносящееся из-за бетонной стены.',
-                    'Разбитые часы на стене молчат, но вы отчетливо слышите их мерное тиканье у себя в голове.',
-                    'Едва слышный шелест, похожий на звук тысяч сухих листьев, перекатываемых ветром по пустому коридору.',
-                    'Протяжный, меланхоличный скрип, как от старых качелей, доносящийся из темноты.',
-                    'Звук, похожий на пересыпание песка внутри бетонных колонн, словно они — гигантские песочные часы.',
-                    'Глухой, одиночный удар колокола, который разносится по всей станции, а затем тонет в тишине.',
-                    'Звук работающего кинопроектора, доносящийся из пустого вагона.',
-                    'Тихий, гармоничный гул, как от хорового пения, идущий из глубины туннеля.',
-                    'Шепот, который движется вместе с вами, всегда оставаясь на границе слышимости.',
-                    'Звук, как будто кто-то медленно перелистывает страницы огромной книги в полной тишине.',
-                    'Тихий треск, как от догорающего костра, исходящий от рельсов.',
-                    'Звук далекого радио, которое ловит только помехи и обрывки фраз на мертвых языках.',
-                    'Ритмичное, медленное биение, как у гигантского маятника, которое, кажется, задает ритм всей станции.',
-                    'Полная, абсолютная тишина, которая наступает внезапно и длится ровно минуту, прежде чем вернуться к обычному гулу.',
-                    'Звук, как будто кто-то дышит на стекло, доносящийся из-за запертой двери.',
-                    'Тихий, мелодичный звон, как от стеклянных колокольчиков, который раздается, когда вы проходите определенное место.',
-                    'Глубокая вибрация, которая проходит по полу, словно под станцией просыпается что-то огромное.',
-                    'Звук, похожий на отдаленный гудок парохода, доносящийся из вентиляционной шахты.',
-                    'Едва слышное бормотание, как будто кто-то за стеной молится.',
-                ],
-                'sights': [
-                    'Надпись на стене, сделанная пылью: "НЕ СМОТРИ НА ПОТОЛОК". Когда вы смотрите снова, надпись меняется на "СЛИШКОМ ПОЗДНО".',
-                    'Следы мокрых босых ног ведут от края платформы к сплошной бетонной стене и просто исчезают на ней.',
-                    'Идеально чистый, отполированный до блеска участок пола посреди всеобщей грязи, имеющий форму человеческого силуэта.',
-                    'На потолке над вами — мокрая, постоянно расширяющаяся лужа, с которой ничего не капает.',
-                    'Все лампы на станции одного холодного белого цвета, кроме одной, которая горит теплым, живым светом, как от свечи.',
-                    'На одной из плиток на полу вы видите отпечаток мокрой человеческой ладони, которая медленно высыхает на ваших глазах.',
-                    'Пыль на платформе лежит везде, кроме идеального круга в центре, словно там только что кто-то стоял и исчез.',
-                    'Все стрелки на указателях "ВЫХОД" медленно вращаются, как стрелки компаса, указывая в разные стороны.',
-                    'Тень от колонны падает под неправильным углом, словно на станции есть второй, невидимый источник света.',
-                    'Сквозь слой грязи и пыли на стене проступает едва различимый силуэт двери, которой здесь быть не должно.',
-                    'Вы замечаете, что узор на мраморных стенах медленно, почти незаметно, меняется, складываясь в кричащие лица.',
-                    'Пылинки в воздухе не падают, а медленно вращаются, образуя сложные, постоянно меняющиеся узоры.',
-                    'Свет от ламп не рассеивается, а ложится на пол четкими, геометрически правильными фигурами.',
-                    'Конденсат на стенах образует слова, которые исчезают, как только вы пытаетесь их прочесть.',
-                    'В дальнем конце платформы, во тьме, на мгновение загорается и гаснет одинокий красный огонек, как от сигареты.',
-                    'На рельсах лежит толстый слой пыли, но на нем нет ни одного следа, кроме ваших собственных шагов, ведущих сюда.',
-                    'Вы видите, как ваша тень на стене на мгновение становится объемной, отделяется от стены и тут же сливается с ней обратно.',
-
-                    'Сломанный эскалатор неподвижен, но его ступени покрыты свежими, мокрыми следами.',
-                    'Все рекламные плакаты на станции абсолютно пустые, без единого изображения или слова.',
-                    'На стене висит карта метро, но на ней изображена не сеть линий, а схема кровеносной системы человека.',
-                    'Свет ламп на мгновение становится тусклым и желтым, как от газовых фонарей, и вся станция приобретает вид из прошлого века.',
-                    'На полу лежит идеально сохранившийся осенний лист, хотя до поверхности сотни метров бетона.',
-                    'Одна из колонн кажется не бетонной, а вырезанной из цельного куска обсидиана, поглощающего свет.',
-                    'Вы замечаете, что на всех болтах и гайках на станции выгравированы крошечные, неизвестные символы.',
-                    'Вода, капающая с потолка, не оставляет луж, а впитывается в бетон, как в губку.',
-                ],
-                'sensations': [
-                    'Внезапные "карманы" ледяного холода, которые вы проходите, словно невидимая дверь в морозильник открылась и закрылась.',
-                    'Ощущение резкого изменения давления в ушах, будто станцию внезапно опустили на сотни метров под землю.',
-                    'Пол под ногами кажется слегка мягким и упругим, как будто вы идете по чему-то живому.',
-                    'Воздух становится густым и вязким, дышать труднее, словно вы погружаетесь в воду.',
-                    'Резкое чувство статического электричества в воздухе, от которого волосы встают дыбом, прямо перед тем, как происходит что-то странное.',
-                    'Пол под ногами внезапно становится теплым, словно глубоко под ним только что прошел невидимый горячий состав.',
-                    'Воздух на мгновение приобретает запах старых книг и формальдегида, как в заброшенном архиве или морге.',
-                    'Внезапный запах горячего воска и ладана, как в старой церкви.',
-                    'Ощущение, что пол слегка наклонен, хотя визуально он идеально ровный, из-за чего вас постоянно клонит в сторону туннеля.',
-                    'Чувство, что время замедляется, ваши движения становятся вязкими, а звуки — протяжными.',
-                    'Внезапное ощущение абсолютной тишины в ушах, как будто вы оглохли, которое проходит через несколько секунд.',
-                    'Ощущение, что воздух вибрирует на низкой, не слышимой, но ощутимой частоте.',
-                    'Чувство, что вы находитесь на огромной высоте, и пол под вами — это лишь тонкая перегородка над бездной.',
-                    'Прикоснувшись к металлической поверхности, вы чувствуете, что она не холодная, а абсолютно нейтральная, без температуры.',
-                    'Резкий запах выжженной земли и серы, который пропадает так же внезапно, как и появился.',
-                    'Ощущение, что ваше тело становится тяжелее с каждым шагом, как будто гравитация усиливается.',
-                    'Внезапное чувство, что вы промокли до нитки, хотя на вас нет ни капли влаги.',
-                    'Ощущение, что воздух сухой и горячий, как в пустыне.',
-                    'Чувство, что кто-то дует вам в лицо, хотя вокруг нет ни малейшего движения воздуха.',
-                    'Ощущение, что вы проходите сквозь невидимую паутину, которая липнет к лицу и рукам.',
-                    'Вкус пыли и тлена на языке.',
-                    'Ощущение, что перила, к которым вы прикасаетесь, медленно поворачиваются под вашей рукой.',
-                    'Чувство, что воздух вокруг вас становится разреженным, как на вершине горы.',
-                    'Прикосновение к стене вызывает в руке ощущение легкого покалывания, которое медленно ползет вверх по руке.',
-                    'Ощущение, что на вас смотрят не глаза, а что-то другое, не имеющее названия.',
-                ],
-                 'psychological_effects': [
-                    'Волна иррациональной, всепоглощающей тоски или скорби по кому-то, кого вы никогда не знали.',
-                    'Иррациональный страх перед прямыми линиями и правильными углами, отчего вы начинаете держаться ближе к колоннам и изогнутым стенам.',
-                    'Вы перестаете воспринимать цвета, мир на несколько секунд становится черно-белым, как в старом кино.',
-                    'Навязчивое желание начать чистить грязную плитку или поправлять криво висящий плакат, словно вы — часть обслуживающего персонала этого места.',
-                    'Чувство странного уюта и безопасности, которое вы испытываете, стоя у самого края платформы и глядя в темный туннель.',
-                    'Внезапная, острая ностальгия по звуку приближающегося поезда, которого вы одновременно боитесь.',
-                    'Ощущение, что вы — экспонат в музее, и невидимые посетители смотрят на вас сквозь невидимое стекло.',
-                    'Вы смотрите на схему метро и чувствуете, что она смотрит на вас в ответ.',
-                    'Чувство, что вы находитесь в сакральном месте, и ваше присутствие здесь — это кощунство.',
-                    'Непреодолимое желание лечь на рельсы и ждать поезда, не из страха или отчаяния, а из чувства, что это — ваше предназначение.',
-                    'Внезапное осознание того, насколько огромна и пуста Вселенная, и насколько вы в ней одиноки.',
-                    'Вы начинаете видеть симметрию и порядок в хаосе грязи и разрухи, и это кажется вам прекрасным.',
-                    'Чувство, что вы — всего лишь мысль в сознании чего-то гораздо большего, и оно может в любой момент перестать о вас думать.',
-                    'Вы смотрите на указатель "ВЫХОДА НЕТ" и чувствуете не страх, а облегчение.',
-                    'Иррациональная привязанность к какому-либо объекту на станции: скамейке, колонне, сломанному автомату, — и желание защитить его.',
-                ]
-            },
-            'dissonance': {
-                'sounds': [
-                    'Глухой детский смех, доносящийся из вентиляционной шахты.',
-                    'Скрип турникета, который медленно проворачивается сам по себе, будто пропуская невидимого пассажира.',
-                    'Механический скрежет остановившегося эскалатора, который на мгновение пытается поехать в обратную сторону.',
-                    'Звук падающей монеты в автомате с напитками, который вы точно знаете, что пуст и отключен от сети.',
-                    'Звук вашего собственного сердцебиения, но доносящийся не из груди, а из дальнего конца платформы.',
-                    'Звук пишущей ручки из пустой кассы, который резко прекращается, когда вы подходите ближе.',
-                    'Щелчки перелистывающегося табло, хотя все экраны на станции — цифровые. Оно пытается составить ваше имя из названий станций.',
-                    'Тихий, мелодичный напев, похожий на колыбельную, доносящийся из мусорной урны.',
-                    'Отчетливое пение лесной птицы, доносящееся из-под рельсов.',
-                    'Звук приближающегося поезда, который становится все тише по мере приближения, пока не исчезает в полной тишине прямо перед платформой.',
-                    'Громкий, отчетливый храп, исходящий из одного из громкоговорителей на потолке.',
-                    'Мурлыканье кошки, доносящееся из-под скамейки, но когда вы заглядываете, там лишь пыль и тьма.',
-                    'Далекий звук церковного колокола, который бьет тринадцать раз.',
-                    'Звук закипающего чайника, исходящий от запертой двери в подсобку.',
-                    'Шум дождя и раскаты грома, которые слышны только тогда, когда вы стоите под навесом платформы.',
-                    'Из туннеля доносится искаженная, зацикленная мелодия из детской музыкальной шкатулки.',
-                    'Тихий плеск воды, как будто кто-то гребет веслами, доносящийся из-за поворота коридора.',
-                    'Звук работающей газонокосилки, который медленно перемещается по платформе.',
-                    'Из динамиков доносится звук настраиваемого оркестра.',
-                    'Тихий стук пишущей машинки, доносящийся из туннеля.',
-                    'Звук аплодисментов, который раздается после того, как вы совершаете любое действие, например, поднимаете монету.',
-                    'Крик дельфина, четкий и ясный, который раздается из громкоговорителя и сменяется статикой.',
-                    'Звук застегивающейся молнии, который раздается по всей длине туннеля.',
-                    'Тихий звук работающего камина, с потрескиванием дров, исходящий из-за бетонной стены.',
-                    'Шум прибоя, который становится громче, когда вы закрываете глаза, и тише, когда открываете.',
-                ],
-                'sights': [
-                    'Отражение в окне прибывшего пустого вагона показывает платформу, полную людей, но там никого нет.',
-                    'Стрелки на часах на стене, которые начинают идти в обратную сторону.',
-                    'Ваше отражение в темном стекле билетной кассы на мгновение отстает от ваших движений.',
-                    'Единственная работающая камера наблюдения показывает эту же платформу, но заросшую мхом и полуразрушенную, словно прошли десятилетия.',
-                    'На рельсах, прямо под платформой, лежит одинокая, свежая садовая роза, нетронутая грязью и ржавчиной.',
-                    'Посреди платформы, пробив бетон, растет одинокий, идеально здоровый подсолнух, повернутый к самому темному участку туннеля.',
-                    'На рельсах лежит огромный, покрытый ржавчиной и ракушками морской якорь, вросший в шпалы.',
-                    'Из стены торчит водопроводный кран, из которого вместо воды медленно сыпется мелкий черный пепел.',
-                    'Все скамейки на платформе внезапно оказываются перевернутыми вверх ножками, хотя вы не слышали ни звука.',
-                    'На скамейке стоит аквариум, в котором вместо рыбки плавает одна единственная связка старых ключей.',
-                    'Из стены торчит рука манекена, одетая в белую перчатку. Она держит старый, пожелтевший билет на поезд.',
-                    'Единственный работающий рекламный экран показывает не рекламу, а помехи, которые медленно складываются в схематическое изображение вашего лица.',
-                    'Двери прибывшего поезда открываются. Внутри вагона — густой, заросший лесной подлесок. Из глубины доносится пение птиц и запах влажной земли.',
-                    'В луже на полу вы видите свое отражение, но оно на несколько лет старше и выглядит изможденным.',
-                    'На одной из скамеек идеально ровно расставлен полный набор хирургических инструментов, блестящих под тусклым светом.',
-                    'Прямо на рельсах стоит старое пианино, его клавиши покрыты пылью, кроме одной, идеально чистой.',
-                    'Из потолка свисает не лампа, а клетка для птиц. Внутри нее — не птица, а человеческий зуб.',
-                    'На стене висит портрет старика в морской форме. Его глаза следят за вами, куда бы вы ни пошли.',
-                    'Пол платформы на мгновение становится абсолютно прозрачным, и вы видите под собой звездное небо.',
-                    'На рельсах, идеально выстроенные в ряд, лежат десятки старых, фарфоровых кукольных голов. Все они смотрят вверх, на вас.',
-                    'С потолка медленно спускается на паутине не паук, а миниатюрный, идеально сделанный стул.',
-                    'В углу стоит одинокий светофор, который переключает цвета с красного на желтый и зеленый в полной тишине.',
-                    'Из стены торчит нос старинного парусного корабля.',
-                    'На полу нарисована классическая игра в "классики", но вместо цифр в клетках — символы алхимических элементов.',
-                    'Посреди платформы стоит одинокая, работающая карусельная лошадка, которая медленно качается взад-вперед без музыки.',
-                ],
-                'sensations': [
-                    'Кратковременное, но сильное головокружение, как будто вся станция накренилась на несколько градусов и вернулась в исходное положение.',
-                    'Внезапный, сильный и совершенно неуместный запах: не просто травы, а свежескошенной травы на кладбище после дождя.',
-                    'Перила эскалатора на ощупь теплые и слегка липкие, как человеческая кожа после долгой болезни.',
-                    'Вкус металла во рту, как будто вы облизали старую батарейку.',
-                    'Воздух на мгновение становится соленым и влажным, и вы чувствуете на лице брызги, как от морской волны.',
-                    'Ощущение, что пол под ногами на долю секунды исчезает, заставляя вас провалиться на сантиметр в пустоту.',
-                    'Внезапный и резкий запах горячего хлеба, который исходит от ржавой мусорной урны.',
-                    'На мгновение вы чувствуете себя невероятно легким, почти невесомым, словно гравитация ослабила свою хватку.',
-                    'Ощущение, что время на секунду замирает, а затем продолжает идти с рывком, вызывая тошноту.',
-                    'Прикоснувшись к рекламному плакату с улыбающимся лицом, вы чувствуете под пальцами биение слабого, нитевидного пульса.',
-                    'Вкус пресной, речной воды во рту, хотя вы ничего не пили.',
-                    'Внезапный запах хлорки, как в бассейне, который заставляет слезиться глаза.',
-                    'Ощущение, что ваши ноги увязли в сухом песке, хотя вы стоите на твердом бетоне.',
-                    'Резкий запах свежего кофе, исходящий из дренажной решетки.',
-                    'Вкус мятной зубной пасты, который внезапно появляется во рту.',
-                    'Ощущение, что по лицу ползет солнечный зайчик, хотя на станции нет ни солнца, ни окон.',
-                    'Внезапный запах цветущей сирени, который кажется удушающим в замкнутом пространстве.',
-                    'Чувство, что вы держите в руке гладкий, холодный камень, хотя ваши руки пусты.',
-                    'Прикосновение к стене оставляет на пальцах не пыль, а мелкую цветочную пыльцу.',
-                    'Внезапное ощущение тепла, как от камина, которое исходит от одной из колонн.',
-                    'Ощущение, что на вас надеты очки, которых нет.',
-                    'Вкус карамели на губах.',
-                    'Резкий запах типографской краски, как от свежей газеты.',
-                    'Ощущение, что ваши волосы стали длиннее и касаются плеч.',
-                    'Чувство, что на вас дует ветер, пахнущий сосновым лесом.',
-                ],
-                'psychological_effects': [
-                    'Ложные воспоминания о детстве, проведенном на этой станции, которые кажутся абсолютно реальными.',
-                    'Вы начинаете сомневаться в собственном отражении, оно кажется вам чужим, враждебным.',
-                    'Вы замечаете, что начинаете думать на языке, которого не знаете, или ваши мысли звучат в голове чужим голосом.',
-                    'Чувство, что вы уже проживали этот момент сотни раз, и вы точно знаете, что произойдет в следующую секунду, но каждый раз ошибаетесь.',
-                    'Вы понимаете, что напеваете себе под нос мелодию, которую никогда раньше не слышали, но знаете ее наизусть.',
-                    'На мгновение вы абсолютно уверены, что все бетонные стены сделаны из спрессованной бумаги, и вам хочется их проткнуть.',
-                    'Вы смотрите на указатель "ВЫХОД" и на секунду читаете его как "ВХОД".',
-                    'Непреодолимое желание лечь на пол и смотреть в потолок, уверенность в том, что это единственное правильное действие.',
-                    'Вы чувствуете себя персонажем сна, который вот-вот проснется, но пробуждение не наступает.',
-                    'Навязчивая идея, что если вы пойдете по рельсам, то придете не в другой туннель, а в свое прошлое.',
-                    'Кратковременная, но абсолютная уверенность, что вы — не человек, а что-то другое, притворяющееся человеком.',
-                    'Вы смотрите на свои руки и видите на них сложные математические формулы, которые тут же исчезают.',
-                    'Внезапное, непреодолимое желание смеяться в ответ на самый пугающий звук.',
-                    'Чувство, что вы находитесь на съемочной площадке, и все вокруг — декорации, которые вот-вот разберут.',
-                    'Вы смотрите на трещину в стене и вдруг понимаете, что это — предложение, написанное на неизвестном вам языке.',
-                ]
-            },
-            'uncertainty': {
-                'sounds': [
-                    'Голос из динамиков объявляет бессмысленный набор цифр или называет несуществующие станции: "Осторожно, двери закрываются. Следующая станция — Тихая Роща..."',
-                    'Едва слышный шепот, который пропадает, как только вы пытаетесь к нему прислушаться.',
-                    'Одинокая рекламная мелодия из цифрового билборда, которая заедает на одной ноте.',
-                    'Шелест газетной страницы, которую переворачивают в абсолютно пустом вагоне остановившегося поезда.',
-                    'Внезапный разряд статики из кнопки экстренной связи, за которым следует одиночное, искаженное помехами рыдание.',
-                    'Звон связки ключей, который удаляется по коридору, в котором нет ни одного человека.',
-                    'Вы слышите звук собственных шагов, но они звучат так, будто вы обуты в другую обувь.',
-                    'Голос в динамике произносит фразу, которую вы только что подумали.',
-                    'Вы слышите, как кто-то зовет вас по имени, но звук идет как будто изнутри вашей головы.',
-                    'Тихий звук тикающих часов, но когда вы находите часы на стене, оказывается, что у них нет стрелок.',
-                    'Вы слышите свой собственный голос, который говорит "не оборачивайся" из-за вашей спины.',
-                    'Звук входящего сообщения на телефоне, который лежит в вашем кармане с разряженной батареей.',
-                    'Голос в динамике называет ваше имя и просит пройти в комнату, которой нет на плане станции.',
-                    'Вы слышите эхо своих мыслей, как будто они отражаются от стен.',
-                    'Звук, как будто кто-то пытается подобрать пароль к замку, доносится из вашего собственного рюкзака.',
-                    'Голос из динамика говорит: "Пассажир в синей куртке, пожалуйста, игнорируйте это сообщение". Вы одеты в синюю куртку.',
-                    'Вы слышите, как в соседнем коридоре кто-то идеально имитирует ваш кашель.',
-                    'Звук, как будто кто-то пишет мелом на доске, но все надписи на станции сделаны краской или выгравированы.',
-                    'Вы слышите звук, который вы точно помните из своего детства, но не можете вспомнить, что это был за звук.',
-                    'Голос в динамике говорит: "Проверка симуляции завершена. Субъект не подозревает".',
-                    'Вы слышите звук открывающейся двери, но все двери вокруг заперты.',
-                    'Шепот, который произносит последовательность случайных чисел, и вы понимаете, что это дата вашего рождения.',
-                    'Вы слышите звук, как будто кто-то листает фотоальбом, но рядом никого нет.',
-                    'Тихий звук, как будто кто-то вводит текст на клавиатуре, который прекращается, когда вы перестаете двигаться.',
-                    'Голос из динамика зачитывает ваше последнее сообщение в мессенджере.',
-                ],
-                'sights': [
-                    'Цифровое табло, показывающее время прибытия "00:00" или абсурдные сообщения вроде "ПОЕЗД БУДЕТ ВЧЕРА".',
-                    'Схема метро на стене, которая меняется, когда вы отворачиваетесь, добавляя новые, невозможные ветки, уходящие в никуда.',
-                    'Рекламные плакаты, на которых лица людей начинают медленно и незаметно искажаться в гримасах, когда вы не смотрите на них прямо.',
-                    'Дверь там, где ее точно не было минуту назад. На ней табличка "Только для персонала", но ручки нет.',
-                    'Одинокий детский ботинок, стоящий идеально по центру платформы, будто его только что сняли.',
-                    'Рекламный постер с пропавшим человеком. Приглядевшись, вы понимаете, что на фото — вы, но в одежде, которой у вас никогда не было.',
-                    'Надписи на указателях меняются на язык, который вы никогда не видели, но интуитивно понимаете его зловещий смысл.',
-                    'В углу платформы стоит одинокий манекен, одетый в вашу одежду.',
-                    'На рельсах, покрытых пылью, видна одинокая, идеально четкая колея от детской коляски, ведущая в туннель.',
-                    'Вы видите, как в дальнем конце платформы гаснет свет. Через секунду он снова зажигается, но скамейка, которая там стояла, исчезла.',
-                    'На схеме метрополитена все названия станций внезапно оказываются анаграммами вашего полного имени.',
-                    'Вы отворачиваетесь от стены на секунду. Когда вы снова на нее смотрите, на ней появляется свежая надпись краской: "Я ВИДЕЛ, ЧТО ТЫ ОТВЕРНУЛСЯ".',
-                    'Ваше отражение в окне вагона в точности повторяет ваши движения, но на его лице — злобная ухмылка.',
-                    'Вы находите на полу ключ от своей квартиры, хотя ваш ключ лежит у вас в кармане.',
-                    'Стрелка на часах на стене замирает, когда вы на нее смотрите, и продолжает идти, когда вы отворачиваетесь.',
-                    'На цифровом табло бегущей строкой идет текст, описывающий ваши действия с задержкой в несколько секунд.',
-                    'Вы видите свое отражение, но оно моргает, когда вы не моргаете.',
-                    'На стене вы видите свою тень, но рядом с ней — тень еще кого-то, хотя вы одни.',
-                    'Надпись "ВЫХОД" на указателе на мгновение меняется на ваше имя.',
-                    'Вы видите на полу следы, ведущие из туннеля, которые в точности совпадают с вашей обувью. Они ведут к тому месту, где вы сейчас стоите, и обрываются.',
-                    'На скамейке лежит раскрытая книга, которую вы читали вчера. В ней закладка на той странице, где вы остановились.',
-                    'Вы смотрите на свои руки и видите, что на них надеты перчатки, которых вы не надевали. Через мгновение они исчезают.',
-                    'На плане эвакуации, в точке "ВЫ ЗДЕСЬ", стоит красная точка, которая медленно пульсирует.',
-                    'Двери поезда открываются, и вы видите внутри точную копию этой же платформы, но без вас.',
-                    'Надпись на стене, сделанная мелом, гласит: "Ты уверен, что ты — это ты?". Когда вы проводите по ней рукой, мел осыпается, но надпись остается.',
-                ],
-                 'sensations': [
-                    'Внезапное ощущение, что ваши карманы наполнились чем-то тяжелым и сыпучим, как песок, но когда вы проверяете, они пусты.',
-                    'Ощущение легкой вибрации, идущей от стен, которая совпадает с ритмом вашего пульса.',
-                    'Кратковременное ощущение, что ваши ботинки стали вам велики на несколько размеров.',
-                    'Ощущение, будто ваши зубы начали слегка крошиться, хотя это не так.',
-                    'Ощущение, будто на ваших плечах лежит тяжелое мокрое пальто, хотя на вас только легкая куртка.',
-                    'Кратковременное чувство, что вы смотрите на мир из точки в нескольких сантиметрах левее вашей головы.',
-                    'Чувство, что кольцо или часы, которых вы никогда не носили, давят вам на палец или запястье.',
-                    'Вы закрываете глаза на секунду, и когда открываете, чувствуете вкус сигаретного дыма, хотя никогда не курили.',
-                    'Ощущение, что в вашем кармане вибрирует телефон, но когда вы его достаете, он выключен.',
-                    'Чувство, что вы только что проснулись, но не можете вспомнить, где вы и кто вы, которое длится несколько мучительных секунд.',
-                    'Ощущение, что ключ в вашем кармане изменил свою форму.',
-                    'Внезапное чувство, что вы забыли, как дышать, и вам приходится делать это сознательно.',
-                    'Ощущение, что ваши ресницы стали длиннее и мешают вам смотреть.',
-                    'Чувство, что ваши пальцы на мгновение стали длиннее и тоньше.',
-                    'Ощущение, что вы идете не вперед, а назад, хотя пейзаж меняется правильно.',
-                    'Вкус лекарства, которое вы принимали в детстве.',
-                    'Ощущение, что на вас надета маска, которую вы не можете снять.',
-                    'Чувство, что вы узнаете запах духов, которыми пользовался кто-то из ваших близких, но не можете вспомнить, кто именно.',
-                    'Ощущение, что шнурки на ваших ботинках развязались, но они на месте.',
-                    'Чувство, что вы только что сказали что-то вслух, но не помните, что именно.',
-                    'Ощущение, что ваши уши заложены, как в самолете, и все звуки кажутся глухими и далекими.',
-                    'Чувство, что вы смотрите на мир через чужие глаза.',
-                    'Ощущение, что одна ваша рука теплее другой.',
-                    'Внезапное чувство, что вы забыли что-то очень важное, но не можете вспомнить, что.',
-                    'Ощущение, что вы — это не вы, а лишь воспоминание о вас.',
-                ],
-                'psychological_effects': [
-                    'Внезапная и полная потеря памяти о том, кто вы и как сюда попали, которая длится несколько мучительных секунд, а затем возвращается.',
-                    'Кратковременная уверенность в том, что все надписи на станции (названия, предупреждения) на самом деле адресованы лично вам.',
-                    'Непреодолимое желание закрыть глаза и начать считать до ста, уверенность, что если вы это сделаете, все исчезнет.',
-                    'Вы слышите свои собственные мысли, но они звучат с легким эхом, как будто кто-то повторяет их у вас за спиной.',
-                    'Вы вдруг понимаете, что не помните цвет своих глаз.',
-                    'Вы пытаетесь вспомнить лицо своей матери, но вместо него в памяти настойчиво всплывает лицо женщины с рекламного плаката.',
-                    'Вы смотрите на свои руки и на секунду не можете с уверенностью сказать, какая из них правая, а какая — левая.',
-                    'Вы уверены, что только что уже пережили следующие 10 секунд, и теперь проживаете их заново.',
-                    'Вы начинаете сомневаться, реальны ли ваши воспоминания о мире за пределами этой станции, или вы были здесь всегда.',
-                    'Вы смотрите на часы и понимаете, что не можете понять, который час, хотя цифры вам знакомы.',
-                    'Вы пытаетесь вспомнить свое имя и на мгновение не можете этого сделать.',
-                    'Чувство, что вы — копия, а оригинал где-то в безопасности.',
-                    'Вы начинаете разговаривать сами с собой вслух, чтобы убедиться, что вы еще здесь.',
-                    'Вы смотрите на простой предмет, например, на скамейку, и на мгновение забываете, как он называется и для чего нужен.',
-                    'Непреодолимое желание вернуться в то место, где вы впервые появились на станции, в надежде, что это все отменит.',
-                ]
-            },
-        },
-        'events': {
-           'primitive': {
-                'unsettling_discovery': [
-                    'Вы находите свой собственный кошелек, который на самом деле лежит у вас в кармане. В найденном кошельке все ваши документы, но фотография на удостоверении личности изображает вас кричащим от ужаса.',
-                    'Вы находите брошенный диктофон. На записи — ваш собственный голос, в панике описывающий то, что с вами произойдет в следующие несколько минут.',
-                    'На стене вы замечаете выцарапанную карту станции, но она помечена странными символами и надписями: "слепая зона", "он ждет здесь", "не дыши в этом коридоре".',
-                    'В служебном помещении вы находите стол, на котором лежит подробный план станции и ваш собственный паспорт, раскрытый на странице с фотографией. Паспорт выглядит старым и потрепанным.',
-                    'Под скамейкой вы находите окровавленный ботинок, идентичный тому, что на вашей ноге.',
-                    'Вы находите свежий, еще теплый труп человека, одетого в точности как вы. Его лицо обезображено до неузнаваемости.',
-                    'В запертой подсобке вы обнаруживаете медицинский стол, на котором лежит гипсовый слепок ваших зубов. Слепок свежий, и на нем видны следы крови.',
-                    'Вы находите груду выброшенной одежды. Покопавшись в ней, вы находите свою собственную куртку, которую вы носили в детстве. Она изрезана и покрыта чем-то темным и застывшим.',
-                    'За отвалившейся плиткой вы обнаруживаете не нишу, а полость, заполненную органической массой, похожей на кокон. Внутри что-то медленно движется.',
-                    'Вы находите свой телефон, хотя ваш настоящий телефон у вас в кармане. На экране найденного телефона открыт чат с одним контактом - "Я". Последнее сообщение от вас: "Оно нашло меня. Не повторяй моих ошибок".',
-                    'На полу лежит куча пепла в форме человеческого силуэта. В центре пепла — несгоревший ключ от вашей квартиры.',
-                    'Вы находите комнату, полную клеток. В каждой клетке — предмет одежды или личная вещь, принадлежавшая вам в разные периоды жизни. На одной из клеток висит табличка с вашим именем и пустой датой смерти.',
-                    'На рельсах вы видите свежие следы, как будто кого-то очень тяжелого волокли в туннель. Рядом лежит одинокая пуговица, оторванная от вашей рубашки.',
-                    'Внутри разбитого информационного стенда вы находите не провода, а переплетенные сухожилия и вены, которые слабо пульсируют.',
-                    'Вы находите несколько вырванных страниц из дневника. Это ваш почерк. В записях вы с ужасом описываете существо, которое охотится на вас, и с каждой записью почерк становится все более неразборчивым и паническим.',
-                ],
-                'warning_sign': [
-                    'Из туннеля доносится не грохот поезда, а звук, похожий на скрежет тысяч ногтей по металлу, и он приближается.',
-                    'Двери поезда перед вами открываются, но внутри не вагон, а сплошная, непроглядная тьма, из которой веет ледяным холодом и запахом крови.',
-                    'Кафельная плитка на стенах начинает медленно осыпаться, обнажая под собой не бетон, а что-то темное, органическое и пульсирующее.',
-                    'Прибывает поезд, но он абсолютно бесшумный. Его двери открываются, и изнутри на вас смотрят десятки ваших точных копий с пустыми глазами.',
-                    'Свет всех ламп на станции становится ярко-красным. Голос в динамике монотонно повторяет: "Начата процедура зачистки. Всем посторонним субъектам приготовиться".',
-                    'На всех цифровых табло появляется одно и то же слово: "БЕГИ".',
-                    'Из вентиляции начинает валить густой, белый туман, пахнущий анестетиком. В тумане слышны торопливые шаги множества людей.',
-                    'В дальнем конце платформы вспыхивает свет, и вы видите, как огромная, неописуемая тень проносится по стене и исчезает в туннеле.',
-                    'Все металлические поверхности на станции внезапно становятся горячими на ощупь, как будто станция — это гигантская печь, которую зажгли.',
-                    'Пол под ногами начинает вибрировать и медленно наклоняться в сторону рельсов, как будто вся станция пытается сбросить вас вниз.',
-                    'Воздух становится едким и начинает разъедать кожу, как слабая кислота. Голос в динамике спокойно объявляет: "Начата процедура стерилизации".',
-                    'Стены коридора начинают медленно сдвигаться, сужая проход. Это не иллюзия — вы слышите скрежет и треск бетона.',
-                    'Прибывает поезд. Его двери открываются, и из вагона вываливается лавина костей и черепов, которые с грохотом рассыпаются по платформе.',
-                    'Свет гаснет. Когда он включается через секунду, вы обнаруживаете, что стоите в центре круга, начерченного на полу чем-то похожим на кровь. Круг медленно начинает сужаться.',
-                    'Из туннеля выезжает не поезд, а гигантская конструкция из ржавого металла и костей, похожая на таран, которая с ревом несется прямо на платформу.',
-                ],
-                'mysterious_encounter': [
-                    'Вы видите на камере наблюдения себя, стоящего в той же точке, но на мониторе за вашей спиной стоит кто-то еще.',
-                    'Вы видите на противоположной платформе свою точную копию. Она смотрит на вас с ужасом, затем указывает пальцем на что-то прямо за вашей спиной.',
-                    'К вам медленно подходит слепой старик с белой тростью. Поравнявшись, он наклоняется и шепчет: "Ты не тем глазам веришь".',
-                    'Из туннеля выезжает на инвалидной коляске человек, полностью замотанный в бинты, как мумия. Он молча проезжает мимо и скрывается в другом туннеле.',
-                    'Из вагона прибывшего поезда выходит человек в костюме химзащиты. Он молча осматривает вас, делает пометку в блокноте, и уходит обратно в поезд, двери которого тут же закрываются.',
-                    'Из темноты коридора выходит фигура, которая движется рывками, как в плохой анимации. Приблизившись, она рассыпается в прах.',
-                    'На скамейке сидит фигура в плаще. Когда вы подходите, она поворачивается, и вы видите, что у нее нет лица — лишь гладкая кожа. Она протягивает к вам руку.',
-                    'Из-за колонны выходит существо, состоящее из переплетения кабелей, труб и кусков металла. Оно движется, как гигантское насекомое, и "чистит" пол, всасывая в себя пыль и мусор. Оно останавливается и поворачивает объектив камеры в вашу сторону.',
-                    'Вы видите другую человеческую фигуру в дальнем конце платформы. Внезапно из потолка опускается нечто, похожее на гигантский крюк, хватает фигуру и с криком утаскивает ее во тьму.',
-                    'К вам подходит женщина с лицом, покрытым шрамами от ожогов. Она молча протягивает вам обугленный детский ботинок, а затем уходит в туннель.',
-                    'Из вагона поезда выходит хирург в окровавленном халате. Он смотрит на вас, затем на свои руки, качает головой и говорит: "Простите, я не смог его спасти".',
-                    'На противоположной платформе вы видите себя, но вы не стоите, а лежите на полу, и над вами склонилась темная фигура, которая что-то с вами делает.',
-                    'К вам подходит ребенок и протягивает вам старую, ржавую шестеренку. "Она выпала из тебя", — говорит он и убегает в темноту.',
-                    'Вы видите существо, которое передвигается по потолку, цепляясь за него длинными, тонкими конечностями. Оно останавливается прямо над вами и смотрит вниз.',
-                    'Из-за угла медленно выходит ваша точная копия, но она движется задом наперед, и ее глаза полны слез. Она проходит сквозь вас и исчезает.',
-                ],
-            },
-            'atmospheric': {
-                'unsettling_discovery': [
-                    'Вы понимаете, что уже проходили мимо этого сломанного автомата с газировкой три раза, хотя шли все время прямо.',
-                    'В мусорной урне вы находите не мусор, а сотни одинаковых, идеально чистых лампочек.',
-                    'Под скамейкой лежит компас, стрелка которого бешено вращается, не в силах найти север.',
-                    'Вы находите расписание движения поездов, датированное 1985 годом. Напротив одного из ночных рейсов стоит пометка карандашом: "Рейс отменен. Бригада не вернулась".',
-                    'На полу лежит обрывок газеты со статьей об открытии этой станции. Фотография в статье выглядит точно так же, как станция сейчас, но дата на газете — из далекого будущего.',
-                    'Вы находите комнату смотрителя. В ней все покрыто толстым слоем пыли, кроме одного стула, стоящего перед стеной, как будто кто-то сидел на нем секунду назад, глядя в бетон.',
-                    'На стене вы видите следы от снятых картин или плакатов. Пыль вокруг них образует контуры произведений искусства, которые вы смутно узнаете, но не можете вспомнить.',
-                    'В стене вы обнаруживаете замурованную дверь. Приложив к ней ухо, вы слышите с другой стороны звуки оживленного города: гудки машин, смех, музыку.',
-                    'Вы находите старый, брошенный инструмент — скрипку без струн. Когда вы берете ее в руки, вы слышите в своей голове прекрасную, но душераздирающую мелодию.',
-                    'На одной из колонн вы замечаете выцарапанную линию за линией, как в тюремной камере. Их тысячи. Последняя линия свежая.',
-                    'Вы находите план эвакуации. На нем станция изображена не как часть метро, а как центральная камера в огромном, сложном лабиринте, у которого нет выходов.',
-                    'В туалете, в одной из кабинок, на полу аккуратно расставлены десятки пар старой, изношенной детской обуви.',
-                    'Вы находите журнал наблюдений, в котором неизвестный описывает вас: вашу одежду, ваши движения, ваши реакции на события. Последняя запись: "Субъект нашел журнал".',
-                    'На рельсах лежит огромный пласт янтаря, внутри которого застыл человек в униформе метрополитена с выражением ужаса на лице.',
-                    'Вы находите комнату, полную часов. Все они остановились в одно и то же время, кроме одних — карманных, которые идут в обратную сторону.',
-                ],
-                'warning_sign': [
-                    'Все огни на станции одновременно гаснут на несколько секунд. Когда они включаются, вы стоите лицом в другую сторону.',
-                    'Архитектура станции начинает в реальном времени меняться: лестницы ведут в потолок, коридоры изгибаются под невозможными углами.',
-                    'Все тени на станции внезапно отделяются от своих объектов и медленно ползут к одному из туннелей.',
-                    'С потолка начинает медленно падать не пыль, а мелкий, чистый песок, образуя на полу растущие дюны.',
-                    'Все металлические поверхности мгновенно покрываются толстым слоем ржавчины, как будто прошли сотни лет.',
-                    'Температура на станции резко падает, и на стенах выступает иней, складываясь в узоры, похожие на лица.',
-                    'Все звуки на станции, включая ваши шаги, внезапно пропадают. Вы оказываетесь в абсолютной, давящей тишине на несколько секунд.',
-                    'Станция начинает "дышать". Стены медленно и ритмично изгибаются внутрь и наружу с протяжным, глухим вздохом.',
-                    'Все лампы начинают тускнеть, а из глубины туннеля начинает расти интенсивное, неземное свечение, которое отбрасывает ваши тени в неправильном направлении.',
-                    'С потолка начинает капать черная, вязкая жидкость, которая не имеет запаха, но шипит при соприкосновении с полом.',
-                    'Вся станция на мгновение погружается в воду. Вы чувствуете давление, видите проплывающих мимо рыб, а затем все возвращается на свои места. Вы абсолютно сухой, но на полу остались мокрые водоросли.',
-                    'На всех стенах одновременно проступают тысячи человеческих лиц, которые молча открывают рты, как в беззвучном крике, а затем исчезают.',
-                    'Гравитация на мгновение ослабевает, и вы начинаете медленно подниматься в воздух, прежде чем с силой рухнуть обратно на пол.',
-                    'Цвета на станции инвертируются. Бетон становится черным, тени — белыми, а редкие цветные плакаты приобретают кошмарные, кислотные оттенки.',
-                    'Прибывает поезд, но он выглядит как геологический срез: его вагоны состоят из слоев земли, камня и угля, и он движется, издавая скрежет тектонических плит.',
-                ],
-                'mysterious_encounter': [
-                    'Из туннеля выходит уборщик в униформе. Он молча моет пол, игнорируя вас, но вода в его ведре темная и густая, как нефть.',
-                    'Маленькая девочка на скамейке просит вас помочь завязать шнурок. Когда вы наклоняетесь, она шепчет: "Они не любят, когда на них смотрят", и исчезает.',
-                    'На скамейке сидит аквалангист в полном снаряжении и чистит свою маску.',
-                    'Вы видите, как бригада рабочих в старой, выцветшей униформе меняет лампу. Они работают молча и слаженно, но их движения слегка замедлены, как в старом кино. Закончив, они уходят прямо в стену.',
-                    'На платформе стоит одинокий регулировщик движения с жезлом. Он подает поезду, которого нет, сигнал отправления, после чего поворачивается и смотрит на вас.',
-                    'По платформе медленно идет процессия фигур в балахонах, держащих в руках свечи. Они не обращают на вас внимания и исчезают в коридоре, откуда начинает доноситься тихое пение.',
-                    'На рельсах стоит человек и смотрит в туннель. Он оборачивается, и вы видите, что у него вместо лица — старый, разбитый циферблат часов. Он показывает на вас пальцем, и все часы на станции начинают бить одновременно.',
-                    'К вам подходит старая женщина и предлагает купить у нее билет. "В один конец", — говорит она с улыбкой. Билет выглядит как пожелтевший кусок пергамента.',
-                    'Вы видите садовника, который ухаживает за мхом, растущим на стенах. Он подстригает его, поливает из лейки, и, заметив вас, прикладывает палец к губам в знаке тишины.',
-                    'Из туннеля выходит человек, который выглядит абсолютно нормально, за исключением того, что он движется в обратной перемотке: идет спиной вперед, говорит задом наперед, пьет кофе, который вливается обратно в чашку.',
-                    'На скамейке сидит человек и читает книгу. Когда он переворачивает страницу, архитектура станции вокруг вас слегка меняется.',
-                    'К вам подходит человек в форме смотрителя зоопарка и строго говорит: "Пожалуйста, не кормите... обитателей". Он указывает на пустые рельсы.',
-                    'Вы видите группу туристов с гидом. Все они прозрачны, как призраки. Гид указывает на вас и говорит: "А это — последний экземпляр. Он появился здесь в прошлом году".',
-                    'На платформе стоит библиотекарь и расставляет на невидимых полках невидимые книги. Он строго смотрит на вас и шикает, требуя тишины.',
-                    'Из вагона выходит человек, одетый в лохмотья, увешанный десятками работающих часов. Он смотрит на вас и говорит: "У тебя мало времени. У них всех было мало времени".',
-                ],
-            },
-            'dissonance': {
-                'unsettling_discovery': [
-                    'На скамейке лежит раскрытая книга по орнитологии, а рядом — одно-единственное, идеально чистое воронье перо.',
-                    'Вы находите детский рисунок, на котором изображена эта станция, но с солнцем и облаками в потолке.',
-                    'На полу вы видите шахматную доску с незаконченной партией. Вы понимаете, что следующий ход должны сделать черные, и что это — мат в один ход.',
-                    'За отвалившейся плиткой вы находите маленькую нишу, в которой стоит фарфоровая кукла, смотрящая прямо на вас.',
-                    'На рельсах лежит концертный рояль. Одна из его клавиш нажата, и тихая, печальная нота непрерывно звучит по всей станции.',
-                    'В автомате с едой, отключенном от сети, лежит свежий, еще теплый яблочный пирог.',
-                    'Вы находите дверь, на которой висит табличка "Осторожно, мокрый пол", хотя вокруг абсолютно сухо. Открыв дверь, вы видите за ней бескрайний океан под звездным небом.',
-                    'На полу лежит одинокая театральная маска. Когда вы ее поднимаете, все звуки на станции сменяются на шум зрительного зала, аплодисменты и кашель.',
-                    'В мусорной урне вы находите не мусор, а сотни ракушек и морских звезд.',
-                    'На стене висит картина в тяжелой раме. На ней изображена эта же платформа, но с вами, смотрящим на эту же картину.',
-                    'Вы находите комнату, где все предметы, включая стол и стул, вырезаны из цельного куска соли.',
-                    'На рельсах стоит одинокий школьный автобус, пустой и без колес, но его фары горят.',
-                    'На скамейке лежит стопка идеально отглаженных рубашек, но все они сшиты из бетона.',
-                    'В стене вы видите маленькое окошко, как в кассе. Заглянув в него, вы видите не комнату, а густой сосновый лес.',
-                    'Вы находите телефонную будку. Подняв трубку, вы слышите не гудки, а звук собственного дыхания с другой стороны.',
-                ],
-                'warning_sign': [
-                    'Прибывающий поезд не останавливается, а проходит прямо *сквозь* платформу, как призрак.',
-                    'Из всех динамиков станции одновременно начинает играть идеально чистая, студийная запись шума океанского прибоя.',
-                    'На мгновение гравитация меняет направление, и вся пыль и мелкий мусор с пола взмывают к потолку.',
-                    'Из туннеля выкатывается не поезд, а одинокое, идеально круглое каменное ядро.',
-                    'На рельсы из туннеля медленно вытекает поток воды, но он течет вверх по стене, бросая вызов гравитации.',
-                    'Все надписи на стенах ("Выход", название станции) превращаются в бессмысленный набор иероглифов, которые медленно вращаются на месте.',
-                    'С потолка начинают падать не капли воды, а живые, трепещущие мотыльки.',
-                    'Прибывает поезд. Его двери открываются, и вы видите, что каждый вагон — это разная эпоха: в одном — рыцари в доспехах, в другом — люди в костюмах 20-х годов, в третьем — футуристические роботы. Все они смотрят на вас.',
-                    'Станция начинает складываться сама в себя, как оригами. Стены сгибаются, потолок опускается, образуя сложные геометрические фигуры.',
-                    'Из туннеля доносится не звук поезда, а идеальное исполнение "Лунной сонаты" на фортепиано, которое становится все громче и искаженнее.',
-                    'На всех экранах появляется сообщение: "Ошибка рендеринга. Загрузка стандартной локации...". Вся станция на мгновение превращается в бескрайнее пшеничное поле, а затем возвращается обратно.',
-                    'Вся станция заливается ярким, теплым солнечным светом, как в летний полдень. Но тени, которые отбрасывают предметы, движутся с бешеной скоростью, как будто за несколько секунд проходят целые сутки.',
-                    'На рельсы выезжает не поезд, а одинокая больничная койка, на которой кто-то лежит под простыней. Она медленно катится по платформе и исчезает в другом туннеле.',
-                    'Все лампы на станции гаснут, и единственным источником света становятся звезды, которые проступают сквозь бетонный потолок.',
-                    'Из динамиков начинает говорить диктор, который комментирует ваши действия, как в документальном фильме о дикой природе: "А вот наш субъект, потерянный и напуганный, ищет выход. Но он не знает, что выхода нет...".',
-                ],
-                'mysterious_encounter': [
-                    'Появляется контролер и требует у вас билет. Любой предъявленный билет (или его отсутствие) вызывает у него тихий, долгий смех, после чего он проходит сквозь стену.',
-                    'Мимо пробегает обычная собака, но вместо лая из ее пасти доносится искаженная запись станционного объявления.',
-                    'К вам подходит человек в деловом костюме и молча протягивает вам аквариум с золотой рыбкой.',
-                    'Из-за колонны выходит старик в форме смотрителя маяка и спрашивает вас, не видели ли вы его корабль.',
-                    'Из вагона выходит балерина в пачке и пуантах, делает изящный пируэт и прыгает на рельсы, не издав ни звука.',
-                    'По платформе медленно идет человек, который толкает перед собой пустую детскую коляску и тихо напевает колыбельную.',
-                    'На платформе стоит почтальон с сумкой, полной писем без адресов. Он молча протягивает вам сумку, предлагая вытянуть одно. На конверте, который вы достали, написано ваше имя.',
-                    'Из туннеля выходит человек в смокинге и с бабочкой. Он вежливо кланяется, говорит "Представление скоро начнется" и уходит в другой туннель.',
-                    'На скамейке сидит уличный фокусник и тасует колоду карт. Он предлагает вам вытянуть одну. Вытягивая, вы видите, что на карте изображено ваше испуганное лицо.',
-                    'К вам подходит продавец воздушных шаров. Все шары черного цвета. Он предлагает вам один, говоря: "Возьмите, он наполнен тишиной".',
-                    'Из вагона выходит группа людей, одетых в одинаковые серые комбинезоны. Они выстраиваются в очередь перед стеной и по одному проходят сквозь нее.',
-                    'На платформе стоит режиссер в кресле с вашим именем. Он кричит в мегафон: "Плохо! Не верю! Сыграй страх получше! Дубль два!".',
-                    'К вам подходит клерк с папкой и просит вас расписаться в ведомости. В графе "Описание" написано: "Получение экзистенциального опыта".',
-                    'На платформе сидит рыбак и ловит рыбу прямо с края платформы. Внезапно он вытаскивает из пустоты старый, ржавый фонарь, который мигает и гаснет.',
-                    'Из туннеля выходит точная копия вас, но в старинной одежде. Он(а) смотрит на вас с удивлением и спрашивает на старомодном языке: "Простите, сударь/сударыня, не подскажете, как пройти в библиотеку?".',
-                ],
-            },
-            'uncertainty': {
-                'unsettling_discovery': [
-                    'Вы находите газету, датированную завтрашним днем. В ней маленькая заметка о том, что на этой станции был найден человек, пропавший без вести.',
-                    'В брошенной сумке лежит блокнот, исписанный одной и той же фразой: "Следующая станция - конечная".',
-                    'За служебной дверью вы обнаруживаете комнату, полную мониторов, на которых показаны сотни других пустых платформ, идентичных вашей.',
-                    'Ваш телефон внезапно ловит сеть. На нем одно сообщение от вас же самого, отправленное из будущего: "НЕ САДИСЬ В ПОЕЗД".',
-                    'В мусорном баке лежит пачка фотографий с камер наблюдения. На всех — вы, но с каждой фотографией вы выглядите все старше и изможденнее.',
-                    'Вы находите журнал дежурного по станции. Последняя запись сделана десятки лет назад и гласит: "Оно снова меняет геометрию. Я видел нового. Он выглядит так же, как и я, когда только попал сюда...".',
-                    'Вы находите видеокамеру с записью. На ней вы видите себя, входящего на эту станцию, но на видео вы одеты по-другому и выглядите на несколько лет моложе.',
-                    'Вы находите записку, написанную вашим почерком: "Перестань оставлять себе записки. Это не помогает".',
-                    'На полу лежит карта памяти от камеры. На ней — сотни фотографий этой станции, сделанных с того места, где вы стоите. Но на последней фотографии, вместо вас, стоит кто-то другой.',
-                    'Вы находите свой собственный череп, идеально очищенный, с небольшой трещиной на лбу.',
-                    'В комнате отдыха вы видите на столе недоеденный бутерброд и чашку кофе — в точности такие, какие вы ели на завтрак, прежде чем попасть сюда.',
-                    'Вы находите аудиокассету с пометкой "Мои воспоминания". Прослушав ее, вы слышите, как незнакомый голос описывает вашу жизнь с абсолютной точностью.',
-                    'На стене вы видите надпись: "Какой из них ты?". Рядом — два зеркала. В одном отражаетесь вы, а другое — абсолютно черное.',
-                    'Вы находите отчет о психологическом тесте, который вы никогда не проходили. В заключении написано: "Субъект начинает осознавать природу симуляции. Рекомендуется перезагрузка".',
-                    'Вы находите письмо, адресованное вам. В нем — подробные инструкции, как выбраться. Но в конце приписка: "P.S. Это уже седьмой раз, когда я пишу это письмо. Надеюсь, в этот раз ты поверишь мне, а не ему". Подписи нет.',
-                ],
-                'warning_sign': [
-                    'Автоматический голос в динамике произносит спокойным тоном: "Пожалуйста, не оставайтесь на платформе. Поезд не пытается вас спасти".',
-                    'Стрелки на всех часах начинают вращаться с бешеной скоростью. Вы чувствуете, как теряете несколько секунд своей жизни с каждым оборотом.',
-                    'На всех экранах и табло на станции одновременно появляется изображение одного и того же простого лабиринта.',
-                    'Все лампы на станции начинают пульсировать в такт вашему сердцебиению.',
-                    'Голос в динамике объявляет: "Уважаемый пассажир. Пожалуйста, пройдите в вагон. Ваша предыдущая версия не смогла этого сделать".',
-                    'На цифровом табло появляется текст: "ПРОВЕРКА РЕАЛЬНОСТИ НЕ ПРОЙДЕНА. ЗАПУСК ПОВТОРНОЙ СИНХРОНИЗАЦИИ".',
-                    'Прибывает поезд. Двери открываются. Внутри сидит ваша точная копия, но постаревшая на 20 лет. Она смотрит на вас с бесконечной усталостью и качает головой.',
-                    'Голос в динамике говорит: "Внимание, обнаружен сбой в матрице. Субъект отклонился от назначенного маршрута. Возвращение к последней точке сохранения через 3... 2... 1...".',
-                    'На мгновение вся станция "зависает". Вы не можете пошевелиться, звуки замирают. Затем все продолжается, как ни в чем не бывало, но вы стоите на несколько метров левее.',
-                    'Свет гаснет. Когда он включается, все надписи на станции (указатели, реклама) заменены на одну фразу: "ЭТО НЕ РЕАЛЬНО".',
-                    'Из динамиков доносится запись вашего разговора с кем-то из близких, но в записи вы говорите ужасные, несвойственные вам вещи.',
-                    'На всех экранах появляется ваше лицо с надписью "Разыскивается за преступления против реальности".',
-                    'Прибывает поезд. На его боку написано ваше имя и дата рождения.',
-                    'Голос в динамике говорит: "Дорогой пользователь, ваш пробный период в "Жизни" подходит к концу. Хотите продлить подписку?".',
-                    'Вы видите, как мир за пределами платформы начинает "растворяться", как будто его стирают ластиком, обнажая под собой лишь белую, безграничную пустоту.',
-                ],
-                'mysterious_encounter': [
-                    'На противоположной платформе появляется фигура. Она просто стоит и смотрит на вас. Когда мимо проезжает поезд, скрывая ее, после него на платформе уже пусто.',
-                    'Из вагона остановившегося поезда выходит женщина. Она спрашивает у вас, как пройти на станцию, которой нет на схеме, и, не дожидаясь ответа, уходит в самый темный коридор.',
-                    'Из туннеля выходит пара, одетая по моде 70-х. Они с удивлением смотрят на вас, спрашивают, какой сейчас год, и, услышав ответ, в панике убегают.',
-                    'В дальнем конце платформы стоит музыкант и играет на скрипке. Мелодия прекрасна, но вызывает чувство невыносимой тоски. Он никогда не поворачивается к вам лицом.',
-                    'К вам подходит человек, который выглядит и одет в точности как вы. Он с усталостью смотрит на вас и спрашивает: "Ну что, получилось выбраться на этот раз?".',
-                    'Из туннеля выходит сотрудник метрополитена с фонарем. Он говорит: "Слава богу, я вас нашел! Идемте, я знаю короткий путь". Он ведет вас по коридору, который заканчивается сплошной стеной. Обернувшись, вы видите, что сотрудника уже нет.',
-                    'На скамейке сидит художник с мольбертом. Он рисует платформу, но на его холсте, в том месте, где стоите вы, изображена лишь кучка пыли и старая, рваная одежда.',
-                    'К вам подходит человек в строгом костюме, представляется вашим "куратором" и начинает отчитывать вас за "отклонение от сценария".',
-                    'На платформе появляется группа людей, которые выглядят как ваши родственники и друзья. Они смотрят на вас с разочарованием и говорят: "Мы так надеялись, что ты проснешься". Затем они растворяются в воздухе.',
-                    'К вам подходит психиатр. Он говорит, что вы находитесь в палате, это все — лишь галлюцинация, и вам нужно просто назвать кодовое слово, чтобы "проснуться". Он предлагает вам несколько вариантов.',
-                    'Вы встречаете другую версию себя, которая утверждает, что она из будущего. Она пытается вас убить, крича: "Это единственный способ разорвать петлю!".',
-                    'На скамейке сидит программист с ноутбуком. На его экране — код, описывающий станцию. Он смотрит на вас и говорит: "Ты — самый интересный баг, который я когда-либо видел".',
-                    'Из вагона выходит человек, который утверждает, что он — Автор, и вы — его персонаж. Он спрашивает, довольны ли вы своей сюжетной аркой.',
-                    'К вам подходит ваша копия, но она абсолютно спокойна и улыбается. "Не волнуйся, — говорит она. — К этому привыкаешь. Это место — не тюрьма. Это — дом".',
-                    'На платформе стоит стол, за которым сидят три фигуры в мантиях, похожие на судей. Одна из них указывает на вас и говорит: "Подсудимый, вы обвиняетесь в незаконном проникновении в реальность. Каково ваше последнее слово?".',
-                ],
-            },
-        }
-    }
-}
\ No newline at end of file
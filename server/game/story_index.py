@@ -0,0 +1,71 @@
+import random
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, Optional, Sequence, Tuple
+
+# Сколько случайных попыток сделать в пуле, прежде чем перебрать его свободные элементы.
+_DRAW_ATTEMPTS = 8
+
+
+class WeightedSampler:
+    """Выбор типа страха по весам: накопленные суммы считаются один раз, выбор — бинарный поиск."""
+
+    __slots__ = ('population', '_cumulative', '_total')
+
+    def __init__(self, weights: Dict[str, int]):
+        self.population: Tuple[str, ...] = tuple(weights)
+        self._cumulative = list(accumulate(weights.values()))
+        self._total = self._cumulative[-1] if self._cumulative else 0
+
+    def sample(self) -> Optional[str]:
+        if self._total <= 0:
+            return None
+        return self.population[bisect_right(self._cumulative, random.random() * self._total)]
+
+
+class CompiledStory:
+    """
+    История, скомпилированная для выбора элементов сцены. Все элементы лежат в одной
+    последовательности (в пакете истории они читаются из отображенного в память файла),
+    пул (тип страха, категория) — непрерывный диапазон номеров в ней. Использованные локацией
+    элементы задаются битовой маской по этим номерам, так что состояние локации — одно целое число.
+    """
+
+    __slots__ = ('id', 'start_room', 'use_world_flags', 'initial_description', 'atmosphere', 'elements', '_pools',
+                 '_samplers')
+
+    def __init__(self, story_id: str, start_room: str, use_world_flags: bool, initial_description: str,
+                 elements: Sequence[str], pools: Dict[Tuple[str, str], Tuple[int, int]],
+                 atmosphere: Optional[str] = None):
+        self.id = story_id
+        self.start_room = start_room
+        self.use_world_flags = use_world_flags
+        self.initial_description = initial_description
+        self.atmosphere = atmosphere  # общий замысел атмосферы истории, если он задан
+        self.elements = elements
+        self._pools = pools
+        self._samplers: Dict[Tuple[Tuple[str, int], ...], WeightedSampler] = {}
+
+    @property
+    def pool_count(self) -> int:
+        return len(self._pools)
+
+    def sampler(self, fear_weights: Dict[str, int]) -> WeightedSampler:
+        key = tuple(fear_weights.items())
+        sampler = self._samplers.get(key)
+        if sampler is None:
+            sampler = self._samplers[key] = WeightedSampler(fear_weights)
+        return sampler
+
+    def draw(self, fear_type: str, category: str, used_mask: int) -> Optional[int]:
+        """Номер случайного элемента пула, не отмеченного в used_mask, или None, если пул исчерпан."""
+        bounds = self._pools.get((fear_type, category))
+        if bounds is None:
+            return None
+        start, end = bounds
+        for _ in range(min(_DRAW_ATTEMPTS, end - start)):
+            index = random.randrange(start, end)
+            if not used_mask >> index & 1:
+                return index
+        free = [index for index in range(start, end) if not used_mask >> index & 1]
+        return random.choice(free) if free else None
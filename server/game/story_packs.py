@@ -0,0 +1,253 @@
+"""
+Пакеты историй. Истории пишутся как JSON-файлы в config.STORY_DIR и компилируются в пакеты
+(config.STORY_PACK_DIR), которые при обращении к истории отображаются в память.
+
+Формат пакета:
+    заголовок  '<4sHI': сигнатура, версия формата, длина метаданных;
+    метаданные JSON (UTF-8): параметры истории и пулы [тип страха, категория, начало, конец];
+    выравнивание до 4 байт;
+    смещения   (число элементов + 1) × uint32 little-endian от начала текстов;
+    тексты     UTF-8 без разделителей.
+
+Элемент читается из отображения по двум смещениям, поэтому загрузка истории не зависит от объема ее
+текстов, а воркеры кластера делят одни и те же страницы файла.
+
+Проверка и сборка всех историй: python -m game.story_packs
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import config
+from game.story_index import CompiledStory
+from llm.prompts import ALL_ELEMENT_CATEGORIES
+from logger import lg
+
+PACK_MAGIC = b"AQSP"
+PACK_VERSION = 1
+_HEADER = struct.Struct('<4sHI')
+_OFFSET = struct.Struct('<I')
+_OFFSET_PAIR = struct.Struct('<II')
+SOURCE_SUFFIX = '.json'
+PACK_SUFFIX = '.pack'
+
+
+def validate_story(story_id: str, data: Any) -> List[str]:
+    """Проверяет исходные данные истории. Возвращает список ошибок; пустой список — история корректна."""
+    if not isinstance(data, dict):
+        return [f"{story_id}: история должна быть JSON-объектом."]
+    errors = []
+    description = data.get('initial_description')
+    if not isinstance(description, str) or not description.strip():
+        errors.append(f"{story_id}: нет 'initial_description'.")
+    if not isinstance(data.get('use_world_flags', False), bool):
+        errors.append(f"{story_id}: 'use_world_flags' должен быть true или false.")
+    if not isinstance(data.get('start_room', story_id), str):
+        errors.append(f"{story_id}: 'start_room' должен быть строкой.")
+    if not isinstance(data.get('atmosphere_overall_concept', ''), str):
+        errors.append(f"{story_id}: 'atmosphere_overall_concept' должен быть строкой.")
+
+    pool_count = 0
+    for section in ('details', 'events'):
+        fear_types = data.get(section, {})
+        if not isinstance(fear_types, dict):
+            errors.append(f"{story_id}.{section}: ожидается объект {{тип страха: {{категория: [элементы]}}}}.")
+            continue
+        for fear_type, categories in fear_types.items():
+            where = f"{story_id}.{section}.{fear_type}"
+            if fear_type not in config.DEFAULT_FEAR_WEIGHTS:
+                errors.append(f"{where}: неизвестный тип страха (допустимы: {', '.join(config.DEFAULT_FEAR_WEIGHTS)}).")
+            if not isinstance(categories, dict):
+                errors.append(f"{where}: ожидается объект {{категория: [элементы]}}.")
+                continue
+            for category, items in categories.items():
+                if category not in ALL_ELEMENT_CATEGORIES:
+                    errors.append(f"{where}.{category}: неизвестная категория (допустимы: {', '.join(ALL_ELEMENT_CATEGORIES)}).")
+                if not isinstance(items, list) or not items:
+                    errors.append(f"{where}.{category}: ожидается непустой список строк.")
+                    continue
+                bad = [i for i, item in enumerate(items) if not isinstance(item, str) or not item.strip()]
+                if bad:
+                    errors.append(f"{where}.{category}: пустые или нестроковые элементы с номерами {bad}.")
+                if len(set(map(str, items))) != len(items):
+                    errors.append(f"{where}.{category}: повторяющиеся элементы.")
+                pool_count += 1
+    if not pool_count:
+        errors.append(f"{story_id}: нет ни одного пула элементов в 'details' или 'events'.")
+    return errors
+
+
+def build_pack(story_id: str, data: Dict[str, Any], pack_path: str):
+    """Компилирует проверенную историю в пакет. Пакет пишется во временный файл и атомарно подменяется."""
+    elements: List[bytes] = []
+    pools: List[Tuple[str, str, int, int]] = []
+    seen = set()
+    # Категория берется из details, если она там есть для этого типа страха, иначе из events.
+    for section in ('details', 'events'):
+        for fear_type, categories in data.get(section, {}).items():
+            for category, items in categories.items():
+                if (fear_type, category) in seen:
+                    continue
+                seen.add((fear_type, category))
+                start = len(elements)
+                elements.extend(item.encode('utf-8') for item in items)
+                pools.append((fear_type, category, start, len(elements)))
+
+    meta = json.dumps({
+        "id": story_id,
+        "start_room": data.get('start_room', story_id),
+        "use_world_flags": bool(data.get('use_world_flags')),
+        "initial_description": data['initial_description'],
+        "atmosphere_overall_concept": data.get('atmosphere_overall_concept'),
+        "count": len(elements),
+        "pools": pools,
+    }, ensure_ascii=False).encode('utf-8')
+    padding = -(_HEADER.size + len(meta)) % 4
+
+    offsets, position = [0], 0
+    for element in elements:
+        position += len(element)
+        offsets.append(position)
+
+    os.makedirs(os.path.dirname(pack_path) or '.', exist_ok=True)
+    temp_path = f"{pack_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(meta)))
+        f.write(meta)
+        f.write(b"\0" * padding)
+        f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        f.writelines(elements)
+    os.replace(temp_path, pack_path)
+    lg.info(f"Пакет истории '{story_id}' собран: {len(elements)} элементов, {os.path.getsize(pack_path)} байт.")
+
+
+class PackElements(Sequence[str]):
+    """Тексты элементов пакета: читаются из отображения по запросу и не хранятся в памяти процесса."""
+
+    __slots__ = ('_map', '_offsets_at', '_texts_at', '_count')
+
+    def __init__(self, pack_map: mmap.mmap, offsets_at: int, count: int):
+        self._map = pack_map
+        self._offsets_at = offsets_at
+        self._texts_at = offsets_at + (count + 1) * _OFFSET.size
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        start, end = _OFFSET_PAIR.unpack_from(self._map, self._offsets_at + index * _OFFSET.size)
+        return self._map[self._texts_at + start:self._texts_at + end].decode('utf-8')
+
+
+def open_pack(pack_path: str) -> CompiledStory:
+    """Отображает пакет в память и возвращает историю над ним. ValueError — если файл не является пакетом."""
+    with open(pack_path, 'rb') as f:
+        pack_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(pack_map) < _HEADER.size:
+        raise ValueError(f"{pack_path}: файл слишком короткий.")
+    magic, version, meta_length = _HEADER.unpack_from(pack_map, 0)
+    if magic != PACK_MAGIC or version != PACK_VERSION:
+        raise ValueError(f"{pack_path}: неизвестный формат пакета ({magic!r}, версия {version}).")
+    meta = json.loads(pack_map[_HEADER.size:_HEADER.size + meta_length].decode('utf-8'))
+    offsets_at = _HEADER.size + meta_length + (-(_HEADER.size + meta_length) % 4)
+    pools = {(fear_type, category): (start, end) for fear_type, category, start, end in meta['pools']}
+    return CompiledStory(meta['id'], meta['start_room'], meta['use_world_flags'], meta['initial_description'],
+                         PackElements(pack_map, offsets_at, meta['count']), pools,
+                         atmosphere=meta.get('atmosphere_overall_concept'))
+
+
+class StoryLibrary:
+    """
+    Истории сервера по идентификатору. Пакет собирается из исходника, если его нет или исходник новее,
+    и отображается в память при первом обращении; дальше история берется из кэша.
+    Список историй — это просто имена файлов, поэтому старт сервера не зависит от их числа и объема.
+    """
+
+    def __init__(self, source_dir: str = config.STORY_DIR, pack_dir: str = config.STORY_PACK_DIR):
+        self.source_dir = source_dir
+        self.pack_dir = pack_dir
+        self._loaded: Dict[str, CompiledStory] = {}
+
+    def available(self) -> List[str]:
+        story_ids = set()
+        for directory, suffix in ((self.source_dir, SOURCE_SUFFIX), (self.pack_dir, PACK_SUFFIX)):
+            if os.path.isdir(directory):
+                story_ids.update(name[:-len(suffix)] for name in os.listdir(directory) if name.endswith(suffix))
+        return sorted(story_ids)
+
+    def __contains__(self, story_id: str) -> bool:
+        return story_id in self._loaded or os.path.exists(self._source_path(story_id)) \
+            or os.path.exists(self._pack_path(story_id))
+
+    def _source_path(self, story_id: str) -> str:
+        return os.path.join(self.source_dir, f"{story_id}{SOURCE_SUFFIX}")
+
+    def _pack_path(self, story_id: str) -> str:
+        return os.path.join(self.pack_dir, f"{story_id}{PACK_SUFFIX}")
+
+    def compile(self, story_id: str) -> List[str]:
+        """Проверяет исходник истории и, если ошибок нет, собирает пакет. Возвращает найденные ошибки."""
+        try:
+            with open(self._source_path(story_id), encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            return [f"{story_id}: не удалось прочитать исходник: {e}"]
+        errors = validate_story(story_id, data)
+        if not errors:
+            build_pack(story_id, data, self._pack_path(story_id))
+        return errors
+
+    def get(self, story_id: str) -> Optional[CompiledStory]:
+        story = self._loaded.get(story_id)
+        if story is not None:
+            return story
+        source_path, pack_path = self._source_path(story_id), self._pack_path(story_id)
+        if os.path.exists(source_path) and (
+                not os.path.exists(pack_path) or os.path.getmtime(source_path) > os.path.getmtime(pack_path)):
+            if errors := self.compile(story_id):
+                for error in errors:
+                    lg.error(f"Ошибка в истории: {error}")
+                return None
+        try:
+            story = open_pack(pack_path)
+        except (OSError, ValueError) as e:
+            lg.error(f"Не удалось открыть пакет истории '{story_id}': {e}")
+            return None
+        lg.info(f"История '{story_id}' загружена: {len(story.elements)} элементов в {story.pool_count} пулах.")
+        self._loaded[story_id] = story
+        return story
+
+    def __iter__(self) -> Iterator[CompiledStory]:
+        for story_id in self.available():
+            if story := self.get(story_id):
+                yield story
+
+
+STORY_LIBRARY = StoryLibrary()
+
+
+def main() -> int:
+    library = StoryLibrary()
+    failed = False
+    sources = [story_id for story_id in library.available() if os.path.exists(library._source_path(story_id))]
+    for story_id in sys.argv[1:] or sources:
+        errors = library.compile(story_id)
+        for error in errors:
+            print(f"ОШИБКА {error}")
+        failed = failed or bool(errors)
+        print(f"{story_id}: {'есть ошибки' if errors else 'пакет собран'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
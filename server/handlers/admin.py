@@ -1,13 +1,18 @@
-from typing import Awaitable, Callable, Dict, List, TYPE_CHECKING
+from typing import Awaitable, Callable, Dict, List, Optional, TYPE_CHECKING
 
 import trio
 from rich.console import Console
 from rich.prompt import Prompt
+from rich.table import Table
 
+import config
+from game.story_packs import STORY_LIBRARY
+from llm.prompts import PROMPT_BUILDER, PROMPT_LAYOUTS
 from logger import lg
 from utils import initialize_debug_directories
 
 if TYPE_CHECKING:
+    from game.session import GameSession
     from main import Server
 
 
@@ -15,30 +20,28 @@ console = Console()
 
 
 class AdminConsole:
-    """Обрабатывает административные команды из консоли сервера."""
+    """
+    Обрабатывает административные команды из консоли сервера.
+    Команды управления игрой принимают номер стола; если стол на сервере один, номер можно не указывать.
+    """
 
     def __init__(self, server: 'Server'):
         self.server = server
-        self.game_state = server.game_state
-        self.game_engine = server.game_engine
 
-        base_commands: Dict[str, Callable[[List[str]], Awaitable[None]]] = {
+        self.commands: Dict[str, Callable[[List[str]], Awaitable[None]]] = {
+            "/start": self._cmd_start,
+            "/clear": self._cmd_clear,
+            "/sessions": self._cmd_sessions,
+            "/stories": self._cmd_stories,
+            "/prompts": self._cmd_prompts,
+            "/cache": self._cmd_cache,
             "/say": self._cmd_say,
             "/kick": self._cmd_kick,
+            "/net": self._cmd_net,
             "/help": self._cmd_help,
         }
 
-        self.lobby_commands = {
-            "/start": self._cmd_start,
-            **base_commands,
-        }
-
-        self.active_commands = {
-            "/clear": self._cmd_clear,
-            **base_commands,
-        }
-
-        lg.info("Админ-консоль инициализирована с контекстно-зависимыми командами.")
+        lg.info("Админ-консоль инициализирована.")
 
     async def run(self):
         """Основной цикл для админ-консоли."""
@@ -63,19 +66,36 @@ class AdminConsole:
                 console.print(f"[bold red]Ошибка: {e}[/bold red]")
 
     async def _handle_command(self, command_str: str):
-        """Разбирает и выполняет команду администратора в зависимости от состояния игры."""
+        """Разбирает и выполняет команду администратора."""
         parts = command_str.strip().split()
         if not parts:
             return
         cmd, args = parts[0].lower(), parts[1:]
         lg.debug(f"Команда разобрана: cmd='{cmd}', args={args}")
 
-        is_active = await self.game_state.is_game_active()
-        command_dict = self.active_commands if is_active else self.lobby_commands
-
-        handler = command_dict.get(cmd, self._cmd_unknown)
+        handler = self.commands.get(cmd, self._cmd_unknown)
         await handler(args)
 
+    async def handle_forwarded(self, command_str: str):
+        """Выполняет команду, пересланную фронтом кластера; вывод помечается номером воркера."""
+        lg.info(f"Воркер {self.server.worker_index} получил команду от фронта: '{command_str}'")
+        console.print(f"[dim]— воркер {self.server.worker_index} —[/dim]")
+        await self._handle_command(command_str)
+
+    def _resolve_session(self, args: list, usage: str) -> Optional['GameSession']:
+        """Находит стол по первому аргументу или единственный стол сервера."""
+        sessions = self.server.sessions
+        if args:
+            session = sessions.get(args[0])
+            if not session:
+                console.print(f"Стол '{args[0]}' не найден.", style="bold red")
+            return session
+        if len(sessions) == 1:
+            return next(iter(sessions))
+        console.print(f"Использование: {usage} (столов на сервере: {len(sessions)}, см. /sessions)",
+                      style="bold red")
+        return None
+
     async def _cmd_say(self, args: list):
         if not args:
             lg.warning("Команда /say вызвана без сообщения.")
@@ -100,55 +120,157 @@ class AdminConsole:
             lg.warning(f"Попытка исключить несуществующего игрока '{username_to_kick}'.")
             console.print(f"Игрок '{username_to_kick}' не найден.", style="bold red")
 
-    async def _cmd_clear(self, _args: list):
-        if not await self.game_state.is_game_active():
+    async def _cmd_net(self, _args: list):
+        """Показывает сетевую телеметрию соединений: RTT, трафик и заполненность очереди."""
+        if not self.server.player_connections:
+            console.print("[bold yellow]Нет подключенных игроков.[/bold yellow]")
+            return
+
+        table = Table(title="Соединения", caption=(
+            f"Лимиты: действия {config.ACTION_RATE_PER_MINUTE}/мин (всплеск {config.ACTION_BURST}), "
+            f"до {config.MAX_ACTION_CHARS} симв. / ~{config.MAX_ACTION_TOKENS} ток.; "
+            f"чат {config.CHAT_RATE_PER_MINUTE}/мин (всплеск {config.CHAT_BURST}), до {config.MAX_CHAT_CHARS} симв."))
+        for column in ("Игрок", "Стол", "Протокол", "RTT, мс", "Тишина, с", "Вход, КБ", "Выход, КБ",
+                       "Кадры вх/исх", "Очередь, КБ", "Отказы д/ч", "Состояние"):
+            table.add_column(column)
+
+        for username, conn in sorted(self.server.player_connections.items()):
+            stats = conn.stats
+            rtt = f"{stats.rtt * 1000:.1f} ({stats.rtt_last * 1000:.1f})" if stats.rtt is not None else "—"
+            flags = [flag for flag, enabled in (("отключен", conn.detached), ("не успевает", conn.is_degraded)) if enabled]
+            table.add_row(username, conn.session.id if conn.session else "—", conn.protocol.name, rtt, f"{stats.idle:.0f}",
+                          f"{stats.bytes_in / 1024:.1f}", f"{stats.bytes_out / 1024:.1f}",
+                          f"{stats.frames_in}/{stats.frames_out}", f"{conn.queued_bytes / 1024:.1f}",
+                          f"{stats.actions_rejected}/{stats.chat_rejected}",
+                          ", ".join(flags) or "ок")
+        console.print(table)
+
+    async def _cmd_sessions(self, _args: list):
+        if not len(self.server.sessions):
+            console.print("[bold yellow]Нет открытых столов.[/bold yellow]")
+            return
+
+        table = Table(title=f"Столы ({len(self.server.sessions)})")
+        for column in ("Стол", "Состояние", "Игроки", "Локации", "Ходы в обработке"):
+            table.add_column(column)
+        for session in self.server.sessions:
+            game_state = session.game_state
+            table.add_row(session.id, "игра" if game_state.state == 'active' else "лобби",
+                          f"{session.player_count}/{config.MAX_PLAYERS}: {', '.join(sorted(game_state.players))}",
+                          str(len(game_state.locations)), str(len(session.game_engine.turn_processing_locks)))
+        console.print(table)
+
+    async def _cmd_clear(self, args: list):
+        session = self._resolve_session(args, "/clear [стол]")
+        if not session:
+            return
+        if not await session.game_state.is_game_active():
             console.print("[bold red]Команду /clear можно использовать только во время активной игры.[/bold red]")
             return
 
-        lg.info("Администратор инициировал сброс игры в лобби.")
-        await self.game_state.reset_to_lobby()
-        initialize_debug_directories()
-        console.print("[bold green]Игра сброшена в лобби. Папки для отладки очищены.[/bold green]")
-        await self.server.broadcast_system("Игра была сброшена в лобби администратором.")
-        await self.server.broadcast_system("STATE_UPDATE LOBBY")
+        lg.info(f"Администратор инициировал сброс стола '{session.id}' в лобби.")
+        await session.game_state.reset_to_lobby()
+        if len(self.server.sessions) == 1:
+            initialize_debug_directories()
+        console.print(f"[bold green]Стол '{session.id}' сброшен в лобби.[/bold green]")
+        await session.broadcast_system("Игра была сброшена в лобби администратором.")
+        await session.broadcast_system("STATE_UPDATE LOBBY")
 
     async def _cmd_help(self, _args: list):
-        is_active = await self.game_state.is_game_active()
-        state_str = "[bold]ИГРА АКТИВНА[/bold]" if is_active else "[bold]ЛОББИ[/bold]"
-
-        common_help = (
+        help_text = (
+            f"[bold]Столов: {len(self.server.sessions)}, игроков: {len(self.server.player_connections)}[/bold]\n"
+            "Доступные команды:\n"
+            "  /start [стол] [история] - Начать игру за столом (по умолчанию — прежняя история стола).\n"
+            "  /clear [стол]       - Сбросить игру за столом в состояние лобби.\n"
+            "  /sessions           - Показать столы.\n"
+            "  /stories            - Показать доступные истории.\n"
+            "  /prompts            - Перечитать шаблоны промптов.\n"
+            "  /cache [раскладка|reset] - Попадания в кэш префиксов API; сменить раскладку промпта.\n"
             "  /say [сообщение]    - Отправить системное сообщение всем.\n"
             "  /kick [имя]         - Исключить игрока.\n"
+            "  /net                - Показать RTT, трафик и отказы по лимитам.\n"
             "  /help               - Показать это сообщение.\n"
         )
-
-        if is_active:
-            help_text = (
-                f"[bold]Состояние: {state_str}[/bold]\n"
-                "Доступные команды:\n"
-                "  /clear              - Сбросить игру в состояние лобби.\n"
-                f"{common_help}"
-            )
-        else:
-            help_text = (
-                f"[bold]Состояние: {state_str}[/bold]\n"
-                "Доступные команды:\n"
-                "  /start              - Начать игру.\n"
-                f"{common_help}"
-            )
-
         console.print(help_text, style="bold cyan")
 
-    async def _cmd_start(self, _args: list):
-        if await self.game_state.is_game_active():
+    async def _cmd_start(self, args: list):
+        story_id = None
+        if args and args[-1] in STORY_LIBRARY and (len(args) > 1 or not self.server.sessions.get(args[-1])):
+            story_id, args = args[-1], args[:-1]
+        elif len(args) > 1:
+            console.print(f"История '{args[-1]}' не найдена, см. /stories.", style="bold red")
+            return
+        session = self._resolve_session(args, "/start [стол] [история]")
+        if not session:
+            return
+        if await session.game_state.is_game_active():
             console.print("[bold red]Игра уже запущена. Используйте /clear для сброса.[/bold red]")
             return
 
-        lg.info("Администратор пытается начать игру.")
-        await self.game_engine.start_game()
-        console.print("[bold green]Игра началась.[/bold green]")
+        lg.info(f"Администратор пытается начать игру за столом '{session.id}' (история: {story_id or 'прежняя'}).")
+        if not await session.game_engine.start_game(story_id):
+            console.print(f"[bold red]Не удалось загрузить историю '{story_id or session.game_state.story_id}'. "
+                          f"Проверьте ее: python -m game.story_packs[/bold red]")
+            return
+        console.print(f"[bold green]Игра за столом '{session.id}' началась "
+                      f"(история '{session.game_state.story_id}').[/bold green]")
+
+    async def _cmd_stories(self, _args: list):
+        story_ids = STORY_LIBRARY.available()
+        if not story_ids:
+            console.print(f"[bold yellow]Историй нет в {config.STORY_DIR}.[/bold yellow]")
+            return
+
+        table = Table(title=f"Истории ({len(story_ids)})")
+        for column in ("История", "Стартовая комната", "Элементов", "Пулов", "Столы"):
+            table.add_column(column)
+        for story_id in story_ids:
+            story = STORY_LIBRARY.get(story_id)
+            sessions = ", ".join(s.id for s in self.server.sessions if s.game_state.story_id == story_id)
+            if story:
+                table.add_row(story_id, story.start_room, str(len(story.elements)), str(story.pool_count), sessions)
+            else:
+                table.add_row(story_id, "[red]ошибка, см. лог[/red]", "—", "—", sessions)
+        console.print(table)
+
+    async def _cmd_prompts(self, _args: list):
+        try:
+            PROMPT_BUILDER.reload()
+        except Exception as e:
+            lg.error(f"Не удалось перезагрузить шаблоны промптов: {e}", exc_info=True)
+            console.print(f"[bold red]Шаблоны не перезагружены, остаются прежние: {e}[/bold red]")
+            return
+        console.print(f"[bold green]Шаблоны промптов перезагружены: {PROMPT_BUILDER.static_chars} символов "
+                      f"статических разделов.[/bold green]")
+
+    async def _cmd_cache(self, args: list):
+        """Попадания в кэш префиксов API по видам запросов; аргумент меняет раскладку промпта или сбрасывает счетчики."""
+        stats = self.server.model_manager.prompt_cache
+        if args and args[0] in PROMPT_LAYOUTS:
+            PROMPT_BUILDER.layout = args[0]
+            lg.info(f"Раскладка промпта повествования сменена на '{args[0]}'.")
+            console.print(f"[bold green]Раскладка промпта повествования: {args[0]}.[/bold green]")
+            return
+        if args and args[0] == 'reset':
+            stats.reset()
+            console.print("[bold green]Счетчики кэша префиксов сброшены.[/bold green]")
+            return
+        if args:
+            console.print(f"Использование: /cache \\[{'|'.join(PROMPT_LAYOUTS)}|reset]", style="bold red")
+            return
+
+        table = Table(title=f"Кэш префиксов API (раскладка повествования: {PROMPT_BUILDER.layout})")
+        for column in ("Вид запроса", "Число", "Попадания, ток.", "Промахи, ток.", "Доля попаданий",
+                       "Последний запрос", "Ответ, ток."):
+            table.add_column(column)
+        for label, counters in sorted(stats.counters.items()):
+            table.add_row(label, str(counters.requests), f"{counters.hit_tokens:,}", f"{counters.miss_tokens:,}",
+                          f"{counters.hit_ratio:.0%}",
+                          f"{counters.last_hit:,}/{counters.last_hit + counters.last_miss:,} "
+                          f"({counters.last_hit_ratio:.0%})", f"{counters.completion_tokens:,}")
+        console.print(table if stats.counters else "[bold yellow]Запросов к API с usage еще не было.[/bold yellow]")
 
     async def _cmd_unknown(self, _args: list):
-        lg.warning(f"Введена неизвестная или недоступная в текущем состоянии админ-команда.")
-        console.print("Неизвестная команда или она недоступна в текущем состоянии игры.", style="bold red")
+        lg.warning(f"Введена неизвестная админ-команда.")
+        console.print("Неизвестная команда.", style="bold red")
         await self._cmd_help([])
@@ -0,0 +1,48 @@
+from typing import Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+from logger import lg
+
+if TYPE_CHECKING:
+    from game.session import GameSession
+    from handlers.player import PlayerConnection
+
+
+def deliver(connections: Iterable['PlayerConnection'], message: str):
+    """Кодирует сообщение один раз на каждый тип протокола и ставит общие байты в очереди получателей."""
+    encoded: Dict[type, bytes] = {}
+    for conn in connections:
+        kind = type(conn.protocol)
+        if (data := encoded.get(kind)) is None:
+            data = encoded[kind] = conn.protocol.encode(message)
+        conn.enqueue(data)
+
+
+class BroadcastGroup:
+    """
+    Канал рассылки для группы связанных локаций на время хода.
+    Список получателей разрешается один раз и пересчитывается только после входа, выхода
+    или перемещения игроков, поэтому стоимость рассылки одного фрагмента не зависит от числа локаций.
+    """
+
+    def __init__(self, session: 'GameSession', location_names: Iterable[str]):
+        self.session = session
+        self.location_names = frozenset(location_names)
+        self._roster_version: Optional[Tuple[int, int]] = None
+        self._recipients: List['PlayerConnection'] = []
+
+    async def _resolve(self) -> List['PlayerConnection']:
+        version = self.session.roster_version
+        if version != self._roster_version:
+            players = await self.session.game_state.get_players_in_locations(self.location_names)
+            connections = self.session.player_connections
+            self._recipients = [conn for p in players if (conn := connections.get(p.username))]
+            self._roster_version = version
+            lg.debug(f"Получатели группы {set(self.location_names)} пересчитаны: {len(self._recipients)}.")
+        return self._recipients
+
+    async def send(self, message: str, exclude: Optional[Iterable[str]] = None):
+        recipients = await self._resolve()
+        if exclude:
+            exclude_set = set(exclude)
+            recipients = [conn for conn in recipients if conn.username not in exclude_set]
+        deliver(recipients, message)
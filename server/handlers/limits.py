@@ -0,0 +1,31 @@
+import trio
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты: ведро на capacity жетонов, пополняемое со скоростью rate жетонов в секунду.
+    Позволяет короткий всплеск до capacity запросов, а в среднем — не чаще rate.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = trio.current_time()
+
+    def _refill(self):
+        now = trio.current_time()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self, cost: float = 1) -> bool:
+        self._refill()
+        if self._tokens < cost:
+            return False
+        self._tokens -= cost
+        return True
+
+    def retry_after(self, cost: float = 1) -> float:
+        """Через сколько секунд запрос стоимостью cost будет разрешен."""
+        self._refill()
+        return max(0.0, (cost - self._tokens) / self.rate)
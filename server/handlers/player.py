@@ -1,15 +1,29 @@
-import json
-from typing import Optional, TYPE_CHECKING
+import socket
+from typing import Any, List, Optional, TYPE_CHECKING, Union
 
 import trio
 
 import config
-from game.player import Player
+from handlers.limits import TokenBucket
+from handlers.resume import ReplayBuffer
+from handlers.telemetry import ConnectionStats
 from logger import lg
+from protocol.compression import InflateStream, StreamCompressor
+from protocol.reader import StreamReader
+from protocol.wire import (HELLO_PREFIX, Frame, FrameType, ProtocolError, SequencedFrame, TextProtocol, control_nonce,
+                           negotiate)
+from utils import estimate_tokens
 
 if TYPE_CHECKING:
+    from game.session import GameSession
     from main import Server
 
+LOGIN_PROMPT = "Введите ваше имя (и через пробел номер стола, если нужно): "
+
+
+def _outbox_size(item: Union[bytes, SequencedFrame]) -> int:
+    return item.size if isinstance(item, SequencedFrame) else len(item)
+
 
 class PlayerConnection:
     """
@@ -18,33 +32,115 @@ class PlayerConnection:
     в вышестоящие сервисы. Не хранит игровое состояние.
     """
 
-    def __init__(self, server: 'Server', stream: trio.SocketStream):
+    def __init__(self, server: 'Server', stream: trio.SocketStream, initial_data: bytes = b"",
+                 prompt_sent: bool = False):
         self.server = server
         self.stream = stream
         self.peer_addr = stream.socket.getpeername()
-        self._buffer = ""
-        self._write_lock = trio.Lock()
+        self.protocol = TextProtocol()
+        self._reader = StreamReader(stream, max_frame_size=config.MAX_FRAME_SIZE)
+        self._reader.feed(initial_data)
+        self._prompt_sent = prompt_sent
+        self._outbox_send, self._outbox_receive = trio.open_memory_channel(config.OUTBOUND_QUEUE_MAX_FRAMES)
+        self._queued_bytes = 0
+        self._compressor: Optional[StreamCompressor] = None
+        self._writer_done = trio.Event()
+        self.is_degraded = False
         self.username: Optional[str] = None
+        self.session: Optional['GameSession'] = None
+        self.replay: Optional[ReplayBuffer] = None
+        self.resumable = True
+        self.detached = False
+        self.stats = ConnectionStats()
+        self.action_limiter = TokenBucket(config.ACTION_RATE_PER_MINUTE / 60, config.ACTION_BURST)
+        self.chat_limiter = TokenBucket(config.CHAT_RATE_PER_MINUTE / 60, config.CHAT_BURST)
+        self._ping_nonce = 0
+        self._ping_sent_at: Optional[float] = None
+        self._enable_keepalive()
         lg.info(f"Создан объект PlayerConnection для нового соединения от {self.peer_addr}")
 
+    @property
+    def queued_bytes(self) -> int:
+        return self._queued_bytes
+
     def is_stream_closed(self) -> bool:
         return self.stream.socket.fileno() == -1
 
+    def _enable_keepalive(self):
+        """
+        TCP keepalive — запасное обнаружение обрыва для текстовых клиентов, не отвечающих на PING.
+        Интервал и число проб задаются явно: с умолчаниями ядра (9 проб по 75 с) полуоткрытое
+        соединение держало бы группу хода больше десяти минут.
+        """
+        try:
+            self.stream.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            for option, value in (('TCP_KEEPIDLE', config.TCP_KEEPALIVE_IDLE),
+                                  ('TCP_KEEPINTVL', config.TCP_KEEPALIVE_INTERVAL),
+                                  ('TCP_KEEPCNT', config.TCP_KEEPALIVE_COUNT)):
+                if hasattr(socket, option):
+                    self.stream.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+        except OSError as e:
+            lg.debug(f"Не удалось включить TCP keepalive для {self.peer_addr}: {e}")
+
     async def _read_message(self) -> Optional[str]:
-        while '\n' not in self._buffer:
-            try:
-                if self.is_stream_closed():
-                    return None
-                data = await self.stream.receive_some(4096)
-                if not data:
-                    return None
-                self._buffer += data.decode('utf-8', errors='ignore')
-            except (trio.BrokenResourceError, trio.ClosedResourceError):
+        try:
+            if self.is_stream_closed():
                 return None
-        message, _, self._buffer = self._buffer.partition('\n')
-        return message.strip()
+            message = await self.protocol.read_message(self._reader, on_control=self._on_control)
+        except (trio.BrokenResourceError, trio.ClosedResourceError):
+            return None
+        except ProtocolError as e:
+            lg.warning(f"Нарушение протокола от '{self.username or self.peer_addr}': {e}")
+            return None
+        if message is None:
+            return None
+        self.stats.frames_in += 1
+        self._update_inbound_stats()
+        return message.text.strip()
+
+    def _update_inbound_stats(self):
+        stream = self._reader.stream
+        self.stats.bytes_in = self._reader.bytes_received
+        if isinstance(stream, InflateStream):
+            self.stats.bytes_in += stream.bytes_in - stream.bytes_out
+        self.stats.touch()
+
+    async def _on_control(self, frame: Frame):
+        nonce = control_nonce(frame)
+        self.stats.frames_in += 1
+        self._update_inbound_stats()
+        if frame.type == FrameType.PING:
+            self.enqueue_sequenced(self.protocol.encode_control(FrameType.PONG, nonce))
+        elif nonce == self._ping_nonce and self._ping_sent_at is not None:
+            self.stats.record_rtt(trio.current_time() - self._ping_sent_at)
+            self._ping_sent_at = None
 
     async def run(self):
+        async with trio.open_nursery() as nursery:
+            nursery.start_soon(self._writer_loop)
+            nursery.start_soon(self._heartbeat_loop)
+            await self._serve()
+            nursery.cancel_scope.cancel()
+
+    async def _heartbeat_loop(self):
+        """
+        Раз в HEARTBEAT_INTERVAL отправляет PING кадровым клиентам и разрывает соединение,
+        от которого ничего не приходило дольше HEARTBEAT_TIMEOUT (полуоткрытое TCP-соединение).
+        RTT измеряется вместе с ожиданием в исходящей очереди, то есть так, как его видит игрок.
+        """
+        while not self.is_stream_closed():
+            await trio.sleep(config.HEARTBEAT_INTERVAL)
+            if not self.protocol.framed:
+                continue
+            if self.stats.idle > config.HEARTBEAT_TIMEOUT:
+                self.abort(f"нет ответа дольше {config.HEARTBEAT_TIMEOUT} с")
+                return
+            self._ping_nonce += 1
+            self._ping_sent_at = trio.current_time()
+            self.stats.pings_sent += 1
+            self.enqueue_sequenced(self.protocol.encode_control(FrameType.PING, self._ping_nonce))
+
+    async def _serve(self):
         login_successful = False
         try:
             lg.debug(f"Запуск цикла run() для {self.peer_addr}")
@@ -70,35 +166,52 @@ class PlayerConnection:
             username_info = f"'{self.username or 'Неизвестный'}' ({self.peer_addr})"
             lg.info(f"Начало процедуры очистки для {username_info}.")
             if self.username:
-                await self.server.remove_player(self)
-            if not self.is_stream_closed():
-                await self.stream.aclose()
+                await self.server.player_disconnected(self)
+            await self.aclose()
             lg.info(f"Ресурсы для {username_info} освобождены.")
 
     async def _login_sequence(self) -> bool:
         lg.debug(f"Начало последовательности входа для {self.peer_addr}.")
         try:
-            await self.send_direct("PROMPT Введите ваше имя: ")
+            if not self._prompt_sent:
+                await self.send_direct(f"PROMPT {LOGIN_PROMPT}")
             with trio.fail_after(30):
                 username = await self._read_message()
+                if username and username.startswith(f"{HELLO_PREFIX} "):
+                    await self._negotiate_protocol(username)
+                    username = await self._read_message()
+
+            if username and username.startswith("RESUME ") and self.protocol.framed:
+                return await self._resume_session(username[len("RESUME "):])
 
-            if not (username and 1 <= len(username) <= 20 and username.isalnum()):
+            username, _, requested_session = (username or "").partition(' ')
+            requested_session = requested_session.strip()
+            if not (1 <= len(username) <= 20 and username.isalnum()):
                 await self.send_direct("ERROR Имя должно быть от 1 до 20 букв/цифр.")
                 return False
+            if requested_session and not (len(requested_session) <= 20 and requested_session.isalnum()):
+                await self.send_direct("ERROR Номер стола должен состоять из 1-20 букв/цифр.")
+                return False
 
             self.username = username
-            player_model = Player(username=self.username)
-
-            success, reason = await self.server.game_state.add_player(player_model)
-            if not success:
-                error_msg = f"ERROR Сервер полон (максимум {config.MAX_PLAYERS} игроков)." if reason == "full" else f"ERROR Имя пользователя '{self.username}' уже занято."
-                await self.send_direct(error_msg)
+            reason = await self.server.join_session(self, requested_session or None)
+            if reason != "success":
+                error_messages = {
+                    "full": f"ERROR Стол полон (максимум {config.MAX_PLAYERS} игроков).",
+                    "taken": f"ERROR Имя пользователя '{self.username}' уже занято.",
+                    "limit": f"ERROR На сервере нет свободных столов (максимум {config.MAX_SESSIONS}).",
+                }
+                await self.send_direct(error_messages.get(reason, "ERROR Не удалось войти."))
                 self.username = None
                 return False
 
-            lg.info(f"Имя '{self.username}' принято. Вход успешен.")
+            lg.info(f"Имя '{self.username}' принято, стол '{self.session.id}'. Вход успешен.")
             await self.send_direct(f"WELCOME {self.username}")
-            await self.server.player_joined(self)
+            if self.protocol.framed:
+                self.replay = ReplayBuffer(config.RESUME_REPLAY_FRAMES, self.server.resume_token_prefix)
+                self.server.resume_tokens[self.replay.token] = self
+                await self.send_direct(f"SESSION {self.replay.token}")
+            await self.session.player_joined(self)
             return True
         except trio.TooSlowError:
             await self.send_direct("ERROR Превышено время ожидания для входа.")
@@ -107,11 +220,35 @@ class PlayerConnection:
             lg.warning(f"Соединение с {self.peer_addr} потеряно во время входа.")
             return False
 
+    async def _resume_session(self, args: str) -> bool:
+        """Обрабатывает `RESUME <токен> <номер последнего полученного кадра>` вместо имени."""
+        token, _, acknowledged = args.partition(' ')
+        previous = self.server.find_resumable(token)
+        if not previous or not acknowledged.isdigit():
+            await self.send_direct("ERROR Сессия не найдена или истекла. Войдите заново.")
+            return False
+        await self.send_direct(f"WELCOME {previous.username}")
+        await self.server.resume_player(self, previous, int(acknowledged))
+        return True
+
+    async def _negotiate_protocol(self, offer: str):
+        """Отвечает на предложение клиента и при согласии переключает соединение в кадровый режим."""
+        protocol, reply = negotiate(offer, allow_compression=config.ENABLE_COMPRESSION)
+        await self.send_direct(reply)
+        if protocol:
+            self.protocol = protocol
+            if protocol.compression:
+                self._reader.stream = InflateStream(self._reader.stream)
+                self._outbox_send.send_nowait(StreamCompressor(config.COMPRESSION_LEVEL))
+            lg.info(f"Соединение с {self.peer_addr} переведено на протокол '{protocol.name}'.")
+        else:
+            lg.info(f"Клиент {self.peer_addr} остается на текстовом протоколе (предложение: '{offer}').")
+
     async def _handle_message(self, message: str):
         if not self.username:
             return
 
-        is_active = await self.server.game_state.is_game_active()
+        is_active = await self.session.game_state.is_game_active()
         if message.startswith('/'):
             if is_active:
                 await self._handle_command(message)
@@ -120,49 +257,175 @@ class PlayerConnection:
                 await self.send_direct("SYSTEM NARRATION_END")
         else:
             if is_active:
-                await self.server.game_engine.handle_player_action(self, message)
-            else:
-                await self.server.handle_player_say(self, message)
+                if await self._admit_action(message):
+                    await self.session.game_engine.handle_player_action(self, message)
+            elif await self._admit_chat(message):
+                await self.session.handle_player_say(self, message)
+
+    async def _admit_action(self, action: str) -> bool:
+        """
+        Проверяет бюджет действия: длину в символах, оценку в токенах и частоту.
+        Действие попадает в историю локации и в промпт всей группы, поэтому лимиты строже, чем для чата.
+        """
+        reason = None
+        if len(action) > config.MAX_ACTION_CHARS:
+            reason = f"Действие слишком длинное: {len(action)} символов при лимите {config.MAX_ACTION_CHARS}."
+        elif (tokens := estimate_tokens(action)) > config.MAX_ACTION_TOKENS:
+            reason = f"Действие слишком длинное: около {tokens} токенов при лимите {config.MAX_ACTION_TOKENS}."
+        elif not self.action_limiter.try_acquire():
+            reason = f"Слишком частые действия. Повторите через {self.action_limiter.retry_after():.0f} с."
+        if reason:
+            self.stats.actions_rejected += 1
+            await self._reject(reason)
+            return False
+        return True
+
+    async def _admit_chat(self, message: str) -> bool:
+        reason = None
+        if len(message) > config.MAX_CHAT_CHARS:
+            reason = f"Сообщение слишком длинное: {len(message)} символов при лимите {config.MAX_CHAT_CHARS}."
+        elif not self.chat_limiter.try_acquire():
+            reason = f"Слишком частые сообщения. Повторите через {self.chat_limiter.retry_after():.0f} с."
+        if reason:
+            self.stats.chat_rejected += 1
+            await self._reject(reason)
+            return False
+        return True
+
+    async def _reject(self, reason: str):
+        lg.info(f"Ввод игрока '{self.username}' отклонен: {reason}")
+        await self.send_direct(f"ERROR {reason}")
+        await self.send_direct("SYSTEM NARRATION_END")
 
     async def _handle_command(self, command_str: str):
         parts = command_str.strip().split(maxsplit=1)
         command, args = parts[0].lower(), parts[1] if len(parts) > 1 else ""
 
         if command == '/say':
-            await self.server.handle_player_say(self, args)
+            if not await self._admit_chat(args):
+                return
+            await self.session.handle_player_say(self, args)
         elif command == '/status':
-            player_model = await self.server.game_state.get_player(self.username)
+            player_model = await self.session.game_state.get_player(self.username)
             if not player_model or not player_model.location_name:
                 await self.send_direct("CMD_RESULT ⚙️ Вы находитесь в лобби.")
             else:
-                location = await self.server.game_state.get_or_create_location(player_model.location_name)
+                location = await self.session.game_state.get_or_create_location(player_model.location_name)
                 other_players = [p for p in location.players_present if p != self.username]
                 player_status_list = [e.name for e in player_model.status_effects]
                 status_data = {
                     "player": {"name": player_model.username, "status": player_status_list,
-                               "inventory": player_model.inventory},
+                               "inventory": player_model.inventory.display()},
                     "location": {"name": location.name, "description": location.description, "players": other_players}
                 }
-                await self.send_direct(f"STATUS_UPDATE {json.dumps(status_data, ensure_ascii=False)}")
+                await self.send_payload("STATUS_UPDATE", status_data)
         elif command == '/help':
             await self.send_direct("HELP_UPDATE")
         elif command == '/map':
-            graph_data = await self.server.game_state.get_world_graph_data()
-            player_model = await self.server.game_state.get_player(self.username)
+            graph_data = await self.session.game_state.get_world_graph_data()
+            player_model = await self.session.game_state.get_player(self.username)
             if player_model:
                 graph_data['current_location'] = player_model.location_name
-            await self.send_direct(f"MAP_UPDATE {json.dumps(graph_data, ensure_ascii=False)}")
+            await self.send_payload("MAP_UPDATE", graph_data)
 
         await self.send_direct("SYSTEM NARRATION_END")
 
     async def send_direct(self, message: str):
-        async with self._write_lock:
-            if self.is_stream_closed():
+        self.enqueue(self.protocol.encode(message))
+
+    async def send_payload(self, prefix: str, data: Any):
+        """Отправляет структурированные данные: JSON в тексте или кодеком, согласованным для кадров."""
+        self.enqueue(self.protocol.encode_payload(prefix, data))
+
+    def enqueue(self, data: bytes):
+        """
+        Ставит готовые байты в исходящую очередь. Никогда не блокирует вызывающего.
+        После входа кадры нумеруются и запоминаются для досылки; пока игрок отключен, они только копятся.
+        """
+        if self.replay is not None:
+            data = self.replay.record(data)
+            if self.detached:
                 return
-            try:
-                if not message.endswith('\n'):
-                    message += '\n'
-                await self.stream.send_all(message.encode('utf-8'))
-            except (trio.BrokenResourceError, trio.ClosedResourceError):
-                lg.warning(
-                    f"Не удалось отправить сообщение для '{self.username or self.peer_addr}': соединение уже закрыто.")
+        self.enqueue_sequenced(data)
+
+    def enqueue_sequenced(self, data: Union[bytes, SequencedFrame]):
+        """Ставит в очередь уже пронумерованный кадр (или кадр вне сессии) без повторной нумерации."""
+        if self.is_stream_closed():
+            return
+        self._queued_bytes += _outbox_size(data)
+        if self._queued_bytes > config.OUTBOUND_HARD_LIMIT_BYTES:
+            self.abort(f"медленный потребитель, в очереди {self._queued_bytes} байт")
+            return
+        try:
+            self._outbox_send.send_nowait(data)
+        except trio.WouldBlock:
+            self.abort(f"медленный потребитель, в очереди более {config.OUTBOUND_QUEUE_MAX_FRAMES} сообщений")
+            return
+        except trio.ClosedResourceError:
+            return
+        if not self.is_degraded and self._queued_bytes > config.OUTBOUND_SOFT_LIMIT_BYTES:
+            self.is_degraded = True
+            lg.warning(f"Клиент '{self.username or self.peer_addr}' не успевает получать данные: "
+                       f"в очереди {self._queued_bytes} байт.")
+
+    def abort(self, reason: str):
+        """Немедленно разрывает соединение, не дожидаясь отправки очереди."""
+        lg.warning(f"Соединение с '{self.username or self.peer_addr}' разорвано: {reason}.")
+        self._outbox_send.close()
+        self.stream.socket.close()
+
+    async def _writer_loop(self):
+        """
+        Единственный писатель в сокет: отправляет очередь по порядку, склеивая накопившееся в один send_all.
+        Компрессор, поставленный в очередь при согласовании протокола, включает сжатие ровно с этого места потока.
+        """
+        try:
+            async with self._outbox_receive:
+                async for item in self._outbox_receive:
+                    batch: List[Union[bytes, memoryview]] = []
+                    batch_size = frames = 0
+                    next_compressor = None
+                    while True:
+                        if isinstance(item, StreamCompressor):
+                            next_compressor = item
+                            break
+                        if isinstance(item, SequencedFrame):
+                            batch.extend(item)
+                        else:
+                            batch.append(item)
+                        batch_size += _outbox_size(item)
+                        frames += 1
+                        if batch_size >= config.OUTBOUND_BATCH_BYTES:
+                            break
+                        try:
+                            item = self._outbox_receive.receive_nowait()
+                        except (trio.WouldBlock, trio.EndOfChannel):
+                            break
+
+                    if batch:
+                        await self._write_batch(batch, batch_size, frames)
+                    if next_compressor:
+                        self._compressor = next_compressor
+        except (trio.BrokenResourceError, trio.ClosedResourceError):
+            lg.warning(f"Не удалось отправить данные для '{self.username or self.peer_addr}': соединение уже закрыто.")
+        finally:
+            self._writer_done.set()
+
+    async def _write_batch(self, batch: List[Union[bytes, memoryview]], batch_size: int, frames: int):
+        self._queued_bytes -= batch_size
+        if self.is_degraded and self._queued_bytes <= config.OUTBOUND_SOFT_LIMIT_BYTES // 2:
+            self.is_degraded = False
+        data = b"".join(batch)
+        if self._compressor:
+            data = self._compressor.compress(data)
+        await self.stream.send_all(data)
+        self.stats.bytes_out += len(data)
+        self.stats.frames_out += frames
+
+    async def aclose(self):
+        """Дожидается отправки очереди (не дольше OUTBOUND_CLOSE_TIMEOUT) и закрывает соединение."""
+        self._outbox_send.close()
+        with trio.move_on_after(config.OUTBOUND_CLOSE_TIMEOUT):
+            await self._writer_done.wait()
+        if not self.is_stream_closed():
+            await self.stream.aclose()
@@ -0,0 +1,38 @@
+import secrets
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+from protocol.wire import SequencedFrame, sequence_frame
+
+
+class ReplayBuffer:
+    """
+    Кольцо последних пронумерованных кадров игрока.
+    Переживает обрыв соединения, чтобы после переподключения дослать только пропущенное.
+    """
+
+    def __init__(self, capacity: int, token_prefix: str = ""):
+        self.token = token_prefix + secrets.token_urlsafe(18)
+        self._frames: Deque[Tuple[int, SequencedFrame]] = deque(maxlen=capacity)
+        self.last_seq = 0
+
+    def record(self, frame: bytes) -> SequencedFrame:
+        """
+        Присваивает кадру следующий номер, запоминает его и возвращает пронумерованный кадр.
+        Кольцо хранит ссылку на общую нагрузку кадра, а не копию.
+        """
+        self.last_seq += 1
+        sequenced = sequence_frame(frame, self.last_seq)
+        self._frames.append((self.last_seq, sequenced))
+        return sequenced
+
+    def since(self, acknowledged_seq: int) -> Optional[List[SequencedFrame]]:
+        """
+        Возвращает кадры с номером больше acknowledged_seq.
+        None означает, что часть пропущенного уже вытеснена из кольца и нужна полная синхронизация.
+        """
+        if acknowledged_seq >= self.last_seq:
+            return []
+        if not self._frames or self._frames[0][0] > acknowledged_seq + 1:
+            return None
+        return [frame for seq, frame in self._frames if seq > acknowledged_seq]
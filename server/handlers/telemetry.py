@@ -0,0 +1,36 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+import trio
+
+# Вес нового замера в сглаженном RTT, как у SRTT в TCP.
+RTT_SMOOTHING = 1 / 8
+
+
+@dataclass
+class ConnectionStats:
+    """Сетевые счетчики одного соединения. Байты считаются на проводе, то есть после сжатия."""
+    bytes_in: int = 0
+    bytes_out: int = 0
+    frames_in: int = 0
+    frames_out: int = 0
+    pings_sent: int = 0
+    pongs_received: int = 0
+    actions_rejected: int = 0
+    chat_rejected: int = 0
+    rtt: Optional[float] = None
+    rtt_last: Optional[float] = None
+    last_seen: float = field(default_factory=trio.current_time)
+
+    def touch(self):
+        self.last_seen = trio.current_time()
+
+    def record_rtt(self, sample: float):
+        self.pongs_received += 1
+        self.rtt_last = sample
+        self.rtt = sample if self.rtt is None else self.rtt + RTT_SMOOTHING * (sample - self.rtt)
+
+    @property
+    def idle(self) -> float:
+        """Сколько секунд от клиента ничего не приходило."""
+        return trio.current_time() - self.last_seen
@@ -8,6 +8,7 @@ from openai.types.chat import ChatCompletionMessageParam
 from rich.console import Console
 
 import config
+from llm.usage import PromptCacheStats
 from logger import lg
 
 console = Console()
@@ -29,6 +30,7 @@ class ModelManager:
         self.analyzer_params: Dict[str, Any] = {
             "temperature": 0.1,
         }
+        self.prompt_cache = PromptCacheStats()
 
         lg.info("ModelManager инициализирован с раздельной конфигурацией для повествования и анализа.")
 
@@ -67,7 +69,15 @@ class ModelManager:
             self.client = None
             return False
 
-    async def stream_narration(self, prompt: str) -> AsyncGenerator[str, None]:
+    def _record_usage(self, label: str, usage: Any):
+        """Учитывает попадания в кэш префиксов по полю usage ответа; их доля видна на каждом ходу в логе."""
+        if not (counters := self.prompt_cache.record(label, usage)):
+            lg.debug(f"API не вернул usage для запроса '{label}'.")
+            return
+        lg.info(f"Кэш префикса ({label}): {counters.last_hit} из {counters.last_hit + counters.last_miss} "
+                f"токенов промпта ({counters.last_hit_ratio:.0%}), в среднем {counters.hit_ratio:.0%}.")
+
+    async def stream_narration(self, prompt: str, label: str = "повествование") -> AsyncGenerator[str, None]:
         if not self.is_model_loaded or not self.client:
             lg.error("Попытка генерации, но клиент API не инициализирован.")
             yield "Рассказчик недоступен."
@@ -81,20 +91,24 @@ class ModelManager:
                 model=self.narrator_model_name,
                 messages=messages,
                 stream=True,
+                stream_options={"include_usage": True},
                 timeout=120.0,
                 **self.narrator_params
             )
             async for chunk in stream:
-                if content := chunk.choices[0].delta.content:
+                # Последний фрагмент потока несет только usage, без choices.
+                if chunk.usage:
+                    self._record_usage(label, chunk.usage)
+                if chunk.choices and (content := chunk.choices[0].delta.content):
                     yield content
-                await trio.sleep(0.01)
         except Exception as e:
             lg.error(f"Ошибка во время стриминга повествования: {e}", exc_info=True)
             yield "Рассказчик спотыкается..."
         finally:
             lg.info("Потоковая генерация повествования завершена.")
 
-    async def get_state_changes_from_narration(self, prompt: str) -> Tuple[Optional[Dict[str, Any]], str]:
+    async def get_state_changes_from_narration(self, prompt: str, label: str = "изменения состояния") -> Tuple[
+            Optional[Dict[str, Any]], str]:
         if not self.is_model_loaded or not self.client:
             lg.error("Попытка запроса изменений состояния, но клиент API не инициализирован.")
             return None, "Клиент API не инициализирован."
@@ -111,6 +125,7 @@ class ModelManager:
                 response_format={"type": "json_object"},
                 **self.analyzer_params
             )
+            self._record_usage(label, response.usage)
             if not (response.choices and (raw_content := response.choices[0].message.content)):
                 error_text = f"Модель не вернула контент. Полный объект ответа: {response.model_dump_json(indent=2)}"
                 lg.warning(error_text)
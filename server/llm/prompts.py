@@ -1,9 +1,13 @@
+import importlib
 import json
 import random
-from typing import Any, Dict, List, Set
+from typing import Dict, List, Optional, Sequence, Set, Tuple
 
-from game.player import Player
-from game.state import GameState, Location
+import config
+from game.fragments import encode_fragment, join_array, join_object
+from game.history import merge_histories
+from game.snapshot import LocationSnapshot, WorldSnapshot
+from game.story_index import CompiledStory
 from logger import lg
 from llm import templates
 
@@ -27,121 +31,160 @@ FIXED_ELEMENT_STRUCTURE = {
     'mysterious_encounter': 1,
 }
 
-
-def _get_connections_in_group(game_state: GameState, locations: List[Location]) -> List[List[str]]:
-    """Возвращает список уникальных связей между локациями внутри заданной группы."""
-    loc_names_in_group = {loc.name for loc in locations}
-    connection_pairs: Set[frozenset[str]] = set()
-    for loc in locations:
-        for neighbor in game_state.location_graph.get(loc.name, set()):
-            if neighbor in loc_names_in_group:
-                connection_pairs.add(frozenset([loc.name, neighbor]))
-    return [sorted(list(pair)) for pair in connection_pairs]
+# Раскладки промпта повествования, см. config.PROMPT_LAYOUT.
+PROMPT_LAYOUTS = ('classic', 'prefix_cache')
 
 
-async def _select_and_update_focus_elements(game_state: GameState, story_data: Dict[str, Any],
-                                            location: Location) -> str:
+class PromptBuilder:
     """
-    Выбирает динамические элементы для сцены и обновляет список использованных элементов в локации.
+    Статические разделы промптов: инструкции, принципы, схема ответа. Они рендерятся один раз при
+    создании и заново — только при перезагрузке шаблонов; на каждом ходу к ним приклеиваются лишь
+    динамические части (состояние, действия, история).
+    layout — раскладка промпта повествования; ее можно сменить на ходу, чтобы сравнить попадания в кэш API.
     """
-    weights_dict = game_state.fear_weights
-    fear_types_population = list(weights_dict.keys())
-    fear_weights = list(weights_dict.values())
-    all_sources: Dict[str, Dict[str, List[str]]] = {}
-    details = story_data.get('details', {})
-    events = story_data.get('events', {})
-    for fear_type in fear_types_population:
-        all_sources.setdefault(fear_type, {})
-        for category in ALL_ELEMENT_CATEGORIES.keys():
-            source_dict = details if category in details.get(fear_type, {}) else events
-            all_sources[fear_type][category] = source_dict.get(fear_type, {}).get(category, [])
 
+    def __init__(self, layout: str = config.PROMPT_LAYOUT):
+        if layout not in PROMPT_LAYOUTS:
+            lg.warning(f"Неизвестная раскладка промпта '{layout}', используется '{PROMPT_LAYOUTS[0]}'.")
+            layout = PROMPT_LAYOUTS[0]
+        self.layout = layout
+        self.render()
+
+    def render(self):
+        self.narration_head = f"### Инструкция:\n\n{templates.NARRATOR_INSTRUCTION}"
+        self.scene_focus_header = f"### {templates.SCENE_FOCUS_HEADER}"
+        self.history_header = f"### {templates.CONVERSATION_HISTORY_HEADER}"
+        self.atmosphere_header = f"### {templates.ATMOSPHERE_HEADER}"
+        self.immersion_principles = f"### {templates.IMMERSION_HEADER}\n" + "\n\n".join(templates.IMMERSION_PRINCIPLES)
+        self.narrative_principles = f"### {templates.PRINCIPLES_HEADER}\n" + "\n\n".join(templates.NARRATIVE_PRINCIPLES)
+        self.narration_tail = "### Ответ (только повествовательный текст):"
+
+        json_schema_str = json.dumps(templates.STATE_CHANGE_SCHEMA, indent=2, ensure_ascii=False)
+        self.state_update_head = (f"### Инструкция:\n\n{templates.STATE_UPDATE_INSTRUCTION}\n\n"
+                                  f"### Схема JSON для ответа:\n\n```json\n{json_schema_str}\n```")
+        self.state_update_tail = "### Ответ (только JSON-объект, обернутый в ```json ... ```):"
+
+    def reload(self):
+        """Перечитывает модуль шаблонов и заново рендерит статические разделы."""
+        importlib.reload(templates)
+        self.render()
+        lg.info(f"Шаблоны промптов перезагружены: {self.static_chars} символов статических разделов.")
+
+    @property
+    def static_chars(self) -> int:
+        return sum(len(section) for section in (
+            self.narration_head, self.immersion_principles, self.narrative_principles, self.state_update_head))
+
+
+PROMPT_BUILDER = PromptBuilder()
+
+
+def _select_focus_elements(snapshot: WorldSnapshot, story: CompiledStory,
+                           location: LocationSnapshot) -> Tuple[str, int]:
+    """
+    Выбирает динамические элементы для сцены. Возвращает текст для промпта и битовую маску выбранных
+    элементов, которую вызывающий должен отметить в локации как использованные.
+    """
+    sampler = story.sampler(snapshot.fear_weights)
     selected_elements_text: List[str] = []
-    used_items = location.used_story_elements.copy()
-    newly_used_items: List[str] = []
+    used_mask = location.used_story_mask
+    newly_used_mask = 0
 
     for category_key, count in FIXED_ELEMENT_STRUCTURE.items():
         for _ in range(count):
-            chosen_item = None
-            try:
-                fear_type = random.choices(fear_types_population, weights=fear_weights, k=1)[0]
-                pool = all_sources.get(fear_type, {}).get(category_key, [])
-                available_items = [item for item in pool if item not in used_items]
-                if available_items:
-                    chosen_item = random.choice(available_items)
-            except (ValueError, IndexError):
-                pass
-
-            if not chosen_item:
-                shuffled_fear_types = random.sample(fear_types_population, len(fear_types_population))
+            fear_type = sampler.sample()
+            index = story.draw(fear_type, category_key, used_mask) if fear_type else None
+
+            if index is None:
+                shuffled_fear_types = random.sample(sampler.population, len(sampler.population))
                 for fear_type in shuffled_fear_types:
-                    pool = all_sources.get(fear_type, {}).get(category_key, [])
-                    available_items = [item for item in pool if item not in used_items]
-                    if available_items:
-                        chosen_item = random.choice(available_items)
+                    index = story.draw(fear_type, category_key, used_mask)
+                    if index is not None:
                         break
 
-            if chosen_item:
+            if index is not None:
                 label = ALL_ELEMENT_CATEGORIES[category_key]
-                selected_elements_text.append(f"- {label}: {chosen_item}")
-                used_items.add(chosen_item)
-                newly_used_items.append(chosen_item)
+                selected_elements_text.append(f"- {label}: {story.elements[index]}")
+                used_mask |= 1 << index
+                newly_used_mask |= 1 << index
             else:
                 lg.warning(f"Пул исчерпан для категории '{category_key}' в локации '{location.name}'.")
 
-    if newly_used_items:
-        location.used_story_elements.update(newly_used_items)
     lg.debug(f"Выбраны динамические элементы для промпта: {selected_elements_text}")
-    return "\n".join(selected_elements_text)
-
-
-async def construct_narration_prompt(game_state: GameState, locations: List[Location],
-                                     players: List[Player], immersion_turns: int,
-                                     story_injection_turns: int, max_history_char_length: int) -> str:
-    """Создает промпт для генерации повествования для группы связанных локаций."""
-    player_states = [
-        {"username": p.username, "inventory": p.inventory, "status_effects": [vars(e) for e in p.status_effects]} for p
-        in players]
-    location_group_info = [
-        {"name": loc.name, "description": loc.description,
-         "players_present": sorted(list(loc.players_present)), "turn_count": loc.turn_counter,
-         "parent_location": loc.parent_location, "sub_locations": list(loc.sub_locations)}
-        for loc in locations
+    return "\n".join(selected_elements_text), newly_used_mask
+
+
+def _state_json(snapshot: WorldSnapshot, location_fragments: List[str], with_world_flags: bool) -> str:
+    """
+    JSON состояния группы, склеенный из готовых фрагментов локаций, игроков и флагов мира.
+    Заново кодируется только список связей; результат совпадает с json.dumps(..., indent=2)
+    или, в компактном режиме, с кодированием без отступов.
+    """
+    compact = snapshot.compact_json
+    members = [
+        ("location_group", join_array(location_fragments, compact, 1)),
+        ("connections", encode_fragment([list(pair) for pair in snapshot.connections], compact, 1)),
+        ("players", join_array([p.state_json for p in snapshot.players], compact, 1)),
     ]
-    connections_list = _get_connections_in_group(game_state, locations)
+    if with_world_flags:
+        members.append(("world_flags", snapshot.world_flags_json))
+    return join_object(members, compact)
 
-    state_json_data: Dict[str, Any] = {
-        "location_group": location_group_info, "connections": connections_list, "players": player_states
-    }
 
-    story_data = game_state.story_data.get(locations[0].name, {})
-    if story_data.get('use_world_flags'):
-        state_json_data['world_flags'] = game_state.world_flags
-    state_json_str = json.dumps(state_json_data, indent=2, ensure_ascii=False)
+def _format_group_history(locations: Sequence[LocationSnapshot], max_chars: int) -> str:
+    """
+    Единая хронология группы. Общие записи (повествование хода) выводятся один раз; записи,
+    относящиеся не ко всем локациям группы, помечаются именами своих локаций.
+    Если история не помещается в max_chars символов, берутся целиком самые новые записи, что помещаются:
+    строки отбираются с конца, и длина считается по записям, без склейки и обрезки всей истории.
+    """
+    if len(locations) == 1:
+        header = f"#### Из локации: {locations[0].name}"
+        lines = [entry.text for entry in locations[0].conversation_history]
+    else:
+        header = None
+        lines = [entry.text if len(names) == len(locations) else f"[{', '.join(names)}] {entry.text}"
+                 for entry, names in merge_histories([(loc.name, loc.conversation_history) for loc in locations])]
+
+    budget, kept = max_chars, 0
+    for line in reversed(lines):
+        if len(line) + 1 > budget:
+            break
+        budget -= len(line) + 1
+        kept += 1
+    if kept < len(lines):
+        # Самая новая запись длиннее всего бюджета: от нее остается конец.
+        recent = lines[len(lines) - kept:] if kept else [lines[-1][-max_chars:]]
+        lines = ["[...история была обрезана...]", *recent]
+        lg.info(f"История диалогов была обрезана до ~{max_chars} символов.")
+    return '\n'.join([header, *lines] if header else lines)
+
+
+async def construct_narration_prompt(snapshot: WorldSnapshot, immersion_turns: int, story_injection_turns: int,
+                                     max_history_char_length: int, layout: Optional[str] = None) -> Tuple[str, int]:
+    """
+    Создает промпт для генерации повествования для группы связанных локаций по срезу мира.
+    Возвращает промпт и битовую маску элементов истории, использованных в нем впервые.
+    layout — раскладка разделов (по умолчанию текущая раскладка PROMPT_BUILDER).
+    """
+    locations = snapshot.locations
+    story = snapshot.story
+    state_json_str = _state_json(snapshot, [loc.narration_json for loc in locations],
+                                 with_world_flags=bool(story and story.use_world_flags))
 
-    conversation_history_parts = []
     player_actions_map = {}
     for loc in locations:
-        history = '\n'.join(loc.conversation_history[-15:])
-        conversation_history_parts.append(f"#### Из локации: {loc.name}\n{history}")
         player_actions_map.update(loc.pending_actions)
-    conversation_history = '\n\n'.join(conversation_history_parts)
-
-    if len(conversation_history) > max_history_char_length:
-        trimmed_history = conversation_history[-max_history_char_length:]
-        first_newline_pos = trimmed_history.find('\n')
-        final_trimmed_history = trimmed_history[first_newline_pos + 1:] if first_newline_pos != -1 else trimmed_history
-        conversation_history = f"[...история была обрезана...]\n{final_trimmed_history}"
-        lg.info(f"История диалогов была обрезана до ~{max_history_char_length} символов.")
+    conversation_history = _format_group_history(locations, max_history_char_length)
 
     player_actions_str = "\n".join(
         [f"- {name}: {action}" for name, action in player_actions_map.items()]
     ) or "- Игроки бездействуют, осматриваясь по сторонам."
 
-    scene_focus_prompt = ""
-    main_location = locations[0]
-    if main_location.turn_counter < story_injection_turns and story_data:
-        scene_focus_prompt = await _select_and_update_focus_elements(game_state, story_data, main_location)
+    scene_focus_prompt, used_mask = "", 0
+    main_location = snapshot.main_location
+    if main_location.turn_counter < story_injection_turns and story:
+        scene_focus_prompt, used_mask = _select_focus_elements(snapshot, story, main_location)
 
     merge_conflict_prompt = ""
     turn_counters = {loc.turn_counter for loc in locations}
@@ -165,73 +208,37 @@ async def construct_narration_prompt(game_state: GameState, locations: List[Loca
                 "**ТВОЯ ЗАДАЧА:** Опиши, что игроки видят **СЕЙЧАС**, в момент слияния. Твое описание должно стать новой, единой истиной. Объясни расхождения, если это возможно (например, 'вода, затопившая комнату, теперь быстро уходит в решетку на полу, оставляя ил и сырость'). Не упоминай слова 'парадокс' или 'временная линия'."
             )
 
-    principles_header, principles_to_use = (templates.IMMERSION_HEADER,
-                                            templates.IMMERSION_PRINCIPLES) if main_location.turn_counter < immersion_turns else (
-        templates.PRINCIPLES_HEADER, templates.NARRATIVE_PRINCIPLES)
-
-    prompt_sections = [
-        "### Инструкция:", templates.NARRATOR_INSTRUCTION,
-        "### ТЕКУЩЕЕ СОСТОЯНИЕ МИРА И ИГРОКОВ (JSON):", f"```json\n{state_json_str}\n```",
-        "### ДЕЙСТВИЯ ИГРОКОВ В ЭТОМ ХОДЕ:", player_actions_str,
-    ]
+    builder = PROMPT_BUILDER
+    principles = builder.immersion_principles if main_location.turn_counter < immersion_turns \
+        else builder.narrative_principles
+    history_section = f"{builder.history_header}\n{conversation_history}"
+    turn_sections = ["### ТЕКУЩЕЕ СОСТОЯНИЕ МИРА И ИГРОКОВ (JSON):", f"```json\n{state_json_str}\n```",
+                     "### ДЕЙСТВИЯ ИГРОКОВ В ЭТОМ ХОДЕ:", player_actions_str]
     if merge_conflict_prompt:
-        prompt_sections.append(merge_conflict_prompt)
+        turn_sections.append(merge_conflict_prompt)
     if scene_focus_prompt:
-        prompt_sections.append(f"### {templates.SCENE_FOCUS_HEADER}\n{scene_focus_prompt}")
-    prompt_sections.extend([
-        f"### {templates.CONVERSATION_HISTORY_HEADER}\n{conversation_history}",
-        f"### {principles_header}\n" + "\n\n".join(principles_to_use),
-        "### Ответ (только повествовательный текст):"
-    ])
-    return "\n\n".join(prompt_sections)
+        turn_sections.append(f"{builder.scene_focus_header}\n{scene_focus_prompt}")
 
+    if (layout or builder.layout) == 'prefix_cache':
+        # От стабильных разделов к изменчивым: соседние ходы делят префикс до истории включительно,
+        # пока из нее не вытесняются старые записи. Случайные компоненты сцены идут после действий.
+        atmosphere = [f"{builder.atmosphere_header}\n{story.atmosphere}"] if story and story.atmosphere else []
+        prompt_sections = [builder.narration_head, principles, *atmosphere, history_section, *turn_sections]
+    else:
+        prompt_sections = [builder.narration_head, *turn_sections, history_section, principles]
+    prompt_sections.append(builder.narration_tail)
+    return "\n\n".join(prompt_sections), used_mask
 
-def construct_state_update_prompt(game_state: GameState, locations: List[Location], players: List[Player],
-                                  full_narration: str) -> str:
-    """Создает промпт для извлечения изменений состояния в формате JSON для группы локаций."""
-    player_states = [
-        {"username": p.username, "inventory": p.inventory, "status_effects": [vars(e) for e in p.status_effects]} for p
-        in players]
-    location_group_info = [
-        {"name": loc.name, "description": loc.description,
-         "parent_location": loc.parent_location, "sub_locations": list(loc.sub_locations)}
-        for loc in locations
-    ]
-    connections_list = _get_connections_in_group(game_state, locations)
-
-    state_json_data: Dict[str, Any] = {
-        "location_group": location_group_info, "connections": connections_list, "players": player_states,
-    }
-    if game_state.story_data.get(locations[0].name, {}).get('use_world_flags'):
-        state_json_data['world_flags'] = game_state.world_flags
-
-    state_json_str = json.dumps(state_json_data, indent=2, ensure_ascii=False)
-    json_schema_str = json.dumps(templates.STATE_CHANGE_SCHEMA, indent=2, ensure_ascii=False)
-
-    tool_instruction = (
-        "Проанализируй ИСХОДНОЕ СОСТОЯНИЕ и НОВОЕ ПОВЕСТВОВАНИЕ. "
-        "Верни JSON-объект, отражающий ВСЕ изменения, строго следуя схеме.\n"
-        "Ключевые моменты:\n"
-        "1.  `player_updates`: Заполняй для каждого игрока, чье состояние изменилось (инвентарь, эффекты, перемещение).\n"
-        "2.  `location_updates`: Используй `change_type: 'UPDATE_DESCRIPTION'` для изменения локации, `change_type: 'CREATE'` для новой.\n"
-        "3.  **Иерархия и Связи:**\n"
-        "    - **`parent_location`**: Используй это поле в `location_updates`, чтобы показать **вложенность**. Например, комната (`security_room`) находится *внутри* станции (`endless_metro`).\n"
-        "    - **`connection_updates`**: Используй это для **перемещения** между локациями. Например, дверь соединяет `security_room` и `corridor_A`.\n"
-        "4.  Если изменений нет, верни пустой JSON-объект `{}`.\n"
-        "5.  **ПРАВИЛА ПЕРЕМЕЩЕНИЯ ИГРОКОВ (КРИТИЧЕСКИ ВАЖНО):**\n"
-        "    - **СЦЕНАРИЙ 1: Игрок открывает дверь и переходит в соседнюю комнату.**\n"
-        "      ДЕЙСТВИЯ: 1. Используй `move_to_location` для игрока. 2. Убедись, что между старой и новой локацией есть связь (`action: 'CREATE'` в `connection_updates`), если ее не было.\n"
-        "    - **СЦЕНАРИЙ 2: Игрок телепортируется, теряет сознание и просыпается в другом месте, или перемещается магическим/необъяснимым образом.**\n"
-        "      ДЕЙСТВИЯ: 1. Используй `move_to_location` для игрока. 2. **НЕ СОЗДАВАЙ** связь в `connection_updates`. Это намеренно разделит группы игроков. Это ПРАВИЛЬНО.\n"
-        "    - **СЦЕНАРИЙ 3: Дверь/проход между локациями заваливает или он уничтожается.**\n"
-        "      ДЕЙСТВИЯ: Используй `action: 'DESTROY'` в `connection_updates`, чтобы разорвать связь между локациями. Это разделит группы."
-    )
+
+def construct_state_update_prompt(snapshot: WorldSnapshot, full_narration: str) -> str:
+    """Создает промпт для извлечения изменений состояния в формате JSON для группы локаций по срезу мира."""
+    state_json_str = _state_json(snapshot, [loc.state_update_json for loc in snapshot.locations],
+                                 with_world_flags=bool(snapshot.story and snapshot.story.use_world_flags))
 
     prompt_sections = [
-        "### Инструкция:", tool_instruction,
-        "### Схема JSON для ответа:", f"```json\n{json_schema_str}\n```",
+        PROMPT_BUILDER.state_update_head,
         f"### ИСХОДНОЕ СОСТОЯНИЕ (JSON):", f"```json\n{state_json_str}\n```",
         f"### НОВОЕ ПОВЕСТВОВАНИЕ ДЛЯ АНАЛИЗА:\n---\n{full_narration}\n---",
-        "### Ответ (только JSON-объект, обернутый в ```json ... ```):"
+        PROMPT_BUILDER.state_update_tail,
     ]
     return "\n\n".join(prompt_sections)
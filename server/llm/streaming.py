@@ -0,0 +1,81 @@
+import math
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List
+
+import trio
+
+SENTENCE_ENDINGS = ('.', '!', '?', '…', ':', ';', '\n')
+
+
+class NarrationCoalescer:
+    """
+    Склеивает мелкие фрагменты потокового повествования в более крупные кадры.
+    Накопленное сбрасывается в конце предложения, при превышении бюджета в байтах
+    или по истечении временного окна с момента первого несброшенного фрагмента.
+    """
+
+    def __init__(self, flush: Callable[[str], Awaitable[None]], window: float, max_bytes: int):
+        self._flush = flush
+        self.window = window
+        self.max_bytes = max_bytes
+        self._parts: List[str] = []
+        self._pending: List[str] = []
+        self._pending_bytes = 0
+        self._deadline = math.inf
+        self._armed = trio.Event()
+        self._flush_lock = trio.Lock()
+        self.chunks_received = 0
+        self.frames_sent = 0
+
+    @property
+    def text(self) -> str:
+        """Полный текст повествования, собранный из всех полученных фрагментов."""
+        return "".join(self._parts)
+
+    async def feed(self, chunk: str):
+        if not chunk:
+            return
+        self.chunks_received += 1
+        self._parts.append(chunk)
+        self._pending.append(chunk)
+        self._pending_bytes += len(chunk.encode('utf-8'))
+
+        if self._pending_bytes >= self.max_bytes or chunk.rstrip(' ').endswith(SENTENCE_ENDINGS):
+            await self.flush()
+        elif self._deadline == math.inf:
+            self._deadline = trio.current_time() + self.window
+            self._armed.set()
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            text = "".join(self._pending)
+            self._pending.clear()
+            self._pending_bytes = 0
+            self._deadline = math.inf
+            self.frames_sent += 1
+            await self._flush(text)
+
+    async def _run_timer(self):
+        while True:
+            await self._armed.wait()
+            self._armed = trio.Event()
+            while self._deadline != math.inf:
+                await trio.sleep_until(self._deadline)
+                if trio.current_time() >= self._deadline:
+                    await self.flush()
+
+
+@asynccontextmanager
+async def coalesce_narration(flush: Callable[[str], Awaitable[None]], window: float,
+                             max_bytes: int) -> AsyncIterator[NarrationCoalescer]:
+    """Открывает коалесцер с фоновым таймером окна; при нормальном выходе досылает остаток."""
+    coalescer = NarrationCoalescer(flush, window, max_bytes)
+    async with trio.open_nursery() as nursery:
+        nursery.start_soon(coalescer._run_timer)
+        try:
+            yield coalescer
+            await coalescer.flush()
+        finally:
+            nursery.cancel_scope.cancel()
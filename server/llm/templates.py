@@ -15,12 +15,12 @@ STATE_CHANGE_SCHEMA = {
                     "inventory_add": {
                         "type": "array",
                         "items": {"type": "string"},
-                        "description": "Предметы для ДОБАВЛЕНИЯ в инвентарь игрока."
+                        "description": "Предметы для ДОБАВЛЕНИЯ в инвентарь игрока. Каждое упоминание добавляет один экземпляр."
                     },
                     "inventory_remove": {
                         "type": "array",
                         "items": {"type": "string"},
-                        "description": "Предметы для УДАЛЕНИЯ из инвентаря игрока."
+                        "description": "Предметы для УДАЛЕНИЯ из инвентаря игрока. Каждое упоминание удаляет один экземпляр."
                     },
                     "status_effects_update": {
                         "type": "object",
@@ -115,6 +115,27 @@ STATE_CHANGE_SCHEMA = {
     },
 }
 
+# Инструкция для извлечения изменений состояния из повествования
+STATE_UPDATE_INSTRUCTION = (
+    "Проанализируй ИСХОДНОЕ СОСТОЯНИЕ и НОВОЕ ПОВЕСТВОВАНИЕ. "
+    "Верни JSON-объект, отражающий ВСЕ изменения, строго следуя схеме.\n"
+    "Ключевые моменты:\n"
+    "1.  `player_updates`: Заполняй для каждого игрока, чье состояние изменилось (инвентарь, эффекты, перемещение). "
+    "Инвентарь в исходном состоянии задан как `{предмет: количество}`; в `inventory_add`/`inventory_remove` указывай только названия предметов.\n"
+    "2.  `location_updates`: Используй `change_type: 'UPDATE_DESCRIPTION'` для изменения локации, `change_type: 'CREATE'` для новой.\n"
+    "3.  **Иерархия и Связи:**\n"
+    "    - **`parent_location`**: Используй это поле в `location_updates`, чтобы показать **вложенность**. Например, комната (`security_room`) находится *внутри* станции (`endless_metro`).\n"
+    "    - **`connection_updates`**: Используй это для **перемещения** между локациями. Например, дверь соединяет `security_room` и `corridor_A`.\n"
+    "4.  Если изменений нет, верни пустой JSON-объект `{}`.\n"
+    "5.  **ПРАВИЛА ПЕРЕМЕЩЕНИЯ ИГРОКОВ (КРИТИЧЕСКИ ВАЖНО):**\n"
+    "    - **СЦЕНАРИЙ 1: Игрок открывает дверь и переходит в соседнюю комнату.**\n"
+    "      ДЕЙСТВИЯ: 1. Используй `move_to_location` для игрока. 2. Убедись, что между старой и новой локацией есть связь (`action: 'CREATE'` в `connection_updates`), если ее не было.\n"
+    "    - **СЦЕНАРИЙ 2: Игрок телепортируется, теряет сознание и просыпается в другом месте, или перемещается магическим/необъяснимым образом.**\n"
+    "      ДЕЙСТВИЯ: 1. Используй `move_to_location` для игрока. 2. **НЕ СОЗДАВАЙ** связь в `connection_updates`. Это намеренно разделит группы игроков. Это ПРАВИЛЬНО.\n"
+    "    - **СЦЕНАРИЙ 3: Дверь/проход между локациями заваливает или он уничтожается.**\n"
+    "      ДЕЙСТВИЯ: Используй `action: 'DESTROY'` в `connection_updates`, чтобы разорвать связь между локациями. Это разделит группы."
+)
+
 # Основная инструкция для рассказчика
 NARRATOR_INSTRUCTION = """Ты — Справедливый и Загадочный Рассказчик. Твоя задача — создать сложный, атмосферный, но **преодолимый** мир. Ты не враг игрокам, а проводник в неизведанное. Твоя цель — интриговать и бросать вызов, а не наказывать. Ты должен сплести действия игроков в единое повествование, где успех возможен, а неудача — это следствие рискованных или необдуманных решений, а не случайности."""
 
@@ -269,3 +290,4 @@ IMMERSION_HEADER = "ПРИНЦИПЫ ПОГРУЖЕНИЯ (СЛЕДУЙ ИМ В
 CONVERSATION_HISTORY_HEADER = "НЕДАВНИЕ СОБЫТИЯ (последние реплики игроков и твои описания):"
 PRINCIPLES_HEADER = "ПРИНЦИПЫ РЕЖИССУРЫ (СЛЕДУЙ ИМ НЕУКОСНИТЕЛЬНО):"
 SCENE_FOCUS_HEADER = "КОМПОНЕНТЫ СЦЕНЫ НА ЭТОТ ХОД:"
+ATMOSPHERE_HEADER = "АТМОСФЕРА ИСТОРИИ (ОБЩИЙ ЗАМЫСЕЛ):"
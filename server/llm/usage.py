@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclass
+class PromptCacheCounters:
+    """
+    Токены промптов одного вида запросов по данным API. DeepSeek сообщает, сколько токенов промпта
+    совпало с закэшированным префиксом прежних запросов (они дешевле и обрабатываются быстрее).
+    """
+    requests: int = 0
+    hit_tokens: int = 0
+    miss_tokens: int = 0
+    completion_tokens: int = 0
+    last_hit: int = 0
+    last_miss: int = 0
+
+    def record(self, hit: int, miss: int, completion: int):
+        self.requests += 1
+        self.hit_tokens += hit
+        self.miss_tokens += miss
+        self.completion_tokens += completion
+        self.last_hit, self.last_miss = hit, miss
+
+    @staticmethod
+    def _ratio(hit: int, miss: int) -> float:
+        return hit / (hit + miss) if hit + miss else 0.0
+
+    @property
+    def hit_ratio(self) -> float:
+        return self._ratio(self.hit_tokens, self.miss_tokens)
+
+    @property
+    def last_hit_ratio(self) -> float:
+        return self._ratio(self.last_hit, self.last_miss)
+
+
+def cache_tokens(usage: Any) -> Optional[Tuple[int, int, int]]:
+    """
+    (попадания, промахи, токены ответа) из поля usage ответа API или None, если usage нет.
+    Поля prompt_cache_hit_tokens и prompt_cache_miss_tokens — расширение DeepSeek; у других
+    совместимых API попадания берутся из prompt_tokens_details.cached_tokens.
+    """
+    if usage is None:
+        return None
+    prompt = usage.prompt_tokens or 0
+    hit = getattr(usage, 'prompt_cache_hit_tokens', None)
+    if hit is None:
+        details = getattr(usage, 'prompt_tokens_details', None)
+        hit = getattr(details, 'cached_tokens', None) or 0
+    miss = getattr(usage, 'prompt_cache_miss_tokens', None)
+    if miss is None:
+        miss = max(prompt - hit, 0)
+    return hit, miss, usage.completion_tokens or 0
+
+
+class PromptCacheStats:
+    """Счетчики кэша префиксов по видам запросов (например, повествование в каждой раскладке промпта)."""
+
+    def __init__(self):
+        self.counters: Dict[str, PromptCacheCounters] = {}
+
+    def record(self, label: str, usage: Any) -> Optional[PromptCacheCounters]:
+        tokens = cache_tokens(usage)
+        if tokens is None:
+            return None
+        counters = self.counters.get(label)
+        if counters is None:
+            counters = self.counters[label] = PromptCacheCounters()
+        counters.record(*tokens)
+        return counters
+
+    def reset(self):
+        self.counters.clear()
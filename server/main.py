@@ -1,148 +1,221 @@
+import os
 import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 import argparse
-from typing import Dict, Iterable, Optional, List
+import socket
+from typing import Dict, Optional
 
 import trio
 from rich.console import Console
 
 import config
-from game.engine import GameEngine
-from game.state import GameState
+from cluster import run_cluster, serve_worker_channel, worker_session_prefix, worker_token_prefix
+from game.player import Player
+from game.session import SessionRegistry
 from handlers.admin import AdminConsole
+from handlers.broadcast import deliver
 from handlers.player import PlayerConnection
 from logger import lg
 from llm.manager import ModelManager
-from utils import find_available_port, initialize_debug_directories
+from utils import bind_listening_socket, initialize_debug_directories
 
 console = Console()
 
 
 class Server:
-    def __init__(self, host: str, port: int):
+    def __init__(self, host: str, port: int, worker_index: Optional[int] = None):
         self.host = host
         self.port = port
+        self.worker_index = worker_index
         self.nursery: Optional[trio.Nursery] = None
-        self.game_state = GameState()
         self.model_manager = ModelManager()
-        self.game_engine = GameEngine(self)
+        self.sessions = SessionRegistry(self, worker_session_prefix(worker_index))
         self.admin_console = AdminConsole(self)
+        # Все соединения сервера независимо от стола: имена игроков уникальны в пределах сервера.
         self.player_connections: Dict[str, PlayerConnection] = {}
+        self.resume_tokens: Dict[str, PlayerConnection] = {}
         lg.info(f"Сервер инициализирован с хостом {host} и портом {port}.")
 
-    async def run(self):
-        lg.info("--- Запуск сервера AI Quest ---")
-        initialize_debug_directories()
+    @property
+    def resume_token_prefix(self) -> str:
+        """Префикс токенов возобновления: по нему фронт кластера находит воркер, хранящий сессию."""
+        return worker_token_prefix(self.worker_index)
+
+    async def _initialize_model(self):
         console.print("[bold blue]Инициализация языковой модели...[/bold blue]")
         if not await self.model_manager.initialize_model():
             lg.critical("Не удалось инициализировать языковую модель. Сервер не может быть запущен.")
             sys.exit(1)
-        try:
-            self.port = await find_available_port(self.port)
-        except OSError as e:
-            lg.critical(f"Не удалось найти доступный порт для запуска сервера: {e}", exc_info=True)
-            sys.exit(1)
+
+    async def run(self, listen_sock: socket.socket):
+        lg.info("--- Запуск сервера AI Quest ---")
+        await self._initialize_model()
+        listener = trio.SocketListener(trio.socket.from_stdlib_socket(listen_sock))
 
         async with trio.open_nursery() as nursery:
             self.nursery = nursery
             nursery.start_soon(self.admin_console.run)
             console.print(f"[bold green]Сервер слушает на {self.host}:{self.port}[/bold green]")
-            await trio.serve_tcp(self._connection_handler, self.port, host=self.host)
+            await trio.serve_listeners(self._connection_handler, [listener])
         lg.info("--- Сервер завершил работу ---")
 
-    async def _connection_handler(self, stream: trio.SocketStream):
+    async def run_worker(self, channel: socket.socket):
+        """Режим воркера: соединения и админ-команды приходят от фронта по каналу channel."""
+        lg.info(f"--- Запуск воркера {self.worker_index} (pid {os.getpid()}) ---")
+        await self._initialize_model()
+        async with trio.open_nursery() as nursery:
+            self.nursery = nursery
+            await serve_worker_channel(self, channel)
+            nursery.cancel_scope.cancel()
+        lg.info(f"--- Воркер {self.worker_index} завершил работу ---")
+
+    async def _connection_handler(self, stream: trio.SocketStream, initial_data: bytes = b"",
+                                  prompt_sent: bool = False):
         peer = stream.socket.getpeername()
         lg.info(f"Получено новое входящее соединение от {peer}.")
-        player_conn = PlayerConnection(self, stream)
+        player_conn = PlayerConnection(self, stream, initial_data, prompt_sent)
         await player_conn.run()
 
-    async def player_joined(self, player_conn: PlayerConnection):
-        if not player_conn.username: return
-        self.player_connections[player_conn.username] = player_conn
-
-        is_active = await self.game_state.is_game_active()
-        await player_conn.send_direct(f"SYSTEM STATE_UPDATE {'ACTIVE' if is_active else 'LOBBY'}")
-
-        if is_active:
-            player_model = await self.game_state.get_player(player_conn.username)
-            if player_model and player_model.location_name:
-                await self.broadcast_to_locations({player_model.location_name},
-                                                  f"SYSTEM {player_model.username} присоединился.",
-                                                  exclude=[player_model.username])
-                location = await self.game_state.get_or_create_location(player_model.location_name)
-                await player_conn.send_direct(f"NARRATE {location.description.replace(chr(10), '<<BR>>')}")
-                await player_conn.send_direct("SYSTEM NARRATION_END")
+    async def join_session(self, player_conn: PlayerConnection, requested_session: Optional[str] = None) -> str:
+        """
+        Сажает вошедшего игрока за стол: выбранный им или первый свободный.
+        Имя проверяется и занимается синхронно, поэтому два одновременных входа с одним именем
+        не пройдут даже за разными столами. Возвращает "success" или причину отказа.
+        """
+        username = player_conn.username
+        if username in self.player_connections:
+            return "taken"
+        session, reason = self.sessions.assign(requested_session)
+        if session is None:
+            return reason
+        self.player_connections[username] = player_conn
+
+        success, reason = await session.game_state.add_player(Player(username=username))
+        if not success:
+            del self.player_connections[username]
+            await self.sessions.discard_if_empty(session)
+            return reason
+
+        player_conn.session = session
+        return "success"
+
+    async def player_disconnected(self, player_conn: PlayerConnection):
+        """
+        Вызывается при обрыве соединения вошедшего игрока.
+        Если клиент может возобновить сессию, игрок сохраняется на RESUME_GRACE_PERIOD секунд,
+        а адресованные ему кадры продолжают копиться в кольце досылки.
+        """
+        if self.player_connections.get(player_conn.username) is not player_conn:
+            return  # Соединение уже заменено возобновленным.
+        if not (player_conn.replay and player_conn.resumable and player_conn.session):
+            await self.remove_player(player_conn)
+            return
+
+        player_conn.detached = True
+        lg.info(f"Игрок '{player_conn.username}' потерял связь. Ожидание переподключения {config.RESUME_GRACE_PERIOD} с.")
+        await player_conn.session.broadcast_to_component(player_conn.username,
+                                                         f"SYSTEM {player_conn.username} потерял связь.")
+        self.nursery.start_soon(self._expire_detached, player_conn)
+
+    async def _expire_detached(self, player_conn: PlayerConnection):
+        await trio.sleep(config.RESUME_GRACE_PERIOD)
+        if player_conn.detached and self.player_connections.get(player_conn.username) is player_conn:
+            lg.info(f"Игрок '{player_conn.username}' не вернулся за {config.RESUME_GRACE_PERIOD} с и будет удален.")
+            await self.remove_player(player_conn)
+
+    def find_resumable(self, token: str) -> Optional[PlayerConnection]:
+        player_conn = self.resume_tokens.get(token)
+        if player_conn and player_conn.resumable and self.player_connections.get(player_conn.username) is player_conn:
+            return player_conn
+        return None
+
+    async def resume_player(self, player_conn: PlayerConnection, previous: PlayerConnection, acknowledged_seq: int):
+        """
+        Передает новому соединению сессию прежнего: досылает пропущенные кадры из кольца
+        или, если они уже вытеснены, выполняет полную синхронизацию.
+        """
+        username = previous.username
+        session = previous.session
+        frames = previous.replay.since(acknowledged_seq)
+        player_conn.username = username
+        player_conn.replay = previous.replay
+        player_conn.session = session
+        self.player_connections[username] = player_conn
+        self.resume_tokens[previous.replay.token] = player_conn
+        session.attach(player_conn)
+        if not previous.detached:
+            # Сервер еще не заметил обрыв (полуоткрытое соединение) — закрываем старый сокет сами.
+            previous.resumable = False
+            previous.abort("сессия возобновлена с другого соединения")
+        previous.detached = False
+
+        if frames is None:
+            lg.info(f"Игрок '{username}' вернулся, но пропустил больше {config.RESUME_REPLAY_FRAMES} кадров: полная синхронизация.")
+            await session.send_world_state(player_conn)
         else:
-            all_players = await self.game_state.get_all_player_usernames()
-            await self.broadcast_system("LOBBY_UPDATE " + ",".join(all_players), is_direct=True)
+            lg.info(f"Игрок '{username}' вернулся. Досылка {len(frames)} кадров после #{acknowledged_seq}.")
+            for frame in frames:
+                player_conn.enqueue_sequenced(frame)
+
+        await session.broadcast_to_component(username, f"SYSTEM {username} вернулся.")
 
     async def remove_player(self, player_conn: PlayerConnection):
         username = player_conn.username
-        if not username: return
-
-        self.player_connections.pop(username, None)
-        last_loc_name = await self.game_state.remove_player(username)
+        if not username or self.player_connections.get(username) is not player_conn: return
 
-        if last_loc_name:
-            component = await self.game_state.get_connected_component(last_loc_name)
-            await self.broadcast_to_locations(component, f"SYSTEM {username} покинул игру.", exclude=[username])
-            await self.game_engine.on_player_removed(last_loc_name)
-        else:
-            all_players = await self.game_state.get_all_player_usernames()
-            if all_players:
-                await self.broadcast_system("LOBBY_UPDATE " + ",".join(all_players), is_direct=True)
+        del self.player_connections[username]
+        if player_conn.replay:
+            self.resume_tokens.pop(player_conn.replay.token, None)
+        if session := player_conn.session:
+            await session.remove_player(player_conn)
+            await self.sessions.discard_if_empty(session)
 
     async def kick_player(self, username: str) -> bool:
         player_conn = self.player_connections.get(username)
         if not player_conn: return False
+        player_conn.resumable = False
+        if player_conn.detached:
+            await self.remove_player(player_conn)
+            return True
         await player_conn.send_direct("SYSTEM Вы были исключены администратором.")
-        await player_conn.stream.aclose()
+        await player_conn.aclose()
         return True
 
-    async def handle_player_say(self, player_conn: PlayerConnection, message: str):
-        if not player_conn.username or not message: return
-
-        is_active = await self.game_state.is_game_active()
-        if is_active:
-            player_model = await self.game_state.get_player(player_conn.username)
-            if player_model and player_model.location_name:
-                component = await self.game_state.get_connected_component(player_model.location_name)
-                await self.broadcast_to_locations(component, f"CHAT {player_conn.username}: {message}")
-        else:
-            await self.broadcast_system(f"CHAT {player_conn.username}: {message}", is_direct=True)
-
-    async def broadcast_to_locations(self, location_names: Iterable[str], message: str,
-                                     exclude: Optional[List[str]] = None):
-        players_in_locs = await self.game_state.get_players_in_locations(set(location_names))
-        target_usernames = {p.username for p in players_in_locs}
-        exclude_set = set(exclude or [])
-
-        if self.nursery:
-            for uname in target_usernames:
-                if uname not in exclude_set and (conn := self.player_connections.get(uname)):
-                    self.nursery.start_soon(conn.send_direct, message)
-
-    async def broadcast_system(self, message: str, exclude: Optional[List[str]] = None, is_direct: bool = False):
-        exclude_set = set(exclude or [])
-        final_message = message if is_direct else f"SYSTEM {message}"
-
-        if self.nursery:
-            for uname, conn in self.player_connections.items():
-                if uname not in exclude_set:
-                    self.nursery.start_soon(conn.send_direct, final_message)
+    async def broadcast_system(self, message: str):
+        """Системное сообщение всем игрокам за всеми столами."""
+        deliver(self.player_connections.values(), f"SYSTEM {message}")
 
 
-async def main():
+def main():
     parser = argparse.ArgumentParser(description="AI Quest Server")
     parser.add_argument('--host', type=str, default=config.DEFAULT_HOST, help=f"Хост (умолч.: {config.DEFAULT_HOST})")
     parser.add_argument('--port', type=int, default=config.DEFAULT_PORT, help=f"Порт (умолч.: {config.DEFAULT_PORT})")
+    parser.add_argument('--workers', type=int, default=config.WORKERS,
+                        help=f"Число процессов-воркеров (умолч.: {config.WORKERS})")
     args = parser.parse_args()
-    server = Server(host=args.host, port=args.port)
-    await server.run()
+
+    initialize_debug_directories()
+    try:
+        listen_sock = bind_listening_socket(args.host, args.port)
+    except OSError as e:
+        lg.critical(f"Не удалось найти доступный порт для запуска сервера: {e}", exc_info=True)
+        sys.exit(1)
+    port = listen_sock.getsockname()[1]
+
+    if args.workers <= 1:
+        trio.run(Server(host=args.host, port=port).run, listen_sock)
+        return
+
+    def worker_main(index: int, channel: socket.socket):
+        trio.run(Server(host=args.host, port=port, worker_index=index).run_worker, channel)
+
+    run_cluster(args.host, port, listen_sock, args.workers, worker_main)
 
 
 if __name__ == "__main__":
     try:
-        trio.run(main)
+        main()
     except KeyboardInterrupt:
         console.print(f"\n[bold yellow]Завершение работы сервера по запросу пользователя.[/bold yellow]")
     except Exception as e:
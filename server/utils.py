@@ -1,10 +1,10 @@
+import errno
+import math
 import os
 import shutil
 import socket
 
-import trio
-
-from config import DEFAULT_HOST, MAX_PORT_ATTEMPTS
+from config import ESTIMATED_CHARS_PER_TOKEN, MAX_PORT_ATTEMPTS
 from logger import lg
 
 PROMPT_DIR = 'prompts'
@@ -31,6 +31,14 @@ def initialize_debug_directories():
         lg.error(f"Ошибка при очистке/создании директорий для отладки: {e}", exc_info=True)
 
 
+def estimate_tokens(text: str) -> int:
+    """
+    Грубая оценка числа токенов без токенизатора модели.
+    Для русского текста токен в среднем короче английского, поэтому оценка берется с запасом.
+    """
+    return math.ceil(len(text) / ESTIMATED_CHARS_PER_TOKEN)
+
+
 def get_local_ip() -> str:
     """
     Получает локальный IP-адрес машины, подключаясь к внешнему адресу.
@@ -47,26 +55,30 @@ def get_local_ip() -> str:
         return '127.0.0.1'
 
 
-async def find_available_port(start_port: int) -> int:
+def bind_listening_socket(host: str, start_port: int, backlog: int = 128) -> socket.socket:
     """
-    Находит доступный TCP-порт, начиная с указанного.
+    Привязывает слушающий TCP-сокет к первому свободному порту, начиная с указанного.
+    Порт занимается сразу и больше не освобождается, поэтому между проверкой и запуском
+    сервера его не может перехватить другой процесс. Сокет создается до запуска воркеров
+    и наследуется ими при fork.
     """
     lg.info(f"Поиск доступного порта, начиная с {start_port}.")
     for i in range(MAX_PORT_ATTEMPTS):
         port = start_port + i
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         try:
-            listeners = await trio.open_tcp_listeners(port=port, host=DEFAULT_HOST)
-            for l in listeners:
-                await l.aclose()
-            lg.info(f"Порт {port} свободен и будет использован.")
-            return port
+            sock.bind((host, port))
+            sock.listen(backlog)
         except OSError as e:
-            if e.errno == 98:
+            sock.close()
+            if e.errno == errno.EADDRINUSE:
                 lg.warning(f"Порт {port} уже занят. Пробуем следующий.")
                 continue
-            else:
-                lg.error(f"Непредвиденная ошибка ОС при проверке порта {port}: {e}", exc_info=True)
-                raise
+            lg.error(f"Непредвиденная ошибка ОС при привязке порта {port}: {e}", exc_info=True)
+            raise
+        lg.info(f"Порт {port} свободен и будет использован.")
+        return sock
 
     lg.critical(f"Не удалось найти доступный порт в диапазоне {start_port}-{start_port + MAX_PORT_ATTEMPTS - 1}.")
     raise OSError(f"Не удалось найти доступный порт в диапазоне {start_port}-{start_port + MAX_PORT_ATTEMPTS - 1}.")
@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# Сервер импортирует свои модули относительно server/, общий протокол — из корня репозитория;
+# лог сервера пишется в текущий каталог.
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'server'))
+os.chdir(tempfile.mkdtemp(prefix='aiquest-tests-'))
@@ -0,0 +1,35 @@
+import zlib
+
+import pytest
+import trio
+import trio.testing
+
+from protocol.compression import InflateStream
+from protocol.errors import ProtocolError
+
+
+def _deflate(data: bytes) -> bytes:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+async def _inflate_all(raw: bytes, limit: int) -> bytes:
+    send, receive = trio.testing.memory_stream_one_way_pair()
+    await send.send_all(raw)
+    await send.aclose()
+    stream, out = InflateStream(receive, chunk_size=len(raw)), bytearray()
+    while data := await stream.receive_some(limit):
+        out += data
+    return bytes(out)
+
+
+def test_round_trip_through_unconsumed_tail():
+    payload = b"\0" * 100_000 + "повествование".encode('utf-8') * 100
+    assert trio.run(_inflate_all, _deflate(payload), 1024) == payload
+
+
+def test_corrupt_input_in_unconsumed_tail_raises_protocol_error():
+    # Первый вызов упирается в лимит вывода, и поврежденный хвост разбирается уже из unconsumed_tail.
+    raw = _deflate(b"\0" * 100_000)[:-4] + b"\xff" * 64
+    with pytest.raises(ProtocolError):
+        trio.run(_inflate_all, raw, 1024)
@@ -0,0 +1,67 @@
+import random
+
+from game.graph import ConnectivityIndex
+
+
+def _bfs(edges, start):
+    reached, frontier = {start}, [start]
+    while frontier:
+        name = frontier.pop()
+        for first, second in edges:
+            neighbor = second if first == name else first if second == name else None
+            if neighbor is not None and neighbor not in reached:
+                reached.add(neighbor)
+                frontier.append(neighbor)
+    return frozenset(reached)
+
+
+def test_disconnecting_bridge_splits_component_with_new_ids():
+    index = ConnectivityIndex()
+    assert index.connect('a', 'b')
+    assert index.connect('b', 'c')
+    joined_id, version = index.component_id('a'), index.version
+    assert index.component('c') == {'a', 'b', 'c'}
+
+    assert index.disconnect('b', 'c')
+    assert index.component('a') == {'a', 'b'}
+    assert index.component('c') == {'c'}
+    assert index.component_id('a') == index.component_id('b')
+    assert len({joined_id, index.component_id('a'), index.component_id('c')}) == 3
+    assert index.version > version
+
+
+def test_disconnecting_cycle_edge_keeps_one_component():
+    index = ConnectivityIndex()
+    for first, second in (('a', 'b'), ('b', 'c'), ('c', 'a')):
+        index.connect(first, second)
+    component_id, version = index.component_id('a'), index.version
+
+    assert not index.disconnect('a', 'b')
+    assert index.component('b') == {'a', 'b', 'c'}
+    assert index.component_id('a') == index.component_id('b') == component_id
+    assert index.version == version
+    assert 'b' not in index.neighbors('a')
+
+
+def test_component_matches_brute_force_bfs():
+    rnd = random.Random(7)
+    names = [f"loc{i}" for i in range(10)]
+    index, edges = ConnectivityIndex(), set()
+    for name in names:
+        index.add_location(name)
+    for _ in range(400):
+        first, second = sorted(rnd.sample(names, 2))
+        before = {name: (index.component_id(name), index.component(name)) for name in names}
+        if rnd.random() < 0.5:
+            index.connect(first, second)
+            edges.add((first, second))
+        else:
+            index.disconnect(first, second)
+            edges.discard((first, second))
+        assert set(index.edges()) == edges
+        for name in names:
+            expected = _bfs(edges, name)
+            assert index.component(name) == expected
+            # Идентификатор компоненты остается прежним ровно тогда, когда не изменился ее состав.
+            old_id, old_component = before[name]
+            assert (index.component_id(name) == old_id) == (expected == old_component)
@@ -0,0 +1,36 @@
+import json
+import os
+import tempfile
+
+import trio
+
+from game.history import EventLog, HistoryArchive, LocationHistory, _TRIM_SLACK
+
+
+def test_entry_limit_trims_in_batches_to_newest_entries():
+    log = EventLog()
+    history = LocationHistory('hall', max_entries=10, max_chars=10_000)
+    for i in range(10 + _TRIM_SLACK):
+        history.append(log.entry(f"запись {i}"))
+    assert len(history) == 10 + _TRIM_SLACK
+    history.append(log.entry("последняя"))
+    assert len(history) == 10
+    assert [entry.text for entry in history.tail(2)] == [f"запись {9 + _TRIM_SLACK}", "последняя"]
+    assert history.chars == sum(len(entry.text) for entry in history)
+
+
+def test_char_limit_keeps_last_entry_and_archives_evicted():
+    async def main():
+        path = os.path.join(tempfile.mkdtemp(), 'archive', 't1.jsonl')
+        archive = HistoryArchive(path)
+        log = EventLog()
+        history = LocationHistory('hall', max_entries=100, max_chars=20, archive=archive)
+        for text in ("a" * 8, "b" * 8, "c" * 8, "d" * 30):
+            history.append(log.entry(text))
+        assert [entry.text for entry in history] == ["d" * 30]
+        assert not os.path.exists(path)
+        await archive.aclose()
+        with open(path, encoding='utf-8') as f:
+            archived = [json.loads(line) for line in f]
+        assert [(record['seq'], record['location']) for record in archived] == [(1, 'hall'), (2, 'hall'), (3, 'hall')]
+    trio.run(main)
@@ -0,0 +1,86 @@
+import socket
+
+import pytest
+import trio
+from trio.testing import MockClock
+
+import config
+from handlers.limits import TokenBucket
+from handlers.player import PlayerConnection
+from main import Server
+from protocol.wire import TextProtocol
+
+
+def _connection() -> PlayerConnection:
+    sock, _ = socket.socketpair()
+    player_conn = PlayerConnection(Server('127.0.0.1', 0), trio.SocketStream(trio.socket.from_stdlib_socket(sock)))
+    player_conn.username = 'alice'
+    return player_conn
+
+
+def _sent(player_conn: PlayerConnection):
+    lines = []
+    while True:
+        try:
+            lines.append(player_conn._outbox_receive.receive_nowait().decode('utf-8').rstrip('\n'))
+        except trio.WouldBlock:
+            return lines
+
+
+def test_burst_then_refill_at_rate():
+    async def main():
+        bucket = TokenBucket(rate=0.5, capacity=3)
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+        assert bucket.retry_after() == pytest.approx(2.0)
+
+        clock.jump(1.0)
+        assert not bucket.try_acquire()
+        assert bucket.retry_after() == pytest.approx(1.0)
+        clock.jump(1.0)
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+
+        # Долгий простой копит не больше capacity жетонов.
+        clock.jump(60.0)
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    clock = MockClock()
+    trio.run(main, clock=clock)
+
+
+def test_admit_action_refuses_over_rate_and_size():
+    async def main():
+        player_conn = _connection()
+        assert isinstance(player_conn.protocol, TextProtocol)
+        assert all([await player_conn._admit_action("осматривается") for _ in range(config.ACTION_BURST)])
+        assert not await player_conn._admit_action("осматривается")
+        assert player_conn.stats.actions_rejected == 1
+        interval = 60 / config.ACTION_RATE_PER_MINUTE
+        assert _sent(player_conn) == [f"ERROR Слишком частые действия. Повторите через {interval:.0f} с.",
+                                      "SYSTEM NARRATION_END"]
+
+        clock.jump(interval)
+        assert await player_conn._admit_action("осматривается")
+        clock.jump(interval)
+        assert not await player_conn._admit_action("я" * (config.MAX_ACTION_CHARS + 1))
+        assert player_conn.stats.actions_rejected == 2
+        assert _sent(player_conn)[0].startswith("ERROR Действие слишком длинное")
+        # Отклоненное по длине действие не тратит жетон.
+        assert await player_conn._admit_action("осматривается")
+    clock = MockClock()
+    trio.run(main, clock=clock)
+
+
+def test_admit_chat_has_its_own_budget():
+    async def main():
+        player_conn = _connection()
+        assert all([await player_conn._admit_chat("привет") for _ in range(config.CHAT_BURST)])
+        assert not await player_conn._admit_chat("привет")
+        assert player_conn.stats.chat_rejected == 1
+        assert await player_conn._admit_action("осматривается")
+
+        clock.jump(60 / config.CHAT_RATE_PER_MINUTE)
+        assert await player_conn._admit_chat("привет")
+        assert not await player_conn._admit_chat("б" * (config.MAX_CHAT_CHARS + 1))
+        assert player_conn.stats.chat_rejected == 2
+    clock = MockClock()
+    trio.run(main, clock=clock)
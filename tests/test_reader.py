@@ -0,0 +1,72 @@
+import pytest
+import trio
+
+from protocol.errors import FrameTooLargeError
+from protocol.reader import StreamReader
+
+
+class _Chunks:
+    """Поток, отдающий заранее нарезанные куски по одному на receive_some."""
+
+    def __init__(self, *chunks: bytes):
+        self.chunks = list(chunks)
+
+    async def receive_some(self, max_bytes=None):
+        await trio.lowlevel.checkpoint()
+        return self.chunks.pop(0) if self.chunks else b''
+
+
+def _split(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_multibyte_character_split_between_chunks():
+    async def main():
+        line = "ЁЖИК в тумане\n".encode('utf-8')
+        reader = StreamReader(_Chunks(line[:1], line[1:]))
+        assert (await reader.read_line()).decode('utf-8') == "ЁЖИК в тумане"
+        assert await reader.read_line() is None
+    trio.run(main)
+
+
+def test_lines_across_many_small_chunks():
+    async def main():
+        lines = ["NARRATE Лампы мигают." * 20, "CHAT a: б", ""]
+        data = "".join(f"{line}\n" for line in lines).encode('utf-8')
+        reader = StreamReader(_Chunks(*_split(data, 3)))
+        assert [(await reader.read_line()).decode('utf-8') for _ in lines] == lines
+        assert await reader.read_line() is None
+        assert reader.bytes_received == len(data)
+    trio.run(main)
+
+
+def test_read_exactly_across_chunk_boundaries():
+    async def main():
+        data = bytes(range(256)) * 4
+        reader = StreamReader(_Chunks(*_split(data, 7)), chunk_size=7)
+        parts = [await reader.read_exactly(size) for size in (5, 100, 1, 0, 400)]
+        assert b"".join(parts) == data[:506]
+        assert [len(part) for part in parts] == [5, 100, 1, 0, 400]
+        assert await reader.read_exactly(len(data) - 506) == data[506:]
+        assert await reader.read_exactly(1) is None
+    trio.run(main)
+
+
+def test_line_and_frame_over_limit_raise():
+    async def main():
+        unterminated = StreamReader(_Chunks(*_split(b"x" * 5000, 100)), max_frame_size=1000)
+        with pytest.raises(FrameTooLargeError):
+            await unterminated.read_line()
+
+        in_one_chunk = StreamReader(_Chunks(b"y" * 1001 + b"\n"), max_frame_size=1000)
+        with pytest.raises(FrameTooLargeError):
+            await in_one_chunk.read_line()
+
+        at_limit = StreamReader(_Chunks(b"z" * 1000 + b"\n"), max_frame_size=1000)
+        assert await at_limit.read_line() == b"z" * 1000
+
+        frame = StreamReader(_Chunks(b"w" * 2000), max_frame_size=1000)
+        with pytest.raises(FrameTooLargeError):
+            await frame.read_exactly(1001)
+        assert await frame.read_exactly(1000) == b"w" * 1000
+    trio.run(main)
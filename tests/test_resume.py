@@ -0,0 +1,88 @@
+import socket
+
+import trio
+import trio.testing
+
+from handlers.player import PlayerConnection
+from handlers.resume import ReplayBuffer
+from main import Server
+from protocol.reader import StreamReader
+from protocol.wire import FramedProtocol
+
+
+def _recorded(count: int, capacity: int):
+    protocol, replay = FramedProtocol(), ReplayBuffer(capacity)
+    for i in range(1, count + 1):
+        replay.record(protocol.encode(f"NARRATE кадр {i}"))
+    return replay
+
+
+async def _read_all(frames):
+    send, receive = trio.testing.memory_stream_one_way_pair()
+    for frame in frames:
+        await send.send_all(frame if isinstance(frame, bytes) else b"".join(frame))
+    await send.aclose()
+    protocol, reader, messages = FramedProtocol(), StreamReader(receive), []
+    while (message := await protocol.read_message(reader)) is not None:
+        messages.append((message.seq, message.text))
+    return messages
+
+
+def _connection(server: Server) -> PlayerConnection:
+    sock, _ = socket.socketpair()
+    return PlayerConnection(server, trio.SocketStream(trio.socket.from_stdlib_socket(sock)))
+
+
+def _queued(player_conn: PlayerConnection):
+    items = []
+    while True:
+        try:
+            items.append(player_conn._outbox_receive.receive_nowait())
+        except trio.WouldBlock:
+            return items
+
+
+def test_since_returns_none_once_missing_frames_are_evicted():
+    replay = _recorded(10, capacity=4)
+    assert replay.last_seq == 10
+    assert replay.since(5) is None
+    assert replay.since(0) is None
+    assert len(replay.since(6)) == 4
+    assert replay.since(10) == []
+    assert replay.since(12) == []
+
+
+def test_since_returns_missing_frames_in_order():
+    replay = _recorded(10, capacity=4)
+    messages = trio.run(_read_all, replay.since(7))
+    assert messages == [(8, "NARRATE кадр 8"), (9, "NARRATE кадр 9"), (10, "NARRATE кадр 10")]
+
+
+def test_resume_replays_exactly_missing_frames_in_order():
+    async def main():
+        server = Server('127.0.0.1', 0)
+        previous = _connection(server)
+        previous.username, previous.protocol = 'alice', FramedProtocol()
+        assert await server.join_session(previous) == "success"
+        previous.replay = ReplayBuffer(8)
+        server.resume_tokens[previous.replay.token] = previous
+        for i in range(1, 4):
+            await previous.send_direct(f"NARRATE до обрыва {i}")
+        _queued(previous)
+
+        # Пока игрок отключен, кадры только копятся в кольце.
+        previous.detached = True
+        for i in range(4, 7):
+            await previous.send_direct(f"NARRATE без связи {i}")
+        assert _queued(previous) == []
+
+        resumed = _connection(server)
+        resumed.protocol = FramedProtocol()
+        assert server.find_resumable(previous.replay.token) is previous
+        await server.resume_player(resumed, previous, 2)
+        messages = await _read_all(_queued(resumed))
+        assert messages == [(3, "NARRATE до обрыва 3"), (4, "NARRATE без связи 4"),
+                            (5, "NARRATE без связи 5"), (6, "NARRATE без связи 6")]
+        assert server.player_connections['alice'] is resumed
+        assert server.find_resumable(previous.replay.token) is resumed
+    trio.run(main)
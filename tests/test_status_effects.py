@@ -0,0 +1,105 @@
+import random
+from dataclasses import astuple, replace
+
+from game.player import Player, StatusEffect
+
+
+def _healthy():
+    return StatusEffect(name="здоров", description="В полном порядке.", is_positive=True)
+
+
+class _DecrementingEffects:
+    """Прежняя модель: список эффектов, у которых каждый ход уменьшается duration_turns."""
+
+    def __init__(self):
+        self.effects = [_healthy()]
+
+    def add(self, effect):
+        if not any(e.name == effect.name for e in self.effects):
+            self.effects.append(replace(effect))
+
+    def remove(self, name):
+        self.effects = [e for e in self.effects if e.name != name]
+
+    def advance_turn(self):
+        active, expired = [], []
+        for effect in self.effects:
+            if effect.duration_turns is not None:
+                effect.duration_turns -= 1
+                if effect.duration_turns <= 0:
+                    expired.append(effect.name)
+                    continue
+            active.append(effect)
+        self.effects = active or [_healthy()]
+        return expired
+
+
+def _assert_same(player, reference):
+    assert [astuple(e) for e in player.status_effects.snapshot()] == [astuple(e) for e in reference.effects]
+
+
+def _step(player, reference, expected_expired=None):
+    expired = [effect.name for effect in player.advance_effects()]
+    assert expired == reference.advance_turn()
+    if expected_expired is not None:
+        assert expired == expected_expired
+    _assert_same(player, reference)
+
+
+def test_expiry_matches_per_turn_decrement():
+    player, reference = Player(username='alice'), _DecrementingEffects()
+    bleeding = StatusEffect("Кровотечение", "Рана на руке.", 3)
+    fear = StatusEffect("Страх", "Темнота давит.", 1)
+    cold = StatusEffect("Озноб", "Холодно.", 4)
+    for effect in (bleeding, fear, cold):
+        player.edit_status_effects().add(effect)
+        reference.add(effect)
+    _assert_same(player, reference)
+
+    _step(player, reference, ["Страх"])
+    # Повторное добавление активного эффекта не продлевает и не заменяет его.
+    assert not player.edit_status_effects().add(StatusEffect("Кровотечение", "Снова.", 10))
+    reference.add(StatusEffect("Кровотечение", "Снова.", 10))
+    _assert_same(player, reference)
+
+    # Эффект, снятый до срока, не истекает повторно, а добавленный заново отсчитывается с нуля.
+    player.edit_status_effects().remove("Озноб")
+    reference.remove("Озноб")
+    _step(player, reference)
+    player.edit_status_effects().add(StatusEffect("Озноб", "Снова холодно.", 3))
+    reference.add(StatusEffect("Озноб", "Снова холодно.", 3))
+    _step(player, reference, ["Кровотечение"])
+    _step(player, reference)
+    _step(player, reference, ["Озноб"])
+    assert [e.name for e in player.status_effects] == ["здоров"]
+
+
+def test_healthy_returns_when_last_effect_expires():
+    player, reference = Player(username='alice'), _DecrementingEffects()
+    player.edit_status_effects().remove("здоров")
+    reference.remove("здоров")
+    for effect in (StatusEffect("Яд", "Тошнит.", 2), StatusEffect("Ожог", "Жжет.", 0)):
+        player.edit_status_effects().add(effect)
+        reference.add(effect)
+    _step(player, reference, ["Ожог"])
+    _step(player, reference, ["Яд"])
+    assert [astuple(e) for e in player.status_effects.snapshot()] == [astuple(_healthy())]
+
+
+def test_random_sequences_match_per_turn_decrement():
+    rnd = random.Random(3)
+    names = ["Яд", "Страх", "Озноб", "Ожог", "здоров"]
+    for _ in range(50):
+        player, reference = Player(username='alice'), _DecrementingEffects()
+        for _ in range(40):
+            for _ in range(rnd.randrange(3)):
+                name = rnd.choice(names)
+                if rnd.random() < 0.6:
+                    effect = StatusEffect(name, f"{name}.", rnd.choice([None, 0, 1, 2, 3, 5]), rnd.random() < 0.3)
+                    player.edit_status_effects().add(effect)
+                    reference.add(effect)
+                else:
+                    player.edit_status_effects().remove(name)
+                    reference.remove(name)
+                _assert_same(player, reference)
+            _step(player, reference)
@@ -0,0 +1,75 @@
+import trio
+import trio.testing
+from trio.testing import MockClock
+
+from llm.streaming import coalesce_narration
+
+
+def _recorder():
+    sent = []
+
+    async def flush(text: str):
+        sent.append(text)
+    return sent, flush
+
+
+def _assert_consistent(narration, sent):
+    assert "".join(sent) == narration.text
+    assert len(sent) == narration.frames_sent
+
+
+def test_flush_at_max_bytes():
+    async def main():
+        sent, flush = _recorder()
+        async with coalesce_narration(flush, window=10.0, max_bytes=10) as narration:
+            await narration.feed("абв")  # 6 байт
+            assert sent == []
+            await narration.feed("гд")  # 10 байт: бюджет исчерпан
+            assert sent == ["абвгд"]
+            await narration.feed("е")
+        assert sent == ["абвгд", "е"]
+        _assert_consistent(narration, sent)
+        assert narration.chunks_received == 3
+    trio.run(main)
+
+
+def test_flush_when_window_expires():
+    async def main():
+        sent, flush = _recorder()
+        async with coalesce_narration(flush, window=0.5, max_bytes=1000) as narration:
+            await narration.feed("Лампы ")
+            await narration.feed("мигают")
+            await trio.testing.wait_all_tasks_blocked()
+            clock.jump(0.4)
+            await trio.testing.wait_all_tasks_blocked()
+            assert sent == []
+
+            clock.jump(0.2)
+            await trio.testing.wait_all_tasks_blocked()
+            assert sent == ["Лампы мигают"]
+
+            # Окно отсчитывается заново от первого фрагмента после сброса.
+            await narration.feed(", и ")
+            clock.jump(0.3)
+            await trio.testing.wait_all_tasks_blocked()
+            await narration.feed("гаснут")
+            clock.jump(0.3)
+            await trio.testing.wait_all_tasks_blocked()
+            assert sent == ["Лампы мигают", ", и гаснут"]
+        _assert_consistent(narration, sent)
+    clock = MockClock()
+    trio.run(main, clock=clock)
+
+
+def test_sentence_end_and_final_flush_on_exit():
+    async def main():
+        sent, flush = _recorder()
+        async with coalesce_narration(flush, window=10.0, max_bytes=1000) as narration:
+            await narration.feed("Тьма.")
+            await narration.feed(" Шаги")
+            await narration.feed(" все ближе")
+            assert sent == ["Тьма."]
+        assert sent == ["Тьма.", " Шаги все ближе"]
+        _assert_consistent(narration, sent)
+        assert narration.text == "Тьма. Шаги все ближе"
+    trio.run(main)
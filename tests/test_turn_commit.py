@@ -0,0 +1,98 @@
+import trio
+
+from game.player import Player, StatusEffect
+from game.state import GameState
+
+
+async def _started_world(*usernames: str) -> GameState:
+    state = GameState()
+    for username in usernames:
+        await state.add_player(Player(username=username))
+    await state.start_game()
+    return state
+
+
+def test_child_location_does_not_block_parent_description():
+    async def main():
+        state = await _started_world('alice')
+        start = state.start_room
+        base = state.snapshot([start])
+        await state.apply_turn_changes({"location_updates": [
+            {"location_name": "corridor", "description": "Коридор.", "parent_location": start},
+            {"location_name": start, "description": "Новое описание."},
+        ]}, base=base)
+        assert state.locations[start].description == "Новое описание."
+        assert state.locations["corridor"].parent_location == start
+        assert "corridor" in state.locations[start].sub_locations
+    trio.run(main)
+
+
+def test_second_update_of_same_player_is_applied():
+    async def main():
+        state = await _started_world('alice')
+        base = state.snapshot([state.start_room])
+        moved, _ = await state.apply_turn_changes({"player_updates": [
+            {"username": "alice", "status_effects_update": {"add": [
+                {"name": "Кровотечение", "description": "Рана.", "duration_turns": 2, "is_positive": False}]}},
+            {"username": "alice", "move_to_location": "corridor"},
+        ]}, base=base)
+        alice = state.players["alice"]
+        assert "Кровотечение" in [effect.name for effect in alice.status_effects]
+        assert alice.location_name == "corridor"
+        assert [player.username for player, _ in moved] == ["alice"]
+    trio.run(main)
+
+
+def test_location_outside_snapshot_is_updated():
+    async def main():
+        state = await _started_world('alice')
+        start = state.start_room
+        await state.apply_turn_changes({"location_updates": [{"location_name": "depot", "description": "Депо."}]})
+        base = state.snapshot([start])
+        await state.apply_turn_changes({"location_updates": [{"location_name": "depot", "description": "Депо в огне."}]},
+                                       base=base)
+        assert state.locations["depot"].description == "Депо в огне."
+    trio.run(main)
+
+
+def test_changes_by_another_turn_are_rejected():
+    async def main():
+        state = await _started_world('alice')
+        start = state.start_room
+        base = state.snapshot([start])
+        await state.apply_turn_changes({"location_updates": [{"location_name": start, "description": "Чужой ход."}],
+                                        "player_updates": [{"username": "alice", "inventory_add": ["нож"]}]})
+        await state.apply_turn_changes({"location_updates": [{"location_name": start, "description": "Устарело."}],
+                                        "player_updates": [{"username": "alice", "inventory_add": ["спички"]}]},
+                                       base=base)
+        assert state.locations[start].description == "Чужой ход."
+        assert state.players["alice"].inventory.count("спички") == 0
+    trio.run(main)
+
+
+def test_malformed_player_update_items_are_skipped_without_partial_commit():
+    async def main():
+        state = await _started_world('alice', 'bob')
+        start = state.start_room
+        base = state.snapshot([start])
+        await state.apply_turn_changes({
+            "connection_updates": [{"action": "CREATE", "locations": [start, "corridor"]}],
+            "world_flags_update": {"lights": "off"},
+            "player_updates": [
+                {"username": "alice", "inventory_add": ["нож", {"name": "ключ"}, ["патрон"]]},
+                {"username": "bob", "inventory_remove": "фонарик",
+                 "status_effects_update": {"add": [{"name": ["яд"], "description": "?"}, {"title": "без имени"},
+                                                   {"name": "Озноб", "description": "Холодно.", "duration_turns": "2"},
+                                                   {"name": "Страх", "description": "Темно."}],
+                                           "remove": ["здоров", 7]}},
+                "не объект",
+                {"username": {"name": "carol"}},
+            ],
+        }, base=base)
+        alice, bob = state.players["alice"], state.players["bob"]
+        assert alice.inventory.items() == (("фонарик", 1), ("нож", 1))
+        assert bob.inventory.items() == (("фонарик", 1),)
+        assert [effect.name for effect in bob.status_effects] == ["Страх"]
+        assert state.world_flags["lights"] == "off"
+        assert "corridor" in state.connectivity.neighbors(start)
+    trio.run(main)
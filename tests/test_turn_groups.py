@@ -0,0 +1,163 @@
+import trio
+
+from game.engine import GameEngine
+from game.player import Player
+from game.state import GameState
+
+
+class _Channel:
+    async def send(self, message, exclude=None):
+        pass
+
+
+class _Model:
+    """Модель с заранее заданным ответом: одна фраза повествования и изменения состояния state_changes."""
+
+    def __init__(self):
+        self.state_changes = {}
+
+    async def stream_narration(self, prompt, label=None):
+        yield "Лампы мигают."
+
+    async def get_state_changes_from_narration(self, prompt):
+        return self.state_changes, "{}"
+
+
+class _RecordingNursery:
+    """Запоминает запущенные ходы вместо их обработки."""
+
+    def __init__(self):
+        self.started = []
+
+    def start_soon(self, fn, *args):
+        self.started.append(args[0])
+
+
+class _Session:
+    def __init__(self, game_state, nursery):
+        self.id = 't'
+        self.game_state = game_state
+        self.model_manager = _Model()
+        self.nursery = nursery
+
+    def broadcast_group(self, location_names):
+        return _Channel()
+
+    async def broadcast_to_locations(self, location_names, message, exclude=None):
+        pass
+
+
+class _Connection:
+    def __init__(self, username):
+        self.username = username
+
+    async def send_direct(self, message):
+        pass
+
+
+async def _engine(nursery, *placement):
+    """Движок стола, где игроки расставлены по локациям: placement — пары (игрок, локация или None для старта)."""
+    state = GameState()
+    for username, _ in placement:
+        await state.add_player(Player(username=username))
+    await state.start_game()
+    await state.apply_turn_changes({"player_updates": [{"username": username, "move_to_location": location}
+                                                       for username, location in placement if location]})
+    return GameEngine(_Session(state, nursery))
+
+
+def _assert_counts_agree(engine):
+    """Инкрементальные счетчики групп совпадают с прямым подсчетом поданных действий."""
+    state = engine.game_state
+    for group in engine._groups.values():
+        locations = [state.locations[name] for name in group.location_names]
+        players = sorted(p.username for p in state.players.values() if p.location_name in group.location_names)
+        assert sorted(group.players) == players
+        submitted = sum(len(location.pending_actions) for location in locations)
+        assert group.actions_submitted == submitted
+        assert group.is_ready == all(any(p in location.pending_actions for location in locations) for p in players)
+
+
+def test_join_while_turn_is_pending():
+    async def main():
+        nursery = _RecordingNursery()
+        engine = await _engine(nursery, ('alice', None), ('bob', None))
+        await engine.handle_player_action(_Connection('alice'), "осматривается")
+        _assert_counts_agree(engine)
+
+        await engine.game_state.add_player(Player(username='carol'))
+        await engine.handle_player_action(_Connection('bob'), "ждет")
+        _assert_counts_agree(engine)
+        assert not nursery.started
+
+        await engine.handle_player_action(_Connection('carol'), "входит")
+        _assert_counts_agree(engine)
+        assert nursery.started == [engine.game_state.connectivity.component_id(engine.game_state.start_room)]
+    trio.run(main)
+
+
+def test_player_moving_between_groups():
+    async def main():
+        nursery = _RecordingNursery()
+        engine = await _engine(nursery, ('alice', None), ('bob', None), ('carol', 'depot'))
+        state = engine.game_state
+        await engine.handle_player_action(_Connection('alice'), "осматривается")
+        _assert_counts_agree(engine)
+        assert not nursery.started
+
+        await state.apply_turn_changes({"player_updates": [{"username": "bob", "move_to_location": "depot"}]})
+        await engine.handle_player_action(_Connection('carol'), "ждет")
+        _assert_counts_agree(engine)
+        # В стартовой комнате остался только alice, и ее действие уже подано.
+        assert nursery.started == [state.connectivity.component_id(state.start_room)]
+        assert not engine._groups[state.connectivity.component_id('depot')].is_ready
+    trio.run(main)
+
+
+def test_groups_merging_during_turn():
+    async def main():
+        async with trio.open_nursery() as nursery:
+            engine = await _engine(nursery, ('alice', None), ('bob', 'depot'))
+            state = engine.game_state
+            engine.session.model_manager.state_changes = {
+                "connection_updates": [{"action": "CREATE", "locations": [state.start_room, "depot"]}]}
+            start_group = state.connectivity.component_id(state.start_room)
+
+            await engine.handle_player_action(_Connection('alice'), "открывает дверь")
+            assert engine.turn_processing_locks == {start_group}
+
+        assert not engine.turn_processing_locks
+        assert state.connectivity.component(state.start_room) == {state.start_room, 'depot'}
+        assert engine._groups_version is None
+        engine.session.nursery = _RecordingNursery()
+        await engine.handle_player_action(_Connection('bob'), "идет к двери")
+        _assert_counts_agree(engine)
+        assert len(engine._groups) == 1
+        assert not engine.session.nursery.started
+    trio.run(main)
+
+
+def test_fallback_rebuilds_groups_after_split_during_turn():
+    async def main():
+        async with trio.open_nursery() as nursery:
+            engine = await _engine(nursery, ('alice', None), ('bob', 'depot'))
+            state = engine.game_state
+            await state.apply_turn_changes({"connection_updates": [
+                {"action": "CREATE", "locations": [state.start_room, "depot"]}]})
+            engine.session.model_manager.state_changes = {
+                "connection_updates": [{"action": "DESTROY", "locations": [state.start_room, "depot"]}],
+                "player_updates": [{"username": "bob", "move_to_location": "tunnel"}]}
+
+            await engine.handle_player_action(_Connection('alice'), "рубит кабель")
+            await engine.handle_player_action(_Connection('bob'), "уходит в туннель")
+            assert len(engine.turn_processing_locks) == 1
+
+        # Группы пересобраны посреди хода и учли действия, которые finally затем очистил.
+        assert engine._groups_version is None
+        engine.session.nursery = _RecordingNursery()
+        await engine.handle_player_action(_Connection('alice'), "осматривается")
+        _assert_counts_agree(engine)
+        assert len(engine._groups) == 2
+        assert engine.session.nursery.started == [state.connectivity.component_id(state.start_room)]
+        assert not engine._groups[state.connectivity.component_id('tunnel')].is_ready
+    trio.run(main)